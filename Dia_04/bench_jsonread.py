@@ -0,0 +1,71 @@
+"""
+Benchmark: custo por iteração da coleta do jsonread.py, sem rede.
+
+"listas" refaz o DataFrame com todas as leituras a cada iteração e imprime
+tudo (como a versão antiga); "coletor" usa o Coletor, que grava em colunas
+pré-alocadas e mostra só as últimas linhas e o resumo.
+
+No fim, confere que uma leitura que falha (porta sem nada ouvindo) não
+derruba o laço e, no modo adaptativo, dobra o intervalo até a próxima.
+
+Uso: python bench_jsonread.py
+"""
+import io
+import socket
+import time
+from contextlib import redirect_stdout
+import pandas as pd
+import jsonread
+from jsonread import Coletor
+
+ITERACOES = 1000
+MARCOS = [10, 100, 500, 1000]
+LEITURA = {'Temperatura': 25.0, 'Umidade': 60.0, 'Botao': 0, 'Motor': 0, 'Alarme': 0}
+
+
+def com_listas():
+    ID, DATA, HORA, UMIDADE, TEMP, BTN, MOTOR, ALARME = [], [], [], [], [], [], [], []
+    for i in range(ITERACOES):
+        t0 = time.perf_counter()
+        ID.append(i); DATA.append('17/10/2026'); HORA.append('12:00:00')
+        TEMP.append(LEITURA['Temperatura']); UMIDADE.append(LEITURA['Umidade'])
+        BTN.append(LEITURA['Botao']); MOTOR.append(LEITURA['Motor']); ALARME.append(LEITURA['Alarme'])
+        DB = pd.DataFrame({'ID': ID, 'DATA': DATA, 'HORA': HORA, 'UMIDADE': UMIDADE,
+                           'TEMPERATURA [ºC]': TEMP, 'BOTAO': BTN, 'MOTOR': MOTOR, 'ALARME': ALARME})
+        print(DB.to_string())
+        yield time.perf_counter() - t0
+
+
+def com_coletor():
+    coletor = Coletor(ITERACOES)
+    for i in range(ITERACOES):
+        t0 = time.perf_counter()
+        coletor.adicionar(i, '17/10/2026', '12:00:00', LEITURA)
+        print(coletor.ultimas(5))
+        print(coletor.resumo())
+        yield time.perf_counter() - t0
+    coletor.dataframe()
+
+
+def leitura_falha():
+    """Uma volta do laço com a placa fora do ar: (intervalo antes, depois, leituras guardadas)."""
+    with socket.socket() as s:  # porta livre, fechada logo em seguida: conexão recusada
+        s.bind(("127.0.0.1", 0))
+        porta = s.getsockname()[1]
+    coletor = Coletor(10)
+    jsonread.ADAPTATIVO, jsonread.INTERVALO_MAX = True, 8
+    with redirect_stdout(io.StringIO()):
+        intervalo, anterior = jsonread.Iteracao(coletor, 0, 2, LEITURA, f"http://127.0.0.1:{porta}")
+    assert anterior is LEITURA  # a próxima leitura é comparada com a última válida
+    return 2, intervalo, coletor.n
+
+
+if __name__ == "__main__":
+    for nome, modo in [("listas", com_listas), ("coletor", com_coletor)]:
+        with redirect_stdout(io.StringIO()):
+            tempos = list(modo())
+        marcos = " | ".join(f"it {m}: {tempos[m - 1] * 1000:7.2f} ms" for m in MARCOS)
+        print(f"{nome:>8}: total {sum(tempos):6.1f} s | {marcos}")
+    antes, depois, guardadas = leitura_falha()
+    assert depois == 2 * antes and guardadas == 0
+    print(f"leitura falha: intervalo {antes} s -> {depois} s, {guardadas} leituras guardadas")
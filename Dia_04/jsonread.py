@@ -15,35 +15,97 @@ import pytz #https://www.geeksforgeeks.org/python-pytz/
 import datetime
 from datetime import datetime
 i = 0
-ID = [] 
-DATA = [] 
-HORA = []
-UMIDADE = []
-TEMP = []
-BTN = [] 
-MOTOR = [] 
-ALARME = []
 IP = '10.57.216.79'
-def JSONfromIP(url = f'http://{IP}'):
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
+INTERVALO = 5  # s entre leituras
+# Intervalo adaptativo (opcional): cai para INTERVALO_MIN quando temperatura/umidade
+# ou botão/motor/alarme mudam e volta a crescer até INTERVALO_MAX com leituras estáveis
+ADAPTATIVO = False
+INTERVALO_MIN = 1          # s
+INTERVALO_MAX = INTERVALO  # s; maior que INTERVALO economiza leituras, mas vê mudanças mais tarde
+# Arquivo opcional para guardar as leituras (JSON Lines: uma leitura por linha,
+# sempre acrescentando no final). Use None para não gravar em disco.
+# Para o arquivo Parquet de longo prazo: python ../Dia_06/parquet_archive.py importar dados.jsonl
+ARQUIVO_LOG = 'dados.jsonl'
+DESCARGA_LOG = 60  # s: o buffer vai para o disco pelo menos com esta frequência
+_log = None
+_descarga = 0.0
 
-        with open('dados.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+def GravarLog(leitura):
+    global _log, _descarga
+    if ARQUIVO_LOG is None:
+        return
+    if _log is None:
+        # Escrita com buffer: o disco só é acessado quando o buffer enche (ou a cada DESCARGA_LOG s)
+        _log = open(ARQUIVO_LOG, 'a', encoding='utf-8', buffering=64 * 1024)
+    agora = datetime.now(pytz.timezone('America/Sao_Paulo')).isoformat(timespec='seconds')
+    _log.write(json.dumps({'DataHora': agora, **leitura}, ensure_ascii=False) + '\n')
+    if time.monotonic() - _descarga > DESCARGA_LOG:
+        _log.flush()  # uma queda de energia perde no máximo isso
+        _descarga = time.monotonic()
 
-        # 3. Carregar dados do arquivo JSON
-        with open('dados.json', 'r', encoding='utf-8') as f:
-            dados_carregados = json.load(f)
+def FecharLog():
+    """Grava o que ainda estiver no buffer e fecha o log."""
+    global _log
+    if _log is not None:
+        _log.close()
+        _log = None
 
-        # 4. Converter os dados para um DataFrame
-        df = pd.DataFrame(dados_carregados)
+def LeituraFromIP(url = f'http://{IP}'):
+    # 1. Lê o JSON do ESP32 uma única vez, direto da resposta
+    try:
+        response = requests.get(url, timeout=5)
+    except requests.RequestException as erro:  # placa fora do ar, Wi-Fi caiu, timeout...
+        print(f"Erro ao conectar ao servidor ESP32: {erro}")
+        return None
+    if response.status_code == 200:
+        dados = response.json()[0]
 
-        # 5. Exibir os dados
-        return df
+        # 2. Converte cada campo para o tipo certo
+        leitura = {
+            'Temperatura': float(dados['Temperatura']),
+            'Umidade': float(dados['Umidade']),
+            'Botao': int(dados['Botao']),
+            'Motor': int(dados['Motor']),
+            'Alarme': int(dados['Alarme']),
+        }
+
+        # 3. Guarda no log (opcional), sem reler o arquivo
+        GravarLog(leitura)
+        return leitura
     else:
         print("Erro ao conectar ao servidor ESP32")
 
+def JSONfromIP(url = f'http://{IP}'):
+    leitura = LeituraFromIP(url)
+    if leitura is not None:
+        # Converter os dados para um DataFrame
+        return pd.DataFrame([leitura])
+
+def ProximoIntervalo(leitura, anterior, intervalo):
+    """Próximo intervalo (s) do modo ADAPTATIVO a partir da leitura atual e da anterior."""
+    if leitura is None:  # falhou: espera mais, para não insistir numa placa fora do ar
+        return min(intervalo * 2, INTERVALO_MAX)
+    if anterior is None:
+        return intervalo
+    mudou = any(leitura[campo] != anterior[campo] for campo in ('Botao', 'Motor', 'Alarme'))
+    mudou = mudou or abs(leitura['Temperatura'] - anterior['Temperatura']) > 0.2  # além do ruído do DHT22
+    mudou = mudou or abs(leitura['Umidade'] - anterior['Umidade']) > 1.0
+    return INTERVALO_MIN if mudou else min(intervalo * 1.5, INTERVALO_MAX)
+
+def Iteracao(coletor, i, intervalo, anterior, url = f'http://{IP}'):
+    """Uma volta do laço principal; devolve (próximo intervalo, última leitura válida)."""
+    NOW = Agora()
+    leitura = LeituraFromIP(url)
+    if leitura is not None:  # leitura falhou: nada a guardar, mas o intervalo é recalculado
+        coletor.adicionar(i, NOW[1], NOW[2], leitura) # DATA, HORA e leitura do ESP32
+        # Mostra só as últimas linhas e o resumo, não a tabela inteira
+        print(coletor.ultimas(5))
+        print(coletor.resumo())
+    if ADAPTATIVO:
+        # Depois de uma falha, a próxima leitura é comparada com a última que deu certo
+        return ProximoIntervalo(leitura, anterior, intervalo), leitura or anterior
+    return intervalo, anterior
+
 def Agora():
     datetime_br= datetime.now(pytz.timezone('America/Sao_Paulo'))
     D_H = 'Data e Hora atual: ' + str(datetime_br.strftime('%d/%m/%Y %H:%M:%S'))
@@ -51,31 +113,76 @@ def Agora():
     H = hora_atual = datetime_br.strftime('%H:%M:%S')
     return D_H, D, H
 
-for i in range(3600):    
-    NOW = Agora()
-    ID.append(i)
-    DATA.append(NOW[1]) #DATA
-    HORA.append(NOW[2]) #HORA
-    DF = JSONfromIP(f'http://{IP}')
-    TEMP.append(DF['Temperatura'][0])
-    UMIDADE.append(DF['Umidade'][0])
-    BTN.append(DF['Botao'][0])
-    MOTOR.append(DF['Motor'][0])
-    ALARME.append(DF['Alarme'][0])
-    i+=1 #incrementa contador índice de registros
-    #DB = pd.DataFrame(ID, DATA, HORA, UMIDADE, TEMP)
-    DB = pd.DataFrame({
-    'ID': ID,
-    'DATA': DATA,
-    'HORA': HORA,
-    'UMIDADE': UMIDADE,
-    'TEMPERATURA [ºC]': TEMP,
-    'BOTAO': BTN,
-    'MOTOR': MOTOR,
-    'ALARME': ALARME
-    })
-    print(DB)
+class Coletor:
+    """Guarda as leituras em colunas NumPy pré-alocadas.
+
+    Cada leitura custa O(1): nada de refazer o DataFrame inteiro a cada
+    iteração. O DataFrame completo só é montado uma vez, em dataframe().
+    """
+    COLUNAS = {
+        'ID': np.int64,
+        'DATA': object,
+        'HORA': object,
+        'UMIDADE': np.float64,
+        'TEMPERATURA [ºC]': np.float64,
+        'BOTAO': np.int8,
+        'MOTOR': np.int8,
+        'ALARME': np.int8,
+    }
+
+    def __init__(self, capacidade=3600):
+        self.n = 0
+        self.colunas = {nome: np.empty(capacidade, dtype=tipo) for nome, tipo in self.COLUNAS.items()}
+        # Resumo atualizado a cada leitura, sem percorrer o histórico
+        self.temp_min = self.temp_max = None
+        self.soma_temp = 0.0
 
-    time.sleep(5) # Sleep for 5 seconds
+    def adicionar(self, id, data, hora, leitura):
+        if self.n == len(self.colunas['ID']):
+            # Cheio: dobra a capacidade (custo amortizado continua O(1))
+            for nome, coluna in self.colunas.items():
+                self.colunas[nome] = np.concatenate([coluna, np.empty_like(coluna)])
+        linha = {
+            'ID': id,
+            'DATA': data,
+            'HORA': hora,
+            'UMIDADE': leitura['Umidade'],
+            'TEMPERATURA [ºC]': leitura['Temperatura'],
+            'BOTAO': leitura['Botao'],
+            'MOTOR': leitura['Motor'],
+            'ALARME': leitura['Alarme'],
+        }
+        for nome, valor in linha.items():
+            self.colunas[nome][self.n] = valor
+        self.n += 1
+        temp = leitura['Temperatura']
+        self.temp_min = temp if self.temp_min is None else min(self.temp_min, temp)
+        self.temp_max = temp if self.temp_max is None else max(self.temp_max, temp)
+        self.soma_temp += temp
 
+    def ultimas(self, k=5):
+        """DataFrame só com as k últimas leituras."""
+        inicio = max(0, self.n - k)
+        return pd.DataFrame({nome: coluna[inicio:self.n] for nome, coluna in self.colunas.items()},
+                            index=range(inicio, self.n))
 
+    def resumo(self):
+        return (f'{self.n} leituras | Temperatura mín {self.temp_min:.2f} / '
+                f'média {self.soma_temp / self.n:.2f} / máx {self.temp_max:.2f} ºC')
+
+    def dataframe(self):
+        """DataFrame completo; chame uma vez, no fim da coleta."""
+        return pd.DataFrame({nome: coluna[:self.n] for nome, coluna in self.colunas.items()})
+
+if __name__ == '__main__':
+    COLETOR = Coletor(3600)
+    intervalo, anterior = INTERVALO, None
+    try:
+        for i in range(3600):
+            intervalo, anterior = Iteracao(COLETOR, i, intervalo, anterior, f'http://{IP}')
+            time.sleep(intervalo) # 5 s (ou INTERVALO_MIN a INTERVALO_MAX no modo adaptativo)
+    finally:
+        FecharLog() # grava o que ainda estiver no buffer, mesmo com Ctrl+C ou erro
+
+    DB = COLETOR.dataframe()
+    print(DB)
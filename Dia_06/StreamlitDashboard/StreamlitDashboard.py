@@ -1,7 +1,17 @@
+import os
+from functools import partial
 import streamlit as st
+import numpy as np
 import pandas as pd
-import requests
-from io import BytesIO
+
+# downsample, rollups, sqlite_store, parquet_archive e ring_buffer são cópias dos módulos do
+# dashboard Dash (pasta Dia_06): esta pasta é publicada sozinha. Ao alterar lá, copie para cá.
+from downsample import downsample
+from rollups import Rollups
+from incremental_csv import IncrementalCSV
+from typed_csv import read_typed_csv
+from stale_cache import StaleWhileRevalidate
+from sqlite_store import SQLiteStore
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -16,51 +26,161 @@ st.markdown("Este webapp exibe dados de sensores coletados em tempo real a parti
 
 # --- Carregamento de Dados com Cache ---
 URL_CSV = "https://docs.google.com/spreadsheets/d/e/2PACX-1vR5w6OFL_o3ZKj7Awz46cIvmKZsSpXgW35NeWWbjgbSDSC8FGo125-hXs4-hOmihvC-IFXuLKcZ2C6o/pub?gid=859827063&single=true&output=csv"
+PASTA_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_planilha")  # última cópia do CSV
+# Fonte local (opcional): o mesmo banco SQLite / pasta Parquet gravados pelo dashboard Dash.
+# Com uma delas definida, a página lê direto dali, sem passar pelo Google Forms/Sheets.
+HISTORY_DB = os.getenv("HISTORY_DB", "")
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "")
+ESP32_IP = os.getenv("ESP32_IP", "10.62.155.158")  # placa cujo histórico é exibido
+LOJA_LOCAL = bool(HISTORY_DB or ARCHIVE_DIR)
+LIMITE_PONTOS = 2000  # máximo de pontos por curva enviados ao navegador
+PERIODOS = {
+    "Tudo": None,
+    "Última hora": pd.Timedelta(hours=1),
+    "Últimas 24 horas": pd.Timedelta(days=1),
+    "Últimos 7 dias": pd.Timedelta(days=7),
+}
+
+def ler_csv(dados_bytes):
+    """
+    Converte o CSV da planilha (cabeçalho + linhas) num DataFrame indexado pelo horário.
+    Tipos e formato do carimbo são fixos (typed_csv.SCHEMA / TIME_FORMAT): cada coluna
+    é convertida uma vez, já na leitura, e linhas com valor faltando ou inválido saem.
+    """
+    return read_typed_csv(dados_bytes)
+
+@st.cache_resource
+def fonte_csv(url):
+    """
+    Carregador incremental compartilhado por todas as sessões (guarda ETag e linhas já lidas).
+    """
+    return IncrementalCSV(url, ler_csv, snapshot_dir=PASTA_SNAPSHOT)
+
+@st.cache_resource
+def cache_dados():
+    """
+    Cache compartilhado: serve o último DataFrame bom e atualiza em segundo plano a cada 3 minutos.
+    """
+    return StaleWhileRevalidate(ttl=180)
+
+def atualizar_planilha(fonte, anterior):
+    """
+    Roda fora da página (thread do cache): baixa o que mudou e recalcula os agregados.
+    """
+    df = fonte.load()
+    if anterior is not None and anterior[0] is df:
+        return anterior  # planilha igual (304): nada a recalcular
+    return df, agregar_dados(df)
 
-@st.cache_data(ttl=180 ) # Cache expira a cada 3 minutos
 def carregar_dados(url):
     """
     Busca os dados da URL do Google Sheets e os carrega em um DataFrame Pandas.
+    Só a primeira carga espera pela rede; depois a página usa o último resultado
+    enquanto o cache baixa (só o que mudou) em segundo plano.
     """
     try:
-        resposta = requests.get(url)
-        resposta.raise_for_status()
-        dados_bytes = resposta.content
-        df = pd.read_csv(BytesIO(dados_bytes), index_col=0)
-        
-        # --- Limpeza e Preparação dos Dados ---
-        df.index = pd.to_datetime(df.index)
-        
-        # Garante que as colunas de sensores são numéricas
-        df['Temperatura'] = pd.to_numeric(df['Temperatura'], errors='coerce')
-        df['Umidade'] = pd.to_numeric(df['Umidade'], errors='coerce')
-        
-        # *** CORREÇÃO ADICIONADA AQUI ***
-        # Garante que as colunas de estado também sejam numéricas (0 ou 1)
-        df['Botao'] = pd.to_numeric(df['Botao'], errors='coerce')
-        df['Alarme'] = pd.to_numeric(df['Alarme'], errors='coerce')
-        
-        # Remove linhas onde a conversão para número falhou em colunas essenciais
-        df.dropna(subset=['Temperatura', 'Umidade', 'Botao', 'Alarme'], inplace=True)
-        
-        return df
+        return cache_dados().get(url, partial(atualizar_planilha, fonte_csv(url)))
     except Exception as e:
         st.error(f"Ocorreu um erro ao carregar ou processar os dados: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), Rollups()
+
+@st.cache_resource
+def loja_local():
+    """
+    Banco SQLite (preferido: recebe as amostras em até 1 s) ou arquivo Parquet (por hora).
+    O banco é aberto só para leitura: quem grava é o dashboard Dash.
+    """
+    if HISTORY_DB:
+        return SQLiteStore(HISTORY_DB, read_only=True)
+    from parquet_archive import ParquetArchive  # requer pyarrow
+    return ParquetArchive(ARCHIVE_DIR)
+
+def carregar_loja(inicio):
+    """
+    Lê da fonte local só as amostras a partir de `inicio` (o filtro de tempo vai na consulta).
+    """
+    try:
+        loja = loja_local()
+    except FileNotFoundError:
+        st.error(f"Banco {HISTORY_DB} não encontrado. Confira HISTORY_DB ou inicie o dashboard Dash, que cria o banco.")
+        st.stop()
+    ler = loja.query if HISTORY_DB else loja.read
+    cols = ler(ESP32_IP, start=inicio)
+    df = pd.DataFrame({
+        'Temperatura': cols['temperatura'],
+        'Umidade': cols['umidade'],
+        'Botao': cols['botao'],
+        'Motor': cols['motor'],
+        'Alarme': cols['alarme'],
+    }, index=pd.DatetimeIndex(cols['timestamp'], name='DataHora'))
+    return df.dropna(subset=['Temperatura', 'Umidade'])
+
+def agregar_dados(df):
+    """
+    Agregados de 1 s / 1 min / 1 h (mín, máx, média, ciclo de trabalho), calculados uma vez por carga.
+    """
+    rollups = Rollups()
+    if not df.empty:
+        rollups.extend({
+            'timestamp': df.index.values,
+            'temperatura': df['Temperatura'].values,
+            'umidade': df['Umidade'].values,
+            'botao': df['Botao'].values,
+            'motor': df['Motor'].values if 'Motor' in df else np.zeros(len(df)),
+            'alarme': df['Alarme'].values,
+        })
+    return rollups
+
+# Período exibido (na fonte local, também limita o que é lido)
+periodo = PERIODOS[st.selectbox("Período", list(PERIODOS), index=1 if LOJA_LOCAL else 0)]
 
 # Carrega os dados
-df = carregar_dados(URL_CSV)
+if LOJA_LOCAL:
+    df, rollups = carregar_loja(pd.Timestamp.now() - periodo if periodo is not None else None), None
+    st.caption(f"🗄️ Fonte local: {HISTORY_DB or ARCHIVE_DIR} · placa {ESP32_IP} · {len(df)} amostras no período")
+else:
+    df, rollups = carregar_dados(URL_CSV)
+
+    # Botão para recarregar: só esta planilha, em segundo plano (a página segue com os dados atuais)
+    if st.button('Recarregar Dados Agora'):
+        cache_dados().invalidate(URL_CSV, partial(atualizar_planilha, fonte_csv(URL_CSV)))
 
-# Botão para recarregar
-if st.button('Recarregar Dados Agora'):
-    st.cache_data.clear()
-    st.rerun()
+    # Idade dos dados servidos
+    situacao = cache_dados().status(URL_CSV)
+    if situacao['age'] is not None:
+        idade = f"{situacao['age']:.0f} s" if situacao['age'] < 120 else f"{situacao['age'] / 60:.0f} min"
+        aviso = f"🕒 Dados verificados há {idade}"
+        if not df.empty:
+            aviso += f" · última leitura: {df.index[-1]:%d/%m/%Y %H:%M:%S}"
+        if situacao['refreshing']:
+            aviso += " · atualizando…"
+        st.caption(aviso)
+        if situacao['error']:
+            st.warning(f"A última atualização falhou ({situacao['error']}); mostrando os dados anteriores.")
 
 # --- Exibição dos Dados ---
 if not df.empty:
     st.header("🌡️ Gráfico de Temperatura e Umidade")
     st.write("Visualização da variação dos sensores ao longo do tempo.")
-    st.line_chart(df[['Temperatura', 'Umidade']])
+    inicio = df.index[-1] - periodo if periodo is not None else df.index[0]
+    dados_grafico = df[['Temperatura', 'Umidade']].iloc[df.index.searchsorted(inicio):]
+    resolucao = None
+    if len(dados_grafico) > LIMITE_PONTOS:
+        # Período longo: usa os agregados, na resolução mais fina que cabe no gráfico
+        if rollups is None:
+            rollups = agregar_dados(df)  # fonte local: só da janela lida
+        resolucao = rollups.resolution_for(inicio, max_points=LIMITE_PONTOS)
+        resumo = rollups.to_frame(resolucao, inicio).set_index('timestamp')
+        dados_grafico = resumo[['temperatura_mean', 'umidade_mean']].rename(
+            columns={'temperatura_mean': 'Temperatura', 'umidade_mean': 'Umidade'})
+        st.caption(f"Média a cada {resolucao}.")
+    if len(dados_grafico) > LIMITE_PONTOS:
+        # Reduz cada curva com LTTB (mantém os picos) e junta os pontos escolhidos
+        x = dados_grafico.index.values
+        pontos = np.union1d(downsample(x, dados_grafico['Temperatura'].values, LIMITE_PONTOS),
+                            downsample(x, dados_grafico['Umidade'].values, LIMITE_PONTOS))
+        dados_grafico = dados_grafico.iloc[pontos]
+    st.line_chart(dados_grafico)
 
     # --- Exibição dos Estados do Botão e Alarme ---
     st.header("🚦 Status Atuais (Última Leitura)")
@@ -86,8 +206,19 @@ if not df.empty:
         else:
             st.error("Desligado") # Vermelho
 
+    if resolucao:
+        with st.expander(f"Ver Resumo a cada {resolucao}"):
+            colunas = ['samples']
+            if LOJA_LOCAL:
+                # Banco/Parquet só têm as amostras que passaram pela compressão do dashboard Dash:
+                # contagens e ciclo de trabalho refeitos delas não valem (mín/máx/média sim)
+                colunas += [c for c in resumo.columns if c.endswith(('_count', '_duty'))]
+            st.dataframe(resumo.drop(columns=colunas))
+
     with st.expander("Ver Tabela de Dados Completa"):
         st.dataframe(df)
+elif LOJA_LOCAL:
+    st.warning("Sem amostras no período. Verifique se o dashboard Dash está gravando nesta fonte.")
 else:
     st.warning("Não foi possível carregar os dados. Verifique a URL e sua conexão com a internet.")
 
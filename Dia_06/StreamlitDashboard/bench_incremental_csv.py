@@ -0,0 +1,119 @@
+"""
+Teste/benchmark do IncrementalCSV contra um servidor local que imita o CSV
+publicado do Google Sheets e cresce a cada rodada.
+
+Confere, em cada etapa, que o DataFrame incremental é igual ao de uma
+leitura completa, e compara o tempo das duas:
+  1. primeira carga (completa)
+  2. nada mudou -> 304
+  3. linhas novas no fim -> só elas são interpretadas
+  4. uma linha antiga editada -> leitura completa
+  5. servidor sem ETag/Last-Modified -> "sem mudança" e incremental pelo conteúdo
+  6. reinício com snapshot em disco -> 304 logo na primeira carga
+
+Uso: python bench_incremental_csv.py
+"""
+import hashlib
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import numpy as np
+import pandas as pd
+from incremental_csv import IncrementalCSV
+
+ROWS = 200_000
+NEW_ROWS = 20
+
+
+class Planilha:
+    """CSV em memória que só cresce (como as respostas de um Google Form)."""
+    def __init__(self, rows):
+        self.start = pd.Timestamp("2026-10-01")
+        self.rows = 0
+        self.body = b"Carimbo,Temperatura,Umidade,Botao,Alarme"
+        self.validators = True
+        self.modified = time.time()
+        self.grow(rows)
+
+    def grow(self, n):
+        i = np.arange(self.rows, self.rows + n)
+        ts = (self.start + pd.to_timedelta(i * 5, unit="s")).strftime("%Y-%m-%d %H:%M:%S")
+        lines = [f"{t},{25 + np.sin(k / 500):.2f},{60 + np.cos(k / 700):.2f},{k % 2},{int(k % 13 == 0)}"
+                 for t, k in zip(ts, i)]
+        self.body += ("\r\n" + "\r\n".join(lines)).encode()  # sem quebra de linha no fim, como o Google
+        self.rows += n
+        self.modified = time.time() + self.rows  # Last-Modified sempre avança
+
+    def etag(self):
+        return '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+
+def serve(planilha):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            etag, modified = planilha.etag(), formatdate(planilha.modified, usegmt=True)
+            if planilha.validators and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(planilha.body)))
+            if planilha.validators:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", modified)
+            self.end_headers()
+            self.wfile.write(planilha.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/pub?output=csv"
+
+
+def parse(body):
+    df = pd.read_csv(BytesIO(body), index_col=0)
+    df.index = pd.to_datetime(df.index)
+    return df
+
+
+def step(name, loader, planilha, status):
+    t0 = time.perf_counter()
+    df = loader.load()
+    t_inc = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    full = parse(planilha.body)
+    t_full = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(df, full, check_freq=False)
+    assert loader.last_status == status, (name, loader.last_status)
+    print(f"{name:<32} | {loader.last_status:<11} | {loader.rows_parsed:>7} linhas | "
+          f"{t_inc * 1000:>7.1f} ms | leitura completa {t_full * 1000:>6.1f} ms")
+
+
+if __name__ == "__main__":
+    planilha = Planilha(ROWS)
+    server, url = serve(planilha)
+    snapshot_dir = tempfile.mkdtemp()
+    loader = IncrementalCSV(url, parse, snapshot_dir=snapshot_dir)
+
+    step("1. primeira carga", loader, planilha, "completo")
+    step("2. sem mudança", loader, planilha, "304")
+    planilha.grow(NEW_ROWS)
+    step("3. linhas novas", loader, planilha, "incremental")
+    assert loader.rows_parsed == NEW_ROWS
+    planilha.body = planilha.body.replace(b",25.00,", b",25.01,", 1)
+    step("4. linha antiga editada", loader, planilha, "completo")
+    planilha.validators = False
+    step("5a. sem validadores, igual", loader, planilha, "sem mudança")
+    planilha.grow(NEW_ROWS)
+    step("5b. sem validadores, cresceu", loader, planilha, "incremental")
+    planilha.validators = True
+    loader.load()  # guarda o ETag novo no snapshot
+    step("6. reinício com snapshot", IncrementalCSV(url, parse, snapshot_dir=snapshot_dir), planilha, "304")
+    server.shutdown()
+    print("ok")
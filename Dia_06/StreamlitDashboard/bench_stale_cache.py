@@ -0,0 +1,64 @@
+"""
+Teste/benchmark do StaleWhileRevalidate com uma fonte lenta (1 s por carga).
+
+Simula 3 s de "cargas de página" seguidas e confere que só a primeira
+espera pela fonte; as demais leem o valor em memória enquanto as
+atualizações rodam em segundo plano. Também confere a invalidação por
+fonte e que uma falha mantém o valor antigo.
+
+Uso: python bench_stale_cache.py
+"""
+import time
+from stale_cache import StaleWhileRevalidate
+
+DELAY = 1.0
+
+
+class SlowSource:
+    def __init__(self):
+        self.version = 0
+        self.fail = False
+
+    def __call__(self, previous):
+        time.sleep(DELAY)
+        if self.fail:
+            raise ConnectionError("fonte fora do ar")
+        self.version += 1
+        return self.version
+
+
+if __name__ == "__main__":
+    cache = StaleWhileRevalidate(ttl=0.5, retry_delay=0.5)
+    a, b = SlowSource(), SlowSource()
+
+    t0 = time.perf_counter()
+    assert cache.get("a", a) == 1
+    print(f"primeira carga: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    latencies, seen = [], set()
+    end = time.perf_counter() + 3
+    while time.perf_counter() < end:
+        t = time.perf_counter()
+        seen.add(cache.get("a", a))
+        latencies.append(time.perf_counter() - t)
+        time.sleep(0.01)
+    latencies.sort()
+    print(f"{len(latencies)} cargas seguintes: p50 {latencies[len(latencies) // 2] * 1e6:.0f} us | "
+          f"máx {latencies[-1] * 1000:.2f} ms | versões vistas {sorted(seen)}")
+    assert latencies[-1] < 0.05 and len(seen) > 1
+
+    # Invalidação por fonte: "b" não é afetada por "a"
+    cache.get("b", b)
+    cache.invalidate("a", a)
+    assert cache.status("a")['refreshing'] and not cache.status("b")['refreshing']
+
+    # Falha: continua servindo o valor antigo e mostra o erro
+    time.sleep(DELAY + 0.1)
+    a.fail = True
+    before = cache.get("a", a)
+    cache.invalidate("a", a)
+    time.sleep(DELAY + 0.1)
+    status = cache.status("a")
+    assert cache.get("a", a) == before and isinstance(status['error'], ConnectionError)
+    print(f"falha: valor {before} mantido, idade {status['age']:.1f} s, erro: {status['error']}")
+    print("ok")
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+import pandas as pd
+import requests
+
+# ----------------------------
+# Leitura incremental do CSV publicado
+# ----------------------------
+class IncrementalCSV:
+    """Baixa o CSV só quando ele mudou e interpreta só as linhas novas.
+
+    - Envia If-None-Match / If-Modified-Since quando o servidor deu ETag /
+      Last-Modified; um 304 devolve o DataFrame em memória sem baixar nada.
+    - Se o CSV novo começa com o conteúdo anterior (planilha só cresce),
+      só o pedaço acrescentado é interpretado e somado ao DataFrame.
+    - Se alguma linha antiga mudou, interpreta tudo de novo.
+
+    `parse(bytes)` recebe um CSV (com cabeçalho) e devolve um DataFrame
+    indexado pelo horário. Com `snapshot_dir`, o último CSV e os
+    validadores ficam em disco e sobrevivem a reinícios.
+    """
+    def __init__(self, url, parse, snapshot_dir=None, timeout=10):
+        self.url = url
+        self.parse = parse
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._lock = threading.Lock()  # várias sessões do Streamlit podem chamar load() juntas
+        self._path = None
+        if snapshot_dir:
+            name = hashlib.sha1(url.encode()).hexdigest()[:12]
+            self._path = os.path.join(snapshot_dir, f"planilha-{name}")
+        self.frame = None
+        self.etag = None
+        self.last_modified = None
+        self._size = 0            # bytes do CSV já interpretados
+        self._digest = None       # sha1 desses bytes
+        self._header = b""
+        # Métricas
+        self.last_status = None   # "304", "sem mudança", "incremental" ou "completo"
+        self.rows_parsed = 0      # linhas interpretadas na última carga
+        self.bytes_parsed = 0
+        self._load_snapshot()
+
+    # ----- snapshot em disco -----
+    def _load_snapshot(self):
+        if not self._path or not os.path.exists(self._path + ".csv"):
+            return
+        try:
+            with open(self._path + ".csv", "rb") as f:
+                body = f.read()
+            with open(self._path + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._replace(body)
+            self.etag, self.last_modified = meta.get("etag"), meta.get("last_modified")
+        except (OSError, ValueError):
+            self.frame = None  # snapshot corrompido: baixa tudo na próxima carga
+
+    def _save_snapshot(self, body=None):
+        """Grava os validadores e, se `body` vier, o CSV."""
+        if not self._path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            if body is not None:
+                with open(self._path + ".csv.tmp", "wb") as f:
+                    f.write(body)
+                os.replace(self._path + ".csv.tmp", self._path + ".csv")
+            with open(self._path + ".json", "w", encoding="utf-8") as f:
+                json.dump({"etag": self.etag, "last_modified": self.last_modified}, f)
+        except OSError:
+            pass  # disco somente leitura: segue só com a memória
+
+    # ----- carga -----
+    def load(self):
+        """DataFrame atualizado; baixa e interpreta só o necessário."""
+        with self._lock:
+            headers = {}
+            if self.frame is not None:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+            response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                self.last_status, self.rows_parsed, self.bytes_parsed = "304", 0, 0
+                return self.frame
+            response.raise_for_status()
+            body = response.content
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            if self.frame is not None and len(body) == self._size and self._same_prefix(body):
+                # Mesmo conteúdo (servidor sem ETag/Last-Modified): nada a interpretar
+                if validators != (self.etag, self.last_modified):
+                    self.etag, self.last_modified = validators
+                    self._save_snapshot()
+                self.last_status, self.rows_parsed, self.bytes_parsed = "sem mudança", 0, 0
+                return self.frame
+            self.etag, self.last_modified = validators
+            if self.frame is not None and self._is_append(body):
+                self._append(body)
+            else:
+                self._replace(body)
+            self._save_snapshot(body)
+            return self.frame
+
+    def _is_append(self, body):
+        # O pedaço novo precisa começar numa linha nova (e não completar a última)
+        at_line_start = body[self._size - 1:self._size] == b"\n" or body[self._size:self._size + 1] in (b"\r", b"\n")
+        return len(body) > self._size and at_line_start and self._same_prefix(body)
+
+    def _same_prefix(self, body):
+        return hashlib.sha1(body[:self._size]).hexdigest() == self._digest
+
+    def _replace(self, body):
+        self.frame = self.parse(body)
+        self._header = body.split(b"\n", 1)[0] + b"\n"
+        self._remember(body)
+        self.last_status, self.rows_parsed, self.bytes_parsed = "completo", len(self.frame), len(body)
+
+    def _append(self, body):
+        tail = body[self._size:]
+        self._remember(body)
+        # O prefixo é idêntico ao já lido, então toda linha do pedaço é nova,
+        # mesmo com o horário igual (ou anterior) ao da última linha vista
+        new = self.parse(self._header + tail.lstrip(b"\r\n"))
+        if len(new):
+            frame = pd.concat([self.frame, new])
+            if not frame.index.is_monotonic_increasing:
+                frame.sort_index(inplace=True, kind='stable')  # mesma ordem da leitura completa
+            self.frame = frame
+        self.last_status, self.rows_parsed, self.bytes_parsed = "incremental", len(new), len(tail)
+
+    def _remember(self, body):
+        self._size = len(body)
+        self._digest = hashlib.sha1(body).hexdigest()
@@ -0,0 +1,249 @@
+"""
+Arquivo de longo prazo das amostras em Parquet, particionado por placa e dia.
+
+    <raiz>/device=<placa>/date=AAAA-MM-DD/hora-HH-<id>.parquet   (arquivos pequenos)
+    <raiz>/device=<placa>/date=AAAA-MM-DD/dia.parquet            (depois da compactação)
+
+Uso pela linha de comando:
+    python parquet_archive.py importar dados.jsonl --dispositivo 10.57.216.79
+    python parquet_archive.py compactar
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ring_buffer import FIELDS
+
+SCHEMA = pa.schema([
+    ('timestamp', pa.timestamp('us')),
+    ('temperatura', pa.float64()),
+    ('umidade', pa.float64()),
+    ('botao', pa.int8()),
+    ('motor', pa.int8()),
+    ('alarme', pa.int8()),
+])
+DAILY_FILE = "dia.parquet"
+MERGED_KEY = b"horas_juntadas"  # metadado do dia.parquet: arquivos por hora que já estão nele
+
+
+def records_to_columns(records):
+    """Lista de amostras (dict) -> {coluna: array}; campo ausente vira NaN ou 0."""
+    columns = {}
+    for name, dtype in FIELDS.items():
+        missing = np.nan if dtype.startswith('float') else 0
+        values = [r.get(name) for r in records]
+        columns[name] = np.array([missing if v is None else v for v in values], dtype=dtype)
+    return columns
+
+
+class ParquetArchive:
+    """Escreve um arquivo Parquet por placa e hora; a compactação junta as horas de cada dia.
+
+    `append` acumula as amostras em memória e grava quando a hora vira
+    (e, com `start_compaction`, também a cada `flush_interval` s).
+    `read` abre só as partições (dias) do intervalo pedido.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._pending = {}       # placa -> amostras da hora corrente
+        self._pending_hour = {}  # placa -> hora corrente (datetime64[h])
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def _device_dir(self, device):
+        return os.path.join(self.root, "device=" + re.sub(r"[^\w.-]", "_", str(device)))
+
+    def _day_dir(self, device, day):
+        return os.path.join(self._device_dir(device), f"date={day}")
+
+    # ----- escrita -----
+    def append(self, device, record: dict):
+        hour = np.datetime64(record['timestamp'], 'h')
+        with self._lock:
+            if self._pending_hour.get(device, hour) != hour:
+                self._flush_device(device)
+            self._pending.setdefault(device, []).append(record)
+            self._pending_hour[device] = hour
+
+    def flush(self):
+        """Grava em disco o que ainda está em memória (chame ao encerrar o app)."""
+        with self._lock:
+            for device in list(self._pending):
+                self._flush_device(device)
+
+    def _flush_device(self, device):
+        records = self._pending.pop(device, [])
+        self._pending_hour.pop(device, None)
+        if records:
+            self.write(device, records_to_columns(records))
+
+    def write(self, device, columns: dict):
+        """Grava várias amostras ({coluna: array}), um arquivo por hora coberta."""
+        table = pa.table({name: columns[name] for name in SCHEMA.names}, schema=SCHEMA)
+        hours = np.asarray(columns['timestamp'], dtype='datetime64[us]').astype('datetime64[h]')
+        for hour in np.unique(hours):
+            day, hh = str(hour.astype('datetime64[D]')), str(hour)[-2:]
+            directory = self._day_dir(device, day)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"hora-{hh}-{uuid.uuid4().hex[:8]}.parquet")
+            self._write_atomic(table.filter(pa.array(hours == hour)), path)
+
+    @staticmethod
+    def _write_atomic(table, path):
+        # Grava num .tmp e renomeia: quem lê nunca vê um arquivo pela metade
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _read_daily(directory, filters=None):
+        """dia.parquet de um dia (ou None) e o conjunto de arquivos por hora já juntados nele."""
+        daily = os.path.join(directory, DAILY_FILE)
+        if not os.path.exists(daily):  # dia.parquet só é substituído, nunca apagado
+            return None, set()
+        # Metadado e dados saem do mesmo arquivo aberto: se a compactação publicar
+        # outro dia.parquet no meio, a lista continua valendo para o que foi lido
+        with open(daily, 'rb') as f:
+            metadata = pq.read_schema(f).metadata or {}
+            table = pq.read_table(f, schema=SCHEMA, filters=filters)
+        return table, set(json.loads(metadata.get(MERGED_KEY, b"[]")))
+
+    # ----- compactação -----
+    def compact(self, before=None):
+        """Junta os arquivos por hora de cada dia anterior a `before` (padrão: hoje) em dia.parquet."""
+        before = str(np.datetime64(before or datetime.now(), 'D'))
+        compacted = 0
+        if not os.path.isdir(self.root):
+            return compacted
+        for device_dir in os.listdir(self.root):
+            for day_dir in os.listdir(os.path.join(self.root, device_dir)):
+                if not day_dir.startswith("date=") or day_dir[5:] >= before:
+                    continue
+                directory = os.path.join(self.root, device_dir, day_dir)
+                hourly = sorted(f for f in os.listdir(directory) if f.startswith("hora-") and f.endswith(".parquet"))
+                if not hourly:
+                    continue
+                table, merged = self._read_daily(directory)
+                new = [f for f in hourly if f not in merged]  # os outros sobraram de uma compactação interrompida
+                if new:
+                    tables = ([table] if table is not None else []) + \
+                             [pq.read_table(os.path.join(directory, f), schema=SCHEMA) for f in new]
+                    table = pa.concat_tables(tables).sort_by('timestamp')
+                    merged.update(new)
+                    table = table.replace_schema_metadata({MERGED_KEY: json.dumps(sorted(merged))})
+                    self._write_atomic(table, os.path.join(directory, DAILY_FILE))
+                # Quem lê pula as horas listadas no dia.parquet; agora elas podem sair
+                for f in hourly:
+                    os.remove(os.path.join(directory, f))
+                compacted += 1
+        return compacted
+
+    def start_compaction(self, interval=3600, flush_interval=300):
+        """Numa thread em segundo plano: flush() a cada `flush_interval` s e compact() a cada `interval` s.
+
+        O flush periódico limita o que um travamento perde (sem ele a hora
+        corrente só vai ao disco quando a hora vira).
+        """
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            next_compaction = time.monotonic() + interval
+            while not self._stop.wait(flush_interval):
+                self.flush()
+                if time.monotonic() >= next_compaction:
+                    self.compact()
+                    next_compaction = time.monotonic() + interval
+
+        self._compactor = threading.Thread(target=run, name="parquet-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    # ----- leitura -----
+    def _days(self, device, first, last):
+        device_dir = self._device_dir(device)
+        days = []
+        if os.path.isdir(device_dir):
+            for day_dir in sorted(os.listdir(device_dir)):
+                day = day_dir[5:]
+                if (first and day < first) or (last and day > last):
+                    continue  # partição fora do intervalo: nem abre
+                days.append(os.path.join(device_dir, day_dir))
+        return days
+
+    def _read_day(self, directory, filters):
+        # dia.parquet primeiro; depois só as horas que ainda não entraram nele
+        table, merged = self._read_daily(directory, filters)
+        tables = [table] if table is not None else []
+        for f in sorted(os.listdir(directory)):
+            if f.startswith("hora-") and f.endswith(".parquet") and f not in merged:
+                tables.append(pq.read_table(os.path.join(directory, f), schema=SCHEMA, filters=filters))
+        return tables
+
+    def read(self, device, start=None, end=None):
+        """Amostras de `device` com start <= timestamp < end, como {coluna: array}."""
+        first = str(np.datetime64(start, 'D')) if start is not None else None
+        last = str(np.datetime64(end, 'D')) if end is not None else None
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', pa.scalar(np.datetime64(start, 'us'), type=pa.timestamp('us'))))
+        if end is not None:
+            filters.append(('timestamp', '<', pa.scalar(np.datetime64(end, 'us'), type=pa.timestamp('us'))))
+        for attempt in range(3):
+            try:
+                tables = [table for directory in self._days(device, first, last)
+                          for table in self._read_day(directory, filters or None)]
+                break
+            except FileNotFoundError:
+                # A compactação apagou um arquivo no meio da leitura: lista de novo
+                if attempt == 2:
+                    raise
+        table = pa.concat_tables(tables).sort_by('timestamp') if tables else SCHEMA.empty_table()
+        return {name: table.column(name).to_numpy() for name in SCHEMA.names}
+
+    def import_jsonl(self, path, device):
+        """Importa o log JSON Lines do Dia_04/jsonread.py (ARQUIVO_LOG)."""
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                records.append({
+                    # DataHora vem com fuso de São Paulo; guardamos o horário local, como o dashboard
+                    'timestamp': datetime.fromisoformat(item['DataHora']).replace(tzinfo=None),
+                    'temperatura': item.get('Temperatura'),
+                    'umidade': item.get('Umidade'),
+                    'botao': item.get('Botao', 0),
+                    'motor': item.get('Motor', 0),
+                    'alarme': item.get('Alarme', 0),
+                })
+        if records:
+            self.write(device, records_to_columns(records))
+        return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquivo Parquet das amostras do ESP32")
+    parser.add_argument("comando", choices=["importar", "compactar"])
+    parser.add_argument("arquivo", nargs="?", help="log JSON Lines a importar")
+    parser.add_argument("--dispositivo", default="10.57.216.79")
+    parser.add_argument("--destino", default=os.getenv("ARCHIVE_DIR", "arquivo_parquet"))
+    args = parser.parse_args()
+
+    archive = ParquetArchive(args.destino)
+    if args.comando == "importar":
+        print(f"{archive.import_jsonl(args.arquivo, args.dispositivo)} amostras importadas")
+    else:
+        print(f"{archive.compact()} dias compactados")
@@ -0,0 +1,107 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Colunas guardadas por amostra e seus tipos
+FIELDS = {
+    'timestamp': 'datetime64[us]',
+    'temperatura': 'float64',
+    'umidade': 'float64',
+    'botao': 'int8',
+    'motor': 'int8',
+    'alarme': 'int8',
+}
+
+# ----------------------------
+# Buffer circular colunar
+# ----------------------------
+class SampleRingBuffer:
+    """Histórico de tamanho fixo com um array NumPy pré-alocado por coluna.
+
+    Cada amostra é gravada duas vezes (posição i e i + capacity). Assim as
+    últimas n amostras sempre formam uma fatia contínua e `columns()` devolve
+    views em ordem cronológica sem copiar nada. As views só valem até o
+    próximo `append`: quem lê em outra thread deve segurar o mesmo lock do
+    escritor ou copiar os arrays.
+    """
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._arrays = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in FIELDS.items()}
+        self._next = 0  # próxima posição de escrita, em [0, capacity)
+        self._size = 0
+        self.appended = 0    # total de amostras já gravadas (nunca diminui)
+        self.generation = 0  # muda a cada clear()
+        self.cleared_at = None  # horário do último clear() (datetime64[us])
+        self.latest = None      # leitura mais recente (dict), mesmo que a compressão ainda não a tenha guardado
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record: dict):
+        i, j = self._next, self._next + self.capacity
+        for name, array in self._arrays.items():
+            value = record.get(name)
+            if value is None:
+                value = np.nan if array.dtype.kind == 'f' else 0
+            array[i] = array[j] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.appended += 1
+
+    def extend(self, columns: dict):
+        """Acrescenta várias amostras de uma vez ({coluna: array}), sem laço em Python."""
+        n = len(columns['timestamp'])
+        k = min(n, self.capacity)  # só as últimas `capacity` cabem no buffer
+        positions = (self._next + np.arange(k)) % self.capacity
+        for name, array in self._arrays.items():
+            if name in columns:
+                values = np.asarray(columns[name])[n - k:]
+            else:
+                values = np.nan if array.dtype.kind == 'f' else 0
+            array[positions] = array[positions + self.capacity] = values
+        self._next = (self._next + k) % self.capacity
+        self._size = min(self._size + k, self.capacity)
+        self.appended += n
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
+        self.generation += 1
+        self.cleared_at = np.datetime64(datetime.now(), 'us')
+
+    def columns(self, last=None):
+        """Views ordenadas (mais antiga primeiro) das últimas `last` amostras."""
+        n = self._size if last is None else min(last, self._size)
+        end = self._next + self.capacity
+        return {name: array[end - n:end] for name, array in self._arrays.items()}
+
+    def columns_since(self, appended):
+        """Views das amostras gravadas depois de `appended` (ver atributo de mesmo nome).
+
+        Devolve None se parte delas já foi sobrescrita; aí é preciso reler tudo.
+        """
+        n = self.appended - appended
+        if n < 0 or n > self._size:
+            return None
+        return self.columns(n)
+
+    def read_consistent(self, read):
+        """Devolve read(), que lê views do buffer e as copia ou consome.
+
+        Num processo só, com o lock do escritor, basta chamar; a versão
+        compartilhada (SharedSampleRingBuffer) repete a leitura se o
+        escritor sobrescreveu as views no meio.
+        """
+        return read()
+
+    def to_frame(self, last=None):
+        """DataFrame com as últimas `last` amostras; o custo depende só de `last`."""
+        return pd.DataFrame(self.columns(last))
+
+    def last(self):
+        """Amostra mais recente como dict (NaN vira None), ou None se vazio."""
+        if not self._size:
+            return None
+        record = {name: column[-1].item() for name, column in self.columns(1).items()}
+        return {name: None if isinstance(value, float) and np.isnan(value) else value
+                for name, value in record.items()}
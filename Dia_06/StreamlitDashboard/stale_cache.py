@@ -0,0 +1,85 @@
+import threading
+import time
+
+# ----------------------------
+# Cache "stale-while-revalidate"
+# ----------------------------
+class _Entry:
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None    # time.time() da última carga boa
+        self.error = None        # erro da última tentativa (o valor antigo continua valendo)
+        self.stale = False       # invalidado: atualizar na próxima oportunidade
+        self.retry_at = 0.0      # depois de uma falha, espera antes de tentar de novo
+        self.refreshing = None   # thread de atualização em andamento
+        self.first_load = threading.Lock()
+
+
+class StaleWhileRevalidate:
+    """Guarda o último valor bom de cada fonte e o atualiza em segundo plano.
+
+    `get` só espera pela rede na primeira carga de uma fonte; depois devolve
+    sempre o valor em memória e, se ele passou de `ttl` segundos (ou foi
+    invalidado), dispara uma atualização numa thread. Se a atualização
+    falhar, o valor antigo continua sendo servido e o erro fica em `status`.
+
+    `loader(anterior)` recebe o valor atual (None na primeira vez) e devolve
+    o novo; pode devolver o próprio `anterior` quando nada mudou.
+    """
+    def __init__(self, ttl=180, retry_delay=30):
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        with self._lock:
+            return self._entries.setdefault(key, _Entry())
+
+    def get(self, key, loader):
+        entry = self._entry(key)
+        if entry.loaded_at is None:
+            with entry.first_load:  # várias sessões na primeira carga: só uma baixa
+                if entry.loaded_at is None:
+                    self._load(entry, loader, raise_errors=True)
+            return entry.value
+        now = time.time()
+        if (entry.stale or now - entry.loaded_at > self.ttl) and now >= entry.retry_at:
+            self._refresh(entry, loader)
+        return entry.value
+
+    def invalidate(self, key, loader=None):
+        """Marca `key` como velha; com `loader`, já começa a atualizar em segundo plano."""
+        entry = self._entry(key)
+        entry.stale, entry.retry_at = True, 0.0
+        if loader and entry.loaded_at is not None:
+            self._refresh(entry, loader)
+
+    def status(self, key):
+        """Idade (s) do valor servido, se há atualização em andamento e o último erro."""
+        entry = self._entry(key)
+        return {
+            'age': None if entry.loaded_at is None else time.time() - entry.loaded_at,
+            'refreshing': entry.refreshing is not None,
+            'error': entry.error,
+        }
+
+    def _refresh(self, entry, loader):
+        with self._lock:
+            if entry.refreshing is not None:
+                return
+            entry.refreshing = threading.Thread(target=self._load, args=(entry, loader),
+                                                name="cache-refresh", daemon=True)
+        entry.refreshing.start()
+
+    def _load(self, entry, loader, raise_errors=False):
+        try:
+            value = loader(entry.value)
+            entry.value, entry.loaded_at, entry.error, entry.stale = value, time.time(), None, False
+        except Exception as e:  # rede, HTTP, CSV inválido...: mantém o valor antigo
+            entry.error, entry.retry_at = e, time.time() + self.retry_delay
+            if raise_errors:
+                raise
+        finally:
+            if entry.refreshing is threading.current_thread():
+                entry.refreshing = None
@@ -0,0 +1,114 @@
+import csv
+from io import BytesIO
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow é opcional: sem ele, usa o leitor C do pandas
+    pa = pa_csv = None
+
+# Colunas da planilha (a primeira é o carimbo de data/hora) e o tipo final de cada uma
+SCHEMA = {'Temperatura': 'float64', 'Umidade': 'float64', 'Botao': 'int8', 'Alarme': 'int8'}
+TIME_FORMAT = "%d/%m/%Y %H:%M:%S"  # carimbo do Google Forms em pt-BR
+
+# ----------------------------
+# Leitura tipada do CSV da planilha
+# ----------------------------
+def read_typed_csv(data, schema=SCHEMA, time_format=TIME_FORMAT, engine="auto"):
+    """CSV (bytes) -> DataFrame indexado pelo horário, com os tipos de `schema`.
+
+    Tipos e formato de data são fixos, então cada coluna é convertida uma
+    única vez, já na leitura. Linhas com horário ou valor faltando são
+    descartadas. Se alguma célula não for número/data válida, cai no
+    caminho tolerante, que converte com errors='coerce'; se a maioria dos
+    horários não seguir `time_format`, eles são lidos pelo parser flexível.
+    `engine`: "pyarrow", "c" ou "auto" (pyarrow, se instalado).
+    """
+    time_col = next(csv.reader([data.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")]))[0]
+    if engine == "auto":
+        engine = "pyarrow" if pa_csv else "c"
+    try:
+        if engine == "pyarrow":
+            times, cols = _read_arrow(data, time_col, schema, time_format)
+        else:
+            times, cols = _read_c(data, time_col, schema, time_format)
+    except ValueError:  # inclui pyarrow.ArrowInvalid
+        times, cols = _read_tolerant(data, time_col, schema, time_format)
+    return _finish(times, cols, time_col, schema)
+
+
+def _read_arrow(data, time_col, schema, time_format):
+    options = pa_csv.ConvertOptions(
+        include_columns=[time_col, *schema],
+        column_types={time_col: pa.timestamp('s'), **{name: pa.float64() for name in schema}},
+        timestamp_parsers=[time_format],
+    )
+    table = pa_csv.read_csv(pa.BufferReader(data), convert_options=options)
+    return (table.column(time_col).to_numpy(),
+            {name: table.column(name).to_numpy() for name in schema})
+
+
+def _read_c(data, time_col, schema, time_format):
+    df = pd.read_csv(BytesIO(data), usecols=[time_col, *schema], dtype={name: 'float64' for name in schema})
+    return _parse_times(df[time_col], time_format), {name: df[name].values for name in schema}
+
+
+def _parse_times(values, time_format):
+    if time_format == TIME_FORMAT:
+        times = _parse_dmy(values.values)
+    else:
+        times = pd.to_datetime(values, format=time_format, errors='coerce').values
+    # Se a maioria das células preenchidas não bate com o formato (planilha em
+    # outra localidade, com fração de segundo...), não descarta tudo em silêncio:
+    # refaz com o parser flexível do pandas, dia antes do mês.
+    if np.isnat(times).sum() * 2 > values.notna().sum():
+        times = pd.to_datetime(values, format='mixed', dayfirst=True, errors='coerce').values.astype('datetime64[s]')
+    return times
+
+
+def _parse_dmy(values):
+    """"dd/mm/aaaa hh:mm:ss" -> datetime64[s] com contas sobre os bytes (sem strptime).
+
+    O formato tem largura fixa, então cada dígito está numa posição
+    conhecida. Célula vazia ou fora do formato vira NaT.
+    """
+    # Um caractere a mais que o formato: célula mais longa não é truncada até
+    # parecer válida. Como cada posição é conferida, acento e afins viram NaT.
+    codes = np.asarray(values, dtype='U20').view(np.uint32).reshape(len(values), 20).astype(np.int64)
+    chars = codes[:, :19]
+    digits = chars - ord('0')
+    valid = (codes[:, 19] == 0) & (chars[:, [2, 5, 10, 13, 16]] == [ord(c) for c in "// ::"]).all(axis=1)
+    numbers = digits[:, [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]]
+    valid &= ((numbers >= 0) & (numbers <= 9)).all(axis=1)
+    number = lambda *pos: sum(digits[:, p] * 10 ** (len(pos) - 1 - k) for k, p in enumerate(pos))
+    day, month, year = number(0, 1), number(3, 4), number(6, 7, 8, 9)
+    hour, minute, second = number(11, 12), number(14, 15), number(17, 18)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60) & (second < 60)
+    month_start = (np.where(valid, year, 1970) - 1970).astype('datetime64[Y]') + (np.where(valid, month, 1) - 1).astype('timedelta64[M]')
+    date = month_start.astype('datetime64[D]') + (np.where(valid, day, 1) - 1).astype('timedelta64[D]')
+    valid &= date.astype('datetime64[M]') == month_start  # 31/02 e afins
+    times = date.astype('datetime64[s]') + (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+    times[~valid] = np.datetime64('NaT')
+    return times
+
+
+def _read_tolerant(data, time_col, schema, time_format):
+    df = pd.read_csv(BytesIO(data), usecols=[time_col, *schema], dtype=str)
+    return (_parse_times(df[time_col], time_format),
+            {name: pd.to_numeric(df[name], errors='coerce').astype('float64').values for name in schema})
+
+
+def _finish(times, cols, time_col, schema):
+    # Uma máscara só para todas as validações, e um único recorte
+    valid = ~np.isnat(times)
+    for values in cols.values():
+        valid &= ~np.isnan(values)
+    if not valid.all():
+        times = times[valid]
+        cols = {name: values[valid] for name, values in cols.items()}
+    df = pd.DataFrame({name: cols[name].astype(dtype) for name, dtype in schema.items()},
+                      index=pd.DatetimeIndex(times, name=time_col))
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True, kind='stable')
+    return df
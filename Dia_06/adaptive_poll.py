@@ -0,0 +1,75 @@
+import time
+
+# Limiares padrão, com os nomes de campo do JSON do ESP32
+RATES = {'Temperatura': 0.5, 'Umidade': 2.0}  # variação por minuto que conta como "mudando rápido"
+NOISE = {'Temperatura': 0.2, 'Umidade': 1.0}  # variação até isso é ruído do DHT22 (resolução + oscilação)
+TOGGLES = ('Botao', 'Motor', 'Alarme')       # qualquer mudança nestes campos é um evento
+
+# ----------------------------
+# Intervalo de leitura adaptativo
+# ----------------------------
+class AdaptivePollScheduler:
+    """Decide quanto esperar até a próxima leitura a partir da última.
+
+    - Botão/motor/alarme mudaram, ou temperatura/umidade variam mais
+      rápido que `rates` (unidades por minuto): volta para `min_interval`.
+    - Leituras estáveis (variação abaixo de metade do limiar): o intervalo
+      cresce `backoff` vezes a cada leitura, até `max_interval`.
+    - No meio disso, o intervalo não muda.
+    - Leitura que falhou (placa fora do ar): o intervalo dobra, até
+      `offline_interval`, para não insistir a cada segundo numa placa
+      que só responde com timeout.
+
+    Variações de até `noise` não contam, para o ruído do sensor não
+    manter a leitura sempre no mínimo. `next_interval(leitura, agora)`
+    aceita o horário da leitura, para simular sobre traços gravados.
+    """
+    def __init__(self, min_interval=1.0, max_interval=30.0, rates=RATES, noise=NOISE, toggles=TOGGLES, backoff=1.5,
+                 offline_interval=60.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.offline_interval = max(offline_interval, max_interval)
+        self.rates = dict(rates)
+        self.noise = dict(noise)
+        self.toggles = tuple(toggles)
+        self.backoff = backoff
+        self.interval = min_interval
+        self._last = None      # última leitura válida
+        self._last_at = None
+        # Métricas
+        self.polls = 0
+        self.fast = 0      # leituras que levaram o intervalo ao mínimo
+        self.failures = 0
+
+    def change_ratio(self, reading, now):
+        """Maior variação/limiar entre os campos analógicos desde a última leitura (>= 1: rápido)."""
+        minutes = max(now - self._last_at, 1e-6) / 60
+        ratio = 0.0
+        for field, rate in self.rates.items():
+            if reading.get(field) is None or self._last.get(field) is None:
+                continue
+            delta = abs(reading[field] - self._last[field])
+            if delta > self.noise.get(field, 0.0):
+                ratio = max(ratio, delta / minutes / rate)
+        return ratio
+
+    def next_interval(self, reading, now=None):
+        """Registra uma leitura (ou None, se falhou) e devolve o próximo intervalo em segundos."""
+        now = time.monotonic() if now is None else now
+        self.polls += 1
+        if not reading:
+            self.failures += 1
+            self.interval = min(self.interval * 2, self.offline_interval)
+            return self.interval
+        if self.interval > self.max_interval:  # placa voltou
+            self.interval = self.max_interval
+        if self._last is not None:
+            toggled = any(reading.get(field) != self._last.get(field) for field in self.toggles)
+            ratio = self.change_ratio(reading, now)
+            if toggled or ratio >= 1:
+                self.interval = self.min_interval
+                self.fast += 1
+            elif ratio < 0.5:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+        self._last, self._last_at = reading, now
+        return self.interval
@@ -0,0 +1,135 @@
+"""
+Benchmark do intervalo de leitura adaptativo (AdaptivePollScheduler).
+
+Repete um traço gravado (um valor por segundo) como se fosse a placa:
+cada leitura devolve o último registro até aquele instante. Compara a
+leitura em taxa fixa (5 s, como o dcc.Interval e o time.sleep(5) antigos,
+15 e 30 s) com a adaptativa (1 a 5 s, 1 a 15 s e 1 a 30 s):
+
+- requisições à placa e economia em relação à taxa fixa de 5 s;
+- atraso até perceber uma mudança de motor/alarme e quantos toques
+  curtos no botão passaram sem ser vistos;
+- erro da temperatura/umidade reconstruídas (interpolação linear entre
+  as leituras) contra o traço: médio no dia, médio durante os eventos
+  rápidos e máximo.
+
+Sem argumentos usa um dia simulado: ciclo diário lento, 6 aberturas de
+porta (temperatura cai 3 °C em 20 s), 4 aquecimentos (+5 °C em 5 min),
+3 banhos (umidade +20 % em 1 min),
+motor e alarme ligando/desligando e toques de 2 a 8 s no botão. Também
+aceita o log do Dia_04/jsonread.py (JSON Lines com DataHora).
+
+Uso: python bench_adaptive_poll.py [dados.jsonl]
+"""
+import sys
+import numpy as np
+import pandas as pd
+from adaptive_poll import AdaptivePollScheduler
+
+FIXED = [5.0, 15.0, 30.0]
+ADAPTIVE = [(1.0, 5.0), (1.0, 15.0), (1.0, 30.0)]  # (mínimo, máximo); 1-5 s é o padrão do dashboard
+DAY = 86400
+FIELDS = ['Temperatura', 'Umidade', 'Botao', 'Motor', 'Alarme']
+
+
+def simulated_day(seed=7):
+    rng = np.random.default_rng(seed)
+    t = np.arange(DAY, dtype=np.float64)
+    temp = 25 - 4 * np.cos(2 * np.pi * (t - 4 * 3600) / DAY)  # mínima às 4h, máxima às 16h
+    hum = 65 + 12 * np.cos(2 * np.pi * (t - 4 * 3600) / DAY)
+    fast = np.zeros(DAY, dtype=bool)  # segundos dentro de um evento rápido
+    starts = iter(rng.choice(np.arange(3600, DAY - 3600), 13, replace=False))  # um evento por início
+    for start in [next(starts) for _ in range(6)]:  # porta aberta
+        ramp = np.clip((t - start) / 20, 0, 1) - np.clip((t - start - 60) / 300, 0, 1)
+        temp -= 3 * ramp
+        fast[start:start + 360] = True
+    for start in [next(starts) for _ in range(4)]:  # aquecedor: +1 °C/min por 5 min, esfria em 30 min
+        ramp = np.clip((t - start) / 300, 0, 1) - np.clip((t - start - 300) / 1800, 0, 1)
+        temp += 5 * ramp
+        fast[start:start + 300] = True
+    for start in [next(starts) for _ in range(3)]:  # banho
+        ramp = np.clip((t - start) / 60, 0, 1) - np.clip((t - start - 600) / 1200, 0, 1)
+        hum += 20 * ramp
+        fast[start:start + 1800] = True
+    # DHT22: resolução de 0.1 e oscilação de um passo
+    temp = np.round(temp + rng.choice([-0.1, 0, 0, 0, 0.1], DAY), 1)
+    hum = np.clip(np.round(hum + rng.choice([-0.1, 0, 0, 0, 0.1], DAY), 1), 0, 100)
+    columns = {'Temperatura': temp, 'Umidade': hum}
+    for field, count, on_for in [('Motor', 8, (300, 1800)), ('Alarme', 4, (60, 600)), ('Botao', 20, (2, 8))]:
+        state = np.zeros(DAY, dtype=np.int64)
+        for start in rng.choice(DAY - 2000, count, replace=False):
+            state[start:start + rng.integers(*on_for)] = 1
+        columns[field] = state
+    return t, columns, fast
+
+
+def recorded(path):
+    df = pd.read_json(path, lines=True)
+    stamps = pd.to_datetime(df['DataHora'])
+    t = (stamps - stamps.iloc[0]).dt.total_seconds().to_numpy()
+    return t, {field: df[field].to_numpy() for field in FIELDS}, np.zeros(len(t), dtype=bool)
+
+
+def replay(t, columns, interval_fn):
+    """Instantes das leituras feitas ao longo do traço; interval_fn(leitura, agora) dá o próximo intervalo."""
+    polls, now = [], t[0]
+    while now <= t[-1]:
+        i = np.searchsorted(t, now, side='right') - 1
+        polls.append(i)
+        now += interval_fn({field: column[i].item() for field, column in columns.items()}, now)
+    return np.array(polls)
+
+
+def toggle_stats(t, columns, polls):
+    """Atraso (s) para ver cada mudança de motor/alarme e toques no botão perdidos."""
+    delays, missed, presses = [], 0, 0
+    for field in ['Motor', 'Alarme', 'Botao']:
+        state = columns[field]
+        edges = np.flatnonzero(np.diff(state)) + 1
+        for k, edge in enumerate(edges):
+            end = edges[k + 1] if k + 1 < len(edges) else len(t)
+            seen = polls[(polls >= edge) & (polls < end)]  # alguma leitura durante o novo estado?
+            if field == 'Botao':
+                presses += state[edge] == 1
+                missed += state[edge] == 1 and not len(seen)
+            elif len(seen):
+                delays.append(t[seen[0]] - t[edge])
+    return np.array(delays), missed, presses
+
+
+def reconstruction_error(t, columns, polls, mask):
+    errors = {}
+    for field in ['Temperatura', 'Umidade']:
+        rebuilt = np.interp(t, t[polls], columns[field][polls].astype(np.float64))
+        error = np.abs(rebuilt - columns[field])
+        errors[field] = (error.mean(), error.max(), error[mask].mean() if mask.any() else 0.0)
+    return errors
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        t, columns, fast = recorded(sys.argv[1])
+        print(f"Traço gravado {sys.argv[1]}: {len(t)} registros, {t[-1] / 3600:.1f} h")
+    else:
+        t, columns, fast = simulated_day()
+        print("Dia simulado: 86400 registros (1 por segundo)")
+
+    runs = [(f"fixo {interval:.0f} s", lambda reading, now, interval=interval: interval) for interval in FIXED]
+    schedules = {f"adaptativo {low:.0f}-{high:.0f} s": AdaptivePollScheduler(low, high) for low, high in ADAPTIVE}
+    runs += [(name, schedule.next_interval) for name, schedule in schedules.items()]
+
+    results = {}
+    for name, interval_fn in runs:
+        polls = replay(t, columns, interval_fn)
+        delays, missed, presses = toggle_stats(t, columns, polls)
+        errors = reconstruction_error(t, columns, polls, fast)
+        results[name] = len(polls)
+        base = results[f"fixo {FIXED[0]:.0f} s"]
+        print(f"  {name:<16} {len(polls):>6} leituras ({100 * (1 - len(polls) / base):+5.1f}% de economia) | "
+              f"motor/alarme visto em p50 {np.median(delays):4.1f} s, máx {delays.max():5.1f} s | "
+              f"botão perdido {missed}/{presses}")
+        print(" " * 19 + " | ".join(f"{field}: erro médio {mean:.3f} (nos eventos {event:.3f}), máx {worst:.2f}"
+                                    for field, (mean, worst, event) in errors.items()))
+    for name, schedule in schedules.items():
+        print(f"  {name}: {schedule.fast} leituras levaram o intervalo ao mínimo")
+    assert all(results[name] < results[runs[0][0]] for name, s in schedules.items() if s.max_interval > FIXED[0])
@@ -0,0 +1,144 @@
+"""
+Benchmark dos callbacks do Dash: tempo no servidor e bytes de resposta por interação.
+
+Sobe uma placa simulada (esp32_simulator, 50 ms por resposta), importa o
+dashboard e imita o navegador: cada interação dispara os callbacks que
+têm aquela propriedade como Input e, em cascata, os que dependem das
+saídas que mudaram. Soma o tempo de cada POST /_dash-update-component e
+o tamanho das respostas. (No v3 todo intervalo lê a placa, então
+sempre há amostra nova.)
+
+Uso: python bench_callbacks.py [dashboardESP32_v3.py] [dashboardESP32_v4.py]
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from esp32_simulator import SimulatedESP32
+
+HISTORY = 100   # amostras no histórico antes de medir
+REPEAT = 5
+
+
+class Browser:
+    """Guarda o valor das propriedades e dispara os callbacks como o dash-renderer."""
+    def __init__(self, client):
+        self.client = client
+        self.deps = client.get("/_dash-dependencies").get_json()
+        self.props = {}
+        self._walk(client.get("/_dash-layout").get_json())
+
+    def _walk(self, node):
+        if isinstance(node, list):
+            for child in node:
+                self._walk(child)
+        elif isinstance(node, dict) and "props" in node:
+            props = node["props"]
+            for name, value in props.items():
+                if "id" in props and name != "children":
+                    self.props[f"{props['id']}.{name}"] = value
+            self._walk(props.get("children"))
+
+    @staticmethod
+    def _outputs(dep):
+        return [o.split(".") for o in dep["output"].strip(".").split("...")]
+
+    def _post(self, dep, changed):
+        body = {
+            "output": dep["output"],
+            "outputs": [{"id": i, "property": p} for i, p in self._outputs(dep)],
+            "inputs": [{**i, "value": self.props.get(f"{i['id']}.{i['property']}")} for i in dep["inputs"]],
+            "state": [{**s, "value": self.props.get(f"{s['id']}.{s['property']}")} for s in dep["state"]],
+            "changedPropIds": changed,
+        }
+        if len(body["outputs"]) == 1:
+            body["outputs"] = body["outputs"][0]
+        t0 = time.perf_counter()
+        response = self.client.post("/_dash-update-component", json=body)
+        elapsed = time.perf_counter() - t0
+        updated = []
+        if response.status_code == 200:
+            for component, values in response.get_json()["response"].items():
+                for name, value in values.items():
+                    self.props[f"{component}.{name}"] = value
+                    updated.append(f"{component}.{name}")
+        return elapsed, len(response.data), updated
+
+    def interact(self, changed, initial=False):
+        """Dispara a cascata a partir de `changed`; devolve (tempo, bytes, callbacks)."""
+        total_time = total_bytes = calls = 0
+        wave = set(changed)
+        while wave or initial:
+            next_wave = set()
+            for dep in self.deps:
+                if dep.get("clientside_function"):
+                    continue  # roda no navegador, não custa nada ao servidor
+                inputs = {f"{i['id']}.{i['property']}" for i in dep["inputs"]}
+                hit = sorted(inputs & wave)
+                if not hit and not (initial and not dep.get("prevent_initial_call")):
+                    continue
+                elapsed, size, updated = self._post(dep, hit)
+                total_time, total_bytes, calls = total_time + elapsed, total_bytes + size, calls + 1
+                next_wave.update(updated)
+            wave, initial = next_wave, False
+        return total_time, total_bytes, calls
+
+    def click(self, prop):
+        self.props[prop] = (self.props.get(prop) or 0) + 1
+        return self.interact([prop])
+
+
+def load(path, board):
+    os.environ["ESP32_IP"] = board.address
+    os.environ["HISTORY_DB"] = os.path.join(tempfile.mkdtemp(), "historico.db")
+    os.environ["ROLLUPS_DIR"] = os.path.join(tempfile.mkdtemp(), "agregados")
+    os.environ["COMPRESSION"] = "0"  # toda amostra do bench tem de chegar às abas
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.esp32 = module.ESP32Controller(board.address, max_age=0)  # v3 não lê ESP32_IP
+    if hasattr(module, "sampler"):
+        module.sampler.start = lambda: None               # amostras entram pelo bench
+        module.google_uploader.submit = lambda data: None  # nada sai para o Google
+    return module
+
+
+def new_sample(module):
+    if hasattr(module, "sample_once"):
+        module.sample_once()
+    else:
+        module.update_data_history(module.esp32.get_sensor_data())
+
+
+def bench(path):
+    board = SimulatedESP32(delay=0.05, single_connection=False, keep_alive=True).start()
+    module = load(path, board)
+    client = module.server.test_client()
+    client.get("/")
+    for _ in range(HISTORY):
+        new_sample(module)
+    browser = Browser(client)
+    browser.interact([], initial=True)
+
+    interactions = {
+        "Ligar Motor": lambda: browser.click("btn-motor-on.n_clicks"),
+        "Atualizar Dados": lambda: browser.click("btn-update.n_clicks"),
+        "intervalo, sem amostra nova": lambda: browser.click("auto-update.n_intervals"),
+        "intervalo, com amostra nova": lambda: (new_sample(module), browser.click("auto-update.n_intervals"))[1],
+    }
+    if "recent-data-table.page_current" in browser.props:
+        interactions["próxima página da tabela"] = lambda: browser.click("recent-data-table.page_current")
+
+    print(os.path.basename(path))
+    for name, interaction in interactions.items():
+        results = [interaction() for _ in range(REPEAT)]
+        elapsed = sorted(r[0] for r in results)[REPEAT // 2]
+        size = sorted(r[1] for r in results)[REPEAT // 2]
+        print(f"  {name:<30} {elapsed * 1000:7.1f} ms | {size:>7} bytes | {results[-1][2]} callbacks")
+    board.stop()
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or ["dashboardESP32_v3.py", "dashboardESP32_v4.py"]:
+        bench(os.path.abspath(path))
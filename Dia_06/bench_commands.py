@@ -0,0 +1,120 @@
+"""
+Benchmark da fila de comandos dos atuadores (ActuatorCommandQueue).
+
+O usuário clica BURST vezes seguidas em ligar/desligar o motor (um
+clique a cada CLICK_GAP s), como quem não vê resposta e clica de novo.
+A placa simulada atende um cliente por vez e leva DELAY s por resposta.
+
+- direto: cada clique chama control_motor dentro do callback (uma
+  thread por requisição, como o servidor do Flask).
+- fila: o callback só chama submit; uma thread envia o último pedido
+  e um amostrador lê a placa a cada SAMPLE_INTERVAL s e confirma.
+
+Mostra o tempo de cada callback, quantos comandos chegaram à placa, se
+o estado final é o do último clique e a latência clique -> confirmação.
+
+Uso: python bench_commands.py
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from esp32_simulator import SimulatedESP32
+
+os.environ.setdefault("HISTORY_DB", "")
+from dashboardESP32_v4 import ESP32Controller
+from command_queue import ActuatorCommandQueue
+
+BURSTS = 5
+BURST = 6
+CLICK_GAP = 0.15
+DELAY = 0.4
+SAMPLE_INTERVAL = 0.5
+PAUSE = 2.0
+
+
+def bursts(click, check):
+    """Rajadas alternando ligar/desligar; depois de cada uma, uma pausa e `check(último pedido)`."""
+    results = []
+    for burst in range(BURSTS):
+        for i in range(BURST):
+            on = (burst + i) % 2 == 0
+            click(on)
+            time.sleep(CLICK_GAP)
+        time.sleep(PAUSE)
+        results.append(check(on))
+    return results
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_direct(board, controller):
+    times, threads, lock = [], [], threading.Lock()
+
+    def callback(on):
+        started = time.monotonic()
+        controller.control_motor("ligar" if on else "desligar")
+        with lock:
+            times.append(time.monotonic() - started)
+
+    def click(on):
+        threads.append(threading.Thread(target=callback, args=(on,)))
+        threads[-1].start()
+
+    def check(on):
+        for t in threads:
+            t.join()
+        return board.state["Motor"] == on
+
+    return times, bursts(click, check), None
+
+
+def run_queue(board, controller):
+    queue = ActuatorCommandQueue(lambda actuator, on: controller.control_motor("ligar" if on else "desligar"),
+                                 confirm_timeout=5 * SAMPLE_INTERVAL)
+    stop = threading.Event()
+
+    def sampler():
+        while not stop.wait(SAMPLE_INTERVAL):
+            data = controller.get_sensor_data()
+            if data:
+                queue.observe({'timestamp': datetime.now(), 'motor': data['Motor'], 'alarme': data['Alarme']})
+
+    threading.Thread(target=sampler, daemon=True).start()
+    times = []
+
+    def click(on):
+        started = time.monotonic()
+        queue.submit("motor", on)
+        times.append(time.monotonic() - started)
+
+    def check(on):
+        return queue.status("motor")[:2] == ("confirmado", on) and board.state["Motor"] == on
+
+    finals = bursts(click, check)
+    stop.set()
+    return times, finals, queue
+
+
+if __name__ == "__main__":
+    total = BURSTS * BURST
+    print(f"{BURSTS} rajadas de {BURST} cliques (um a cada {CLICK_GAP} s), placa leva {DELAY} s por resposta")
+    for name, run in [("direto", run_direct), ("fila", run_queue)]:
+        board = SimulatedESP32(delay=DELAY).start()
+        controller = ESP32Controller(board.address, max_age=0)
+        before = board.requests
+        times, finals, queue = run(board, controller)
+        requests_made = board.requests - before
+        line = (f"  {name:<7} callback p50 {percentile(times, 0.5) * 1000:7.1f} ms, max {max(times) * 1000:7.1f} ms | "
+                f"estado final certo em {sum(finals)}/{len(finals)} rajadas")
+        if queue is None:
+            print(line + f" | {requests_made} requisições (só comandos: {total})")
+        else:
+            p50, p95 = queue.latency_stats()
+            print(line + f" | {queue.sent} comandos enviados, {queue.collapsed} descartados de {total} cliques | "
+                         f"clique -> confirmação p50 {p50:.2f} s, p95 {p95:.2f} s")
+            assert all(finals) and max(times) < 0.05
+        board.stop()
@@ -0,0 +1,84 @@
+"""
+Benchmark da compressão na entrada (banda morta + porta giratória).
+
+Um dia simulado (o mesmo do bench_adaptive_poll: ciclo diário, portas,
+aquecedor, banhos, motor/alarme/botão, ruído do DHT22) lido a cada
+SAMPLE_INTERVAL s, como o amostrador do dashboard v4 em taxa fixa. Cada
+configuração passa as leituras pelo SwingingDoorCompressor e mostra:
+
+- amostras guardadas e taxa de compressão;
+- escritas que deixam de acontecer depois dele (buffer, SQLite, Parquet
+  e pontos do gráfico/tabela enviados pelo /stream): uma de cada por
+  amostra. O Google Form e o painel de leituras atuais continuam
+  recebendo todas as leituras;
+- erro máximo da curva refeita (interpolação linear) por campo, contra o
+  limite deadband + deviation; botão/motor/alarme têm de sair exatos;
+- o maior intervalo entre amostras guardadas (max_gap) e o custo por
+  leitura.
+
+Uso: python bench_compression.py
+"""
+import time
+import numpy as np
+from bench_adaptive_poll import simulated_day
+from compression import DEADBAND, DEVIATION, SwingingDoorCompressor
+
+SAMPLE_INTERVAL = 5
+DOWNSTREAM = ["buffer", "SQLite", "Parquet", "gráfico/tabela via /stream"]
+FIELDS = ['temperatura', 'umidade', 'botao', 'motor', 'alarme']
+BAND = {'temperatura': 0.2, 'umidade': 0.5}
+HALF = {'temperatura': 0.1, 'umidade': 0.25}
+CONFIGS = [  # (nome, deadband, deviation, max_gap)
+    ("só banda morta", BAND, {}, 60),
+    ("só porta giratória (padrão)", DEADBAND, DEVIATION, 60),
+    ("metade de cada", HALF, HALF, 60),
+    ("padrão, max_gap 300 s", DEADBAND, DEVIATION, 300),
+    ("apertado (0.05 °C, 0.1 %)", {}, {'temperatura': 0.05, 'umidade': 0.1}, 60),
+]
+
+
+def day_records():
+    t, columns, _ = simulated_day()
+    keep = slice(None, None, SAMPLE_INTERVAL)
+    values = {field.lower(): column[keep].tolist() for field, column in columns.items()}
+    return [{'timestamp': stamp, **{field: values[field][i] for field in FIELDS}}
+            for i, stamp in enumerate(t[keep].tolist())]
+
+
+def run(records, deadband, deviation, max_gap):
+    compressor = SwingingDoorCompressor(deadband, deviation, max_gap=max_gap)
+    kept = []
+    started = time.perf_counter()
+    for record in records:
+        kept += compressor.offer(record)
+    elapsed = time.perf_counter() - started
+    kept += compressor.flush()
+    return kept, elapsed / len(records)
+
+
+def max_errors(records, kept):
+    t = np.array([r['timestamp'] for r in records])
+    kept_t = np.array([r['timestamp'] for r in kept])
+    return {field: float(np.abs(np.interp(t, kept_t, [r[field] for r in kept]) - [r[field] for r in records]).max())
+            for field in FIELDS}
+
+
+if __name__ == "__main__":
+    records = day_records()
+    print(f"Dia simulado lido a cada {SAMPLE_INTERVAL} s: {len(records)} leituras "
+          f"(sem compressão: {len(records)} escritas em cada destino: {', '.join(DOWNSTREAM)})")
+    for name, deadband, deviation, max_gap in CONFIGS:
+        kept, per_sample = run(records, deadband, deviation, max_gap)
+        gap = np.diff([r['timestamp'] for r in kept]).max()
+        errors = max_errors(records, kept)
+        print(f"  {name:<30} {len(kept):>5} guardadas ({len(records) / len(kept):4.1f}x, "
+              f"-{100 * (1 - len(kept) / len(records)):.1f}% de escritas por destino) | "
+              f"maior intervalo entre guardadas {gap:3.0f} s | {per_sample * 1e6:4.1f} µs por leitura")
+        for field in ['temperatura', 'umidade']:
+            bound = deadband.get(field, 0) + deviation.get(field, 0)
+            print(f"      {field:<11} erro máx {errors[field]:.3f} (limite {bound:.2f})")
+            assert errors[field] <= bound + 1e-9
+        assert errors['botao'] == errors['motor'] == errors['alarme'] == 0
+        if deadband is DEADBAND and deviation is DEVIATION and max_gap == 60:
+            default = len(kept)
+    print(f"Com o padrão do dashboard: {len(records)} -> {default} linhas por dia no SQLite")
@@ -0,0 +1,34 @@
+"""
+Benchmark: LTTB e envelope mín/máx em 10 mil, 1 milhão e 10 milhões de pontos.
+
+A série imita temperatura (passeio aleatório com eixo x em datetime64) e
+o alvo é de 2000 pontos por curva. Também confere se o pico da série
+continua no resultado.
+
+Uso: python bench_downsample.py
+"""
+import time
+import numpy as np
+from downsample import lttb, minmax
+
+TARGET = 2000
+SIZES = [10_000, 1_000_000, 10_000_000]
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'pontos':>11} | {'lttb (ms)':>10} | {'minmax (ms)':>11} | pico mantido")
+    for n in SIZES:
+        x = np.datetime64("2026-10-16", "us") + np.arange(n) * np.timedelta64(1, "s")
+        y = 25 + np.cumsum(rng.normal(0, 0.01, n))
+        y[n // 3] += 5  # um pico isolado
+
+        t0 = time.perf_counter()
+        idx_lttb = lttb(x, y, TARGET)
+        t_lttb = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        idx_minmax = minmax(y, TARGET)
+        t_minmax = time.perf_counter() - t0
+
+        keeps_peak = (n // 3 in idx_lttb) and (n // 3 in idx_minmax)
+        print(f"{n:>11,} | {t_lttb * 1000:>10.1f} | {t_minmax * 1000:>11.1f} | {'sim' if keeps_peak else 'não'}")
@@ -0,0 +1,43 @@
+"""
+Benchmark: tempo de uma rodada de leitura para N placas simuladas.
+
+Compara a leitura sequencial (um requests.get por placa, como no
+ESP32Controller) com o ESP32FleetPoller assíncrono.
+
+Uso: python bench_fleet.py
+"""
+import time
+import requests
+from esp32_fleet import ESP32FleetPoller
+from esp32_simulator import SimulatedFleet
+
+RESPONSE_DELAY = 0.05   # latência simulada de cada placa (s)
+SLOW_DELAY = 1.0        # uma placa lenta por frota
+DEVICE_COUNTS = [10, 50, 100, 200]
+
+
+def sequential_round(ips):
+    for ip in ips:
+        try:
+            requests.get(f"http://{ip}", timeout=5).json()
+        except requests.exceptions.RequestException:
+            pass
+
+
+if __name__ == "__main__":
+    print(f"{'placas':>7} | {'sequencial (s)':>15} | {'asyncio (s)':>12} | {'ok':>5}")
+    for n in DEVICE_COUNTS:
+        with SimulatedFleet(n, delay=RESPONSE_DELAY) as fleet:
+            fleet.boards[0].delay = SLOW_DELAY
+            ips = fleet.addresses
+            poller = ESP32FleetPoller(ips, timeout=2.0, max_in_flight=256)
+            t0 = time.perf_counter()
+            sequential_round(ips)
+            t_seq = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            results = poller.poll()
+            t_async = time.perf_counter() - t0
+            poller.close()
+            ok = sum(1 for data in results.values() if data)
+        print(f"{n:>7} | {t_seq:>15.2f} | {t_async:>12.2f} | {ok:>5}")
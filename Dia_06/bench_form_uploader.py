@@ -0,0 +1,65 @@
+"""
+Teste do GoogleFormUploader contra um formulário local que atrasa e falha.
+
+O servidor local responde com atraso fixo e devolve 503 numa fração das
+requisições. O script mede quanto tempo o `submit` leva (deve ser ~0, já que
+não bloqueia), confere que toda amostra aceita chegou ao servidor e mostra
+as métricas de fila, descarte e latência.
+
+Uso: python bench_form_uploader.py
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from form_uploader import GoogleFormUploader
+
+FORM_DELAY = 0.2      # atraso do formulário (s)
+ERROR_RATE = 0.3      # fração de respostas 503
+SAMPLES = 300
+SUBMIT_INTERVAL = 0.005
+received = set()
+
+
+class StandInForm(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(FORM_DELAY)
+        if random.random() < ERROR_RATE:
+            self.send_response(503)
+            self.end_headers()
+            return
+        received.add(parse_qs(urlparse(self.path).query)['entry.1518093638'][0])
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInForm)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/formResponse"
+
+    uploader = GoogleFormUploader(url, lambda data: {'entry.1518093638': data['Temperatura']},
+                                  workers=4, queue_size=50, max_retries=8, base_delay=0.05, max_delay=1.0)
+    submit_times = []
+    for i in range(SAMPLES):
+        t0 = time.perf_counter()
+        uploader.submit({'Temperatura': i})
+        submit_times.append(time.perf_counter() - t0)
+        time.sleep(SUBMIT_INTERVAL)
+    uploader.join()
+    uploader.stop()
+    httpd.shutdown()
+
+    metrics = uploader.metrics()
+    print(f"submit máx: {max(submit_times) * 1000:.2f} ms")
+    for name, value in metrics.items():
+        print(f"{name:>12}: {value}")
+    accepted = SAMPLES - metrics['dropped']
+    print(f"recebidas pelo formulário: {len(received)} de {accepted} aceitas")
+    assert metrics['sent'] == len(received), "enviadas e recebidas não conferem"
+    assert metrics['sent'] + metrics['failed'] == accepted
+    assert max(submit_times) < 0.01, "submit não deveria bloquear"
@@ -0,0 +1,49 @@
+"""
+Benchmark: latência p50/p99 da leitura do ESP32 com e sem pool de conexões.
+
+Usa uma placa simulada (esp32_simulator) com keep-alive que cobra um atraso
+a cada conexão nova, imitando o custo do handshake no WebServer do ESP32.
+Compara requests.get avulso com o ESP32Controller, que reaproveita conexões.
+
+Uso: python bench_pool.py
+"""
+import time
+import requests
+from dashboardESP32_v4 import ESP32Controller
+from esp32_simulator import SimulatedESP32
+
+HANDSHAKE_DELAY = 0.01  # custo simulado de uma conexão nova (s)
+POLLS = 300
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+def measure(poll):
+    latencies = []
+    for _ in range(POLLS):
+        t0 = time.perf_counter()
+        poll()
+        latencies.append(time.perf_counter() - t0)
+    return percentiles(latencies)
+
+
+if __name__ == "__main__":
+    board = SimulatedESP32(connect_delay=HANDSHAKE_DELAY, keep_alive=True).start()
+    address = board.address
+
+    def poll_without_pool():
+        requests.get(f"http://{address}", timeout=5).json()
+
+    controller = ESP32Controller(address, max_age=0)  # sem reaproveitar leituras: toda chamada vai à placa
+    try:
+        for name, poll in [("sem pool", poll_without_pool), ("com pool", controller.get_sensor_data)]:
+            p50, p99 = measure(poll)
+            print(f"{name:>9}: p50 = {p50:6.2f} ms | p99 = {p99:6.2f} ms")
+    finally:
+        controller.session.close()  # a placa atende uma conexão por vez: solta a do pool antes de parar
+        board.stop()
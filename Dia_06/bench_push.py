@@ -0,0 +1,133 @@
+"""
+Benchmark do push de amostras (/stream, Server-Sent Events) com centenas de abas.
+
+Um processo filho roda o dashboard v4 (servidor threaded do Werkzeug) e
+publica amostras a uma taxa fixa; o processo principal abre CLIENTS
+conexões em /stream e confere se todas recebem todas as amostras, em
+ordem, e com que atraso. O CPU gasto pelo servidor é comparado com o de
+atender as mesmas abas por polling (um callback de intervalo a cada 5 s
+por aba).
+
+Uso: python bench_push.py [abas]
+"""
+import json
+import multiprocessing
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+RATE = 10        # amostras por segundo durante o teste (acelerado)
+SAMPLES = 50
+POLL_INTERVAL = 5.0  # dcc.Interval do modo antigo (s)
+
+
+def server_process(conn):
+    os.environ["HISTORY_DB"] = os.path.join(tempfile.mkdtemp(), "historico.db")
+    os.environ["ROLLUPS_DIR"] = os.path.join(tempfile.mkdtemp(), "agregados")
+    os.environ["LIVE_PUSH"] = "1"
+    os.environ["COMPRESSION"] = "0"  # toda amostra do bench tem de chegar às abas
+    import logging
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    import dashboardESP32_v4 as dashboard
+    dashboard.sampler.start = lambda: None
+    dashboard.google_uploader.submit = lambda data: None
+
+    # Custo de um callback de intervalo sem amostra nova (o polling de cada aba)
+    client = dashboard.server.test_client()
+    body = {"output": "..current-data.children...status-connection.children...sample-tick.data...reading-shown.data..",
+            "outputs": [{"id": "current-data", "property": "children"},
+                        {"id": "status-connection", "property": "children"},
+                        {"id": "sample-tick", "property": "data"},
+                        {"id": "reading-shown", "property": "data"}],
+            "inputs": [{"id": "btn-update", "property": "n_clicks", "value": 0},
+                       {"id": "auto-update", "property": "n_intervals", "value": 1},
+                       {"id": "btn-clear-graphs", "property": "n_clicks", "value": 0}],
+            "state": [{"id": "sample-tick", "property": "data", "value": [0, 0]},
+                      {"id": "status-connection", "property": "children", "value": None},
+                      {"id": "reading-shown", "property": "data", "value": None}],
+            "changedPropIds": ["auto-update.n_intervals"]}
+    assert client.post("/_dash-update-component", json=body).status_code == 200
+    started = time.process_time()
+    for _ in range(200):
+        client.post("/_dash-update-component", json=body)
+    poll_cpu = (time.process_time() - started) / 200
+
+    httpd = make_server("127.0.0.1", 0, dashboard.server, threaded=True)
+    conn.send(httpd.server_port)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    conn.recv()  # todas as abas conectadas
+    started = time.process_time()
+    for i in range(SAMPLES):
+        dashboard.update_data_history({"Temperatura": 25 + i / 10, "Umidade": 60.0, "Botao": 0, "Motor": 0, "Alarme": 0})
+        time.sleep(1 / RATE)
+    conn.recv()  # abas receberam tudo
+    conn.send((time.process_time() - started, poll_cpu, dashboard.sample_stream.clients))
+    dashboard.sample_stream.close()
+    httpd.shutdown()
+
+
+def open_clients(port, n):
+    selector = selectors.DefaultSelector()
+    for _ in range(n):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(b"GET /stream HTTP/1.0\r\nHost: localhost\r\n\r\n")
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ, {"buffer": b"", "temps": [], "delays": []})
+    return selector
+
+
+def read_events(selector, expected, timeout=30):
+    deadline = time.monotonic() + timeout
+    pending = len(selector.get_map())
+    while pending and time.monotonic() < deadline:
+        for key, _ in selector.select(timeout=1):
+            state = key.data
+            state["buffer"] += key.fileobj.recv(65536)
+            *events, state["buffer"] = state["buffer"].split(b"\n\n")
+            now = datetime.now()
+            for event in events:
+                for line in event.split(b"\n"):
+                    if line.startswith(b"data: "):
+                        sample = json.loads(line[6:])
+                        state["temps"].append(sample["temperatura"])
+                        state["delays"].append((now - datetime.fromisoformat(sample["timestamp"])).total_seconds())
+            if len(state["temps"]) == expected and not state.get("done"):
+                state["done"] = True
+                pending -= 1
+    return [key.data for key in selector.get_map().values()]
+
+
+if __name__ == "__main__":
+    conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=server_process, args=(child_conn,), daemon=True)
+    server.start()
+    port = conn.recv()
+
+    selector = open_clients(port, CLIENTS)
+    time.sleep(1.0)  # o servidor aceita as conexões
+    conn.send("go")
+    clients = read_events(selector, SAMPLES)
+    conn.send("done")
+    push_cpu, poll_cpu, connected = conn.recv()
+    server.join(5)
+
+    expected = [25 + i / 10 for i in range(SAMPLES)]
+    complete = sum(state["temps"] == expected for state in clients)
+    delays = sorted(d for state in clients for d in state["delays"])
+    print(f"{CLIENTS} abas, {SAMPLES} amostras a {RATE}/s ({connected} conexões abertas no servidor)")
+    print(f"  abas com todas as amostras, em ordem: {complete}/{CLIENTS}")
+    print(f"  atraso até a aba: p50 {delays[len(delays) // 2] * 1000:.1f} ms | p99 {delays[int(len(delays) * 0.99)] * 1000:.1f} ms")
+    # Por período de amostragem do dashboard (uma amostra a cada POLL_INTERVAL s)
+    print(f"  CPU do servidor a cada {POLL_INTERVAL:.0f} s (uma amostra):")
+    print(f"    push:    {push_cpu / SAMPLES * 1000:7.1f} ms (uma publicação, {CLIENTS} escritas de bytes prontos)")
+    print(f"    polling: {CLIENTS * poll_cpu * 1000:7.1f} ms ({CLIENTS} callbacks de {poll_cpu * 1000:.2f} ms,"
+          f" sem contar gráfico e tabela quando há amostra nova)")
+    assert complete == CLIENTS
@@ -0,0 +1,185 @@
+"""
+Benchmark do histórico compartilhado entre processos (SharedSampleRingBuffer).
+
+1. Buffer: um processo grava o mais rápido que consegue (temperatura =
+   número da amostra) enquanto READERS processos leem as últimas amostras
+   e conferem se a janela é contínua. Uma leitura em que o escritor passou
+   da folga enquanto ela era usada é descartada (`intact`); nenhuma
+   leitura aceita pode estar rasgada. Compara o tempo de leitura com
+   receber a mesma janela copiada por um Pipe.
+2. Dashboard: WORKERS servidores do dashboard v4 em processos separados,
+   como workers do gunicorn. Sem SHARED_HISTORY cada um lê a placa por
+   conta própria; com SHARED_HISTORY um processo amostrador grava e os
+   workers só leem. Mostra requisições por segundo na placa e se todos
+   os workers exibem as mesmas amostras.
+
+Uso: python bench_shared_history.py
+"""
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import numpy as np
+from esp32_simulator import SimulatedESP32
+from shared_ring_buffer import SharedSampleRingBuffer
+
+HISTORY = 100
+READERS = 3
+DURATION = 2.0
+WORKERS = 3
+SAMPLE_INTERVAL = 0.2
+
+
+# ----------------------------
+# 1. Buffer
+# ----------------------------
+def writer(path, ready):
+    history = SharedSampleRingBuffer(path, HISTORY, create=True)
+    ready.set()
+    stop = time.monotonic() + DURATION
+    i = 0
+    while time.monotonic() < stop:
+        history.append({'timestamp': np.datetime64(i, 's'), 'temperatura': float(i)})
+        i += 1
+
+
+def reader(path, results):
+    history = SharedSampleRingBuffer(path)
+    reads = discarded = torn = 0
+    elapsed = 0.0
+    stop = time.monotonic() + DURATION
+    while time.monotonic() < stop:
+        started = time.perf_counter()
+        appended = history.appended
+        cols = history.columns()
+        elapsed += time.perf_counter() - started
+        temps = cols['temperatura']
+        # Janela contínua e coerente entre colunas
+        broken = len(temps) and (np.any(np.diff(temps) != 1) or
+                                 temps[0] != cols['timestamp'][0].astype('datetime64[s]').astype(np.int64))
+        if not history.intact(appended):
+            discarded += 1
+        elif broken:
+            torn += 1
+        reads += 1
+    results.put((reads, discarded, torn, elapsed / max(reads, 1)))
+
+
+def pipe_reader(conn, n):
+    for _ in range(n):
+        conn.recv()
+
+
+def bench_buffer():
+    path = os.path.join(tempfile.mkdtemp(), "historico.shm")
+    ready, results = multiprocessing.Event(), multiprocessing.Queue()
+    w = multiprocessing.Process(target=writer, args=(path, ready))
+    w.start()
+    ready.wait()
+    readers = [multiprocessing.Process(target=reader, args=(path, results)) for _ in range(READERS)]
+    for r in readers:
+        r.start()
+    w.join()
+    for r in readers:
+        r.join()
+    stats = [results.get() for _ in readers]
+    written = SharedSampleRingBuffer(path).appended
+
+    # Mesma janela enviada por cópia (o que um processo amostrador mandaria a cada worker)
+    window = {name: column.copy() for name, column in SharedSampleRingBuffer(path).columns().items()}
+    parent, child = multiprocessing.Pipe()
+    p = multiprocessing.Process(target=pipe_reader, args=(child, 2000))
+    p.start()
+    started = time.perf_counter()
+    for _ in range(2000):
+        parent.send(window)
+    p.join()
+    pipe_time = (time.perf_counter() - started) / 2000
+
+    print(f"Buffer: {written} amostras gravadas em {DURATION:.0f} s, {READERS} leitores lendo as últimas {HISTORY}")
+    for i, (reads, discarded, torn, per_read) in enumerate(stats):
+        print(f"  leitor {i}: {reads:>6} leituras | {discarded} descartadas | {torn} rasgadas aceitas | "
+              f"{per_read * 1e6:5.1f} µs por leitura (views, sem cópia)")
+    print(f"  mesma janela copiada por Pipe: {pipe_time * 1e6:5.1f} µs por envio")
+    assert not any(torn for _, _, torn, _ in stats)
+
+
+# ----------------------------
+# 2. Dashboard em vários processos
+# ----------------------------
+SETUP = ("import os, sys; sys.path.insert(0, os.getcwd()); import dashboardESP32_v4 as m; "
+         "m.google_uploader.submit = lambda data: None; ")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def table_rows(port):
+    body = {"output": "..recent-data-table.data...recent-data-table.columns...recent-data-table.page_count...recent-data-title.children..",
+            "outputs": [{"id": "recent-data-table", "property": "data"}, {"id": "recent-data-table", "property": "columns"},
+                        {"id": "recent-data-table", "property": "page_count"}, {"id": "recent-data-title", "property": "children"}],
+            "inputs": [{"id": "sample-tick", "property": "data", "value": None},
+                       {"id": "recent-data-table", "property": "page_current", "value": 0},
+                       {"id": "graph-span", "property": "value", "value": 0}],
+            "state": [], "changedPropIds": ["sample-tick.data"]}
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/_dash-update-component", json.dumps(body).encode(),
+                                     {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)["response"]["recent-data-table"]["data"]
+
+
+def bench_dashboard(shared):
+    board = SimulatedESP32(single_connection=False).start()
+    env = dict(os.environ, ESP32_IP=board.address, HISTORY_DB="", SAMPLE_INTERVAL=str(SAMPLE_INTERVAL),
+               ESP32_MAX_AGE="0", ADAPTIVE_POLLING="0")
+    processes = []
+    env["ROLLUPS_DIR"] = ""  # independentes: cada worker teria de gravar o mesmo arquivo de agregados
+    if shared:
+        env["SHARED_HISTORY"] = os.path.join(tempfile.mkdtemp(), "historico.shm")
+        env["ROLLUPS_DIR"] = os.path.join(tempfile.mkdtemp(), "agregados")  # gravado pelo amostrador
+        sampler_env = dict(env, SAMPLER_ONLY="1")
+        processes.append(subprocess.Popen([sys.executable, "-c", SETUP + "m.run_sampler_only()"], env=sampler_env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        while not os.path.exists(env["SHARED_HISTORY"]):
+            time.sleep(0.05)
+    ports = [free_port() for _ in range(WORKERS)]
+    for port in ports:
+        processes.append(subprocess.Popen([sys.executable, "-c", SETUP + f"m.app.run(port={port})"], env=env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    try:
+        for port in ports:  # primeira requisição sobe o amostrador/leitor de cada worker
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+        start_requests = board.requests
+        time.sleep(3.0)
+        rate = (board.requests - start_requests) / 3.0
+        rows = [table_rows(port)[:10] for port in ports]
+        same = all(r == rows[0] for r in rows)
+        label = "compartilhado" if shared else "independente"
+        print(f"  {label:<14} {rate:5.1f} req/s na placa | workers mostram as mesmas amostras: {'sim' if same else 'não'}")
+        return rate, same
+    finally:
+        for p in processes:
+            p.terminate()
+            p.wait()
+        board.stop()
+
+
+if __name__ == "__main__":
+    bench_buffer()
+    print(f"Dashboard: {WORKERS} workers, amostragem a cada {SAMPLE_INTERVAL} s")
+    _, same_alone = bench_dashboard(shared=False)
+    rate, same = bench_dashboard(shared=True)
+    assert same and rate <= 1.5 / SAMPLE_INTERVAL
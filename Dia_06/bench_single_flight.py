@@ -0,0 +1,62 @@
+"""
+Benchmark da leitura compartilhada (single-flight) do ESP32Controller.
+
+SESSIONS threads fazem o papel das abas abertas: cada uma lê a placa a
+cada INTERVAL s (com variação aleatória). A placa simulada atende um
+cliente por vez e leva 50 ms por resposta, como o WebServer do ESP32.
+Compara a leitura direta (uma requisição por chamada) com a
+compartilhada: requisições que chegam à placa, falhas e tempo de espera.
+
+Uso: python bench_single_flight.py [sessões ...]
+"""
+import os
+import random
+import sys
+import threading
+import time
+from esp32_simulator import SimulatedESP32
+
+os.environ.setdefault("HISTORY_DB", "")
+from dashboardESP32_v4 import ESP32Controller
+
+DURATION = 5.0
+INTERVAL = 0.5
+MAX_AGE = 1.0
+
+
+def run(read, sessions):
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    stop = time.monotonic() + DURATION
+
+    def session():
+        rng = random.Random()
+        time.sleep(rng.uniform(0, INTERVAL))
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            data = read()
+            with lock:
+                latencies.append(time.monotonic() - started)
+                failures[0] += data is None
+            time.sleep(INTERVAL * rng.uniform(0.8, 1.2))
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return len(latencies), failures[0], latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+if __name__ == "__main__":
+    for sessions in [int(n) for n in sys.argv[1:]] or [1, 10, 50, 200]:
+        print(f"{sessions} sessões, uma leitura a cada {INTERVAL} s por sessão, durante {DURATION:.0f} s")
+        for name in ["direta", "compartilhada"]:
+            board = SimulatedESP32(delay=0.05).start()
+            controller = ESP32Controller(board.address, max_age=MAX_AGE)
+            read = controller._read_sensor if name == "direta" else controller.get_sensor_data
+            calls, failed, p50, p99 = run(read, sessions)
+            print(f"  {name:<14} {board.requests / DURATION:6.1f} req/s na placa | "
+                  f"{failed:>5}/{calls} leituras falharam | espera p50 {p50 * 1000:6.1f} ms, p99 {p99 * 1000:7.1f} ms")
+            board.stop()
@@ -0,0 +1,52 @@
+"""
+Benchmark do SQLiteStore: um dia de amostras a 1 Hz (86 400 linhas).
+
+Mede o tempo de `put` (caminho da requisição), o tempo até tudo estar em
+disco, o "aquecimento" após reiniciar (abrir o banco e recarregar o dia
+inteiro num SampleRingBuffer) e uma consulta de uma hora.
+
+Uso: python bench_sqlite_store.py
+"""
+import os
+import tempfile
+import time
+import numpy as np
+from ring_buffer import SampleRingBuffer
+from sqlite_store import SQLiteStore
+
+SAMPLES = 86_400
+DEVICE = "10.62.155.158"
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "historico.db")
+    start = np.datetime64("2026-10-16T00:00:00", "us")
+    timestamps = start + np.arange(SAMPLES) * np.timedelta64(1, "s")
+    temperaturas = 25 + np.sin(np.arange(SAMPLES) / 3600)
+
+    store = SQLiteStore(path)
+    put_times = []
+    t0 = time.perf_counter()
+    for ts, temp in zip(timestamps, temperaturas):
+        t = time.perf_counter()
+        store.put(DEVICE, {'timestamp': ts, 'temperatura': float(temp), 'umidade': 60.0})
+        put_times.append(time.perf_counter() - t)
+    store.flush()
+    t_write = time.perf_counter() - t0
+    store.close()
+    put_times.sort()
+    print(f"put: p50 {put_times[len(put_times) // 2] * 1e6:.1f} us | "
+          f"p99 {put_times[int(len(put_times) * 0.99)] * 1e6:.1f} us")
+    print(f"{SAMPLES} amostras em disco em {t_write:.2f} s")
+
+    # "Reinício": banco novo, recarrega o dia inteiro na memória
+    t0 = time.perf_counter()
+    store = SQLiteStore(path)
+    buffer = SampleRingBuffer(SAMPLES)
+    buffer.extend(store.query(DEVICE, limit=SAMPLES, newest=True))
+    t_warm = time.perf_counter() - t0
+    print(f"aquecimento ({len(buffer)} amostras): {t_warm * 1000:.0f} ms")
+
+    t0 = time.perf_counter()
+    hora = store.query(DEVICE, start=start + np.timedelta64(12, "h"), end=start + np.timedelta64(13, "h"))
+    print(f"consulta de 1 h ({len(hora['timestamp'])} amostras): {(time.perf_counter() - t0) * 1000:.1f} ms")
+    store.close()
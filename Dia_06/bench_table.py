@@ -0,0 +1,43 @@
+"""
+Benchmark da tabela paginada no servidor (dashboardESP32_v4.table_page).
+
+Grava 120 000 amostras num banco temporário e mede o tempo e o tamanho
+(JSON) de uma página no início, no meio e no fim do histórico, contra
+serializar o histórico inteiro para o navegador.
+
+Uso: python bench_table.py
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SAMPLES = 120_000
+os.environ["HISTORY_DB"] = os.path.join(tempfile.mkdtemp(), "historico.db")
+os.environ["ROLLUPS_DIR"] = os.path.join(tempfile.mkdtemp(), "agregados")
+import dashboardESP32_v4 as dashboard  # noqa: E402  (HISTORY_DB e ROLLUPS_DIR precisam vir antes)
+
+if __name__ == "__main__":
+    dashboard.open_history_store()
+    store = dashboard.history_store
+    now = datetime.now()
+    for i in range(SAMPLES):
+        store.put(dashboard.esp32_ip, {'timestamp': now - timedelta(seconds=5 * (SAMPLES - i)),
+                                       'temperatura': 25 + (i % 50) / 10, 'umidade': 60.0,
+                                       'botao': i % 2, 'motor': 0, 'alarme': 0})
+    store.flush()
+
+    pages = -(-SAMPLES // dashboard.TABLE_PAGE_SIZE)
+    for page in (0, pages // 2, pages - 1):
+        t0 = time.perf_counter()
+        rows, columns, page_count, title = dashboard.table_page(page)
+        elapsed = time.perf_counter() - t0
+        print(f"página {page:>5} de {page_count}: {elapsed * 1000:5.1f} ms | {len(json.dumps(rows)):>6} bytes")
+
+    t0 = time.perf_counter()
+    cols = store.query(dashboard.esp32_ip)
+    everything = dashboard.page_rows(cols, dashboard.TABLE_COLUMNS)
+    size = len(json.dumps(everything))
+    print(f"histórico inteiro: {(time.perf_counter() - t0) * 1000:5.0f} ms | {size:>6} bytes")
+    store.close()
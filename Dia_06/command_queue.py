@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import deque
+
+PHASES = {
+    "pendente": "⏳",          # na fila, ainda não enviado
+    "enviando": "📨",          # requisição em andamento
+    "enviado": "📨",           # a placa respondeu 200; falta aparecer na leitura
+    "confirmado": "✅",        # uma leitura posterior mostrou o novo estado
+    "falhou": "🔴",            # o envio falhou `retries` vezes
+    "sem confirmação": "⚠️",   # enviado, mas as leituras não mostraram o estado a tempo
+}
+
+# ----------------------------
+# Fila de comandos dos atuadores
+# ----------------------------
+class _Command:
+    def __init__(self, actuator, on):
+        self.actuator = actuator
+        self.on = on
+        self.phase = "pendente"
+        self.submitted_at = time.monotonic()
+        self.sent_at = None
+        self.sent_wall = None    # time.time() do envio: só leituras depois dele confirmam
+        self.confirmed_at = None
+        self.attempts = 0
+        self.resent = False      # já reenviado por falta de confirmação
+
+
+class ActuatorCommandQueue:
+    """Envia os comandos de motor/alarme numa thread própria, um por atuador.
+
+    `submit` só registra o estado desejado e volta na hora: o callback
+    não espera o HTTP da placa. Se chega outro comando para o mesmo
+    atuador antes do envio, o anterior é descartado (vale o último
+    clique). Uma única thread envia, então os comandos nunca chegam fora
+    de ordem.
+
+    `send(atuador, ligado)` faz o envio e devolve True/False. A
+    confirmação vem de `observe(amostra)`: quando uma leitura posterior
+    ao envio mostra o campo do atuador no estado pedido. Sem isso em
+    `confirm_timeout` segundos, o comando é reenviado uma vez.
+    """
+    def __init__(self, send, actuators=("motor", "alarme"), confirm_timeout=15.0, retries=2, retry_delay=1.0):
+        self.send = send
+        self.confirm_timeout = confirm_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.commands = {name: None for name in actuators}  # último comando de cada atuador
+        self._pending = deque()  # atuadores com comando a enviar, na ordem dos cliques
+        self._cond = threading.Condition()
+        self._thread = None
+        # Métricas
+        self.submitted = 0
+        self.collapsed = 0   # comandos substituídos antes do envio
+        self.sent = 0        # requisições enviadas à placa
+        self.latencies = deque(maxlen=200)  # clique -> confirmação (s)
+
+    def submit(self, actuator, on):
+        """Pede `actuator` ligado/desligado; devolve sem esperar a placa."""
+        with self._cond:
+            previous = self.commands[actuator]
+            if previous is not None and previous.phase == "pendente":
+                self.collapsed += 1
+            else:
+                self._pending.append(actuator)
+            self.commands[actuator] = _Command(actuator, on)
+            self.submitted += 1
+            self._cond.notify()
+        self._start()
+
+    def _start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="esp32-commands", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    # Acorda no primeiro prazo de confirmação (ou num submit)
+                    self._cond.wait(self._next_deadline())
+                    self._check_timeouts()
+                actuator = self._pending.popleft()
+                command = self.commands[actuator]
+                command.phase = "enviando"
+            self._deliver(command)
+
+    def _deliver(self, command):
+        for attempt in range(self.retries):
+            if self.commands[command.actuator] is not command:
+                return  # chegou um clique mais novo: ele é que vale
+            command.attempts += 1
+            command.sent_wall = time.time()
+            self.sent += 1
+            try:
+                ok = self.send(command.actuator, command.on)
+            except Exception:
+                ok = False
+            if ok:
+                with self._cond:
+                    if command.phase == "enviando":
+                        command.phase, command.sent_at = "enviado", time.monotonic()
+                return
+            if attempt < self.retries - 1:
+                time.sleep(self.retry_delay)
+        with self._cond:
+            if command.phase == "enviando":
+                command.phase = "falhou"
+
+    def _next_deadline(self):
+        # Chamado com o lock: segundos até o primeiro comando enviado vencer o prazo (None: nenhum)
+        now = time.monotonic()
+        waits = [command.sent_at + self.confirm_timeout - now for command in self.commands.values()
+                 if command is not None and command.phase == "enviado"]
+        return max(min(waits), 0) if waits else None
+
+    def _check_timeouts(self):
+        # Chamado com o lock: reenvia uma vez o que não apareceu nas leituras
+        now = time.monotonic()
+        for actuator, command in self.commands.items():
+            if command is not None and command.phase == "enviado" and now - command.sent_at >= self.confirm_timeout:
+                if not command.resent:
+                    command.phase, command.resent = "pendente", True
+                    self._pending.append(actuator)
+                else:
+                    command.phase = "sem confirmação"
+
+    def observe(self, sample):
+        """Confere uma leitura ({'motor': 0/1, 'alarme': 0/1, ...}) contra os comandos enviados."""
+        now = time.monotonic()
+        with self._cond:
+            for actuator, command in self.commands.items():
+                if command is None or command.phase not in ("enviando", "enviado") or sample.get(actuator) is None:
+                    continue
+                taken = sample.get('timestamp')
+                if command.sent_wall is None or (taken is not None and taken.timestamp() < command.sent_wall):
+                    continue  # leitura anterior ao envio
+                if bool(sample[actuator]) == command.on:
+                    command.phase, command.confirmed_at = "confirmado", now
+                    self.latencies.append(now - command.submitted_at)
+            self._check_timeouts()
+
+    def status(self, actuator):
+        """(fase, ligado, latência clique->confirmação em s ou None) do último comando, ou None."""
+        command = self.commands[actuator]
+        if command is None:
+            return None
+        latency = command.confirmed_at - command.submitted_at if command.confirmed_at else None
+        return command.phase, command.on, latency
+
+    def latency_stats(self):
+        """Mediana e p95 (s) do clique até a confirmação, nos últimos comandos confirmados."""
+        values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))]
@@ -0,0 +1,138 @@
+import math
+
+# Limites padrão por campo. O erro de reconstrução (interpolação linear entre as
+# amostras guardadas) fica abaixo de deadband + deviation: 0.2 °C e 0.5 %, menos
+# que a exatidão do DHT22 (±0.5 °C, ±2 %). Campos fora dos dicionários
+# (botao, motor, alarme) são guardados sem perda. A banda morta fica desligada
+# por padrão: no bench_compression a porta sozinha guarda menos com erro menor.
+DEADBAND = {}
+DEVIATION = {'temperatura': 0.2, 'umidade': 0.5}
+_EPS = 1e-9  # folga para comparações de float (25.1 - 25.0 > 0.1)
+
+
+def parse_limits(text):
+    """"temperatura=0.1,umidade=0.5" -> {'temperatura': 0.1, 'umidade': 0.5}"""
+    return {name.strip(): float(value) for name, value in (item.split("=") for item in text.split(",") if item.strip())}
+
+
+def _seconds(value):
+    return value.timestamp() if hasattr(value, 'timestamp') else float(value)
+
+# ----------------------------
+# Compressão das amostras (banda morta + porta giratória)
+# ----------------------------
+class SwingingDoorCompressor:
+    """Decide quais amostras guardar e repassar, com erro limitado por campo.
+
+    1. Banda morta (`deadband`): variação de até o limite em relação ao
+       último valor aceito é tratada como ruído e o valor anterior é
+       mantido. Some com a oscilação de 0.1-0.2 do DHT22.
+    2. Porta giratória (swinging door, `deviation`): a partir da última
+       amostra guardada (âncora), as amostras do meio definem um
+       "corredor" de inclinações; enquanto a reta da âncora até a última
+       recebida passa a menos de deviation de todas as do meio, nada é
+       guardado. Quando não passa, a amostra anterior é guardada e vira
+       a nova âncora. Com deviation 0 o campo é guardado sem perda.
+
+    `offer(amostra)` devolve a lista (0 ou 1, às vezes 2) de amostras a
+    guardar, com os valores já filtrados. A última recebida fica retida
+    até o corredor fechar ou até `max_gap` s depois da âncora, então o
+    que é guardado atrasa no máximo isso; `flush()` entrega a retida (ao
+    encerrar) e `flush_stale(agora)` também, se passou de `max_gap` sem
+    leitura nova (placa fora do ar).
+    """
+    def __init__(self, deadband=DEADBAND, deviation=DEVIATION, max_gap=60.0, time_field='timestamp'):
+        self.deadband = dict(deadband)
+        self.deviation = dict(deviation)
+        self.max_gap = max_gap
+        self.time_field = time_field
+        self.offered = 0
+        self.stored = 0
+        self.reset()
+
+    def reset(self):
+        self._accepted = {}   # último valor aceito por campo (referência da banda morta)
+        self._anchor = None   # (t, amostra) última guardada
+        self._held = None     # (t, amostra) última recebida, ainda não guardada
+        self._upper = {}      # menor inclinação máxima vista desde a âncora, por campo
+        self._lower = {}      # maior inclinação mínima
+
+    def _filter(self, record):
+        filtered = dict(record)
+        for field, band in self.deadband.items():
+            value, last = record.get(field), self._accepted.get(field)
+            if value is not None and last is not None and abs(value - last) <= band + _EPS:
+                filtered[field] = last
+            else:
+                self._accepted[field] = value
+        return filtered
+
+    def _numeric_fields(self, record):
+        anchor = self._anchor[1]
+        for field, value in record.items():
+            if field != self.time_field:
+                yield field, value, anchor.get(field)
+
+    def _widen(self, t, record):
+        """Inclui uma amostra no meio do corredor: estreita as inclinações aceitas a partir da âncora."""
+        dt = t - self._anchor[0]
+        for field, value, start in self._numeric_fields(record):
+            if isinstance(value, (int, float)) and isinstance(start, (int, float)):
+                deviation = self.deviation.get(field, 0.0)
+                self._upper[field] = min(self._upper.get(field, math.inf), (value + deviation - start) / dt)
+                self._lower[field] = max(self._lower.get(field, -math.inf), (value - deviation - start) / dt)
+
+    def _fits(self, t, record):
+        """True se a reta da âncora até esta amostra passa a menos de deviation de todas as do meio."""
+        dt = t - self._anchor[0]
+        if dt <= 0:
+            return False
+        for field, value, start in self._numeric_fields(record):
+            if not isinstance(value, (int, float)) or not isinstance(start, (int, float)):
+                if value != start:  # None ou texto: só sem perda
+                    return False
+                continue
+            slope = (value - start) / dt
+            if not self._lower.get(field, -math.inf) - _EPS <= slope <= self._upper.get(field, math.inf) + _EPS:
+                return False
+        return True
+
+    def _store(self, t, record, out):
+        self._anchor, self._upper, self._lower = (t, record), {}, {}
+        out.append(record)
+        self.stored += 1
+
+    def offer(self, record):
+        """Recebe uma amostra; devolve as amostras a guardar agora."""
+        self.offered += 1
+        t = _seconds(record[self.time_field])
+        record = self._filter(record)
+        out = []
+        if self._anchor is None:
+            self._store(t, record, out)
+            return out
+        if self._held is not None:
+            self._widen(*self._held)  # a retida passa a ser um ponto do meio
+            if t - self._anchor[0] > self.max_gap or not self._fits(t, record):
+                # A retida é o último ponto que ainda fecha uma reta válida: vira a nova âncora
+                self._store(*self._held, out)
+                self._held = None
+        if t - self._anchor[0] > self.max_gap:  # leitura depois de um intervalo sem dados
+            self._store(t, record, out)
+        else:
+            self._held = (t, record)
+        return out
+
+    def flush_stale(self, now):
+        """Guarda a amostra retida se a âncora tem mais de `max_gap` s (sem leituras novas)."""
+        if self._anchor is not None and _seconds(now) - self._anchor[0] > self.max_gap:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Guarda a amostra retida (ex.: ao encerrar)."""
+        out = []
+        if self._held is not None:
+            self._store(*self._held, out)
+            self._held = None
+        return out
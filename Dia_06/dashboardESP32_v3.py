@@ -5,9 +5,11 @@ from collections import deque
 from datetime import datetime
 import pandas as pd
 import dash
-from dash import dcc, html
+from dash import dcc, html, no_update
 from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
+from command_queue import PHASES, ActuatorCommandQueue
+from single_flight import SingleFlight
 
 # ----------------------------
 # Configuração Flask
@@ -19,14 +21,22 @@ esp32_ip = os.getenv("10.62.155.158", "10.62.155.158")  # variável de ambiente
 data_history = deque(maxlen=100)
 last_update = None
 connection_status = "Desconectado"
+last_sample = None  # última leitura gravada (abas que compartilham a leitura não gravam de novo)
+history_version = 0  # muda a cada amostra nova ou limpeza: gráfico e tabela só redesenham quando muda
 
 
 class ESP32Controller:
-    def __init__(self, ip_address):
+    def __init__(self, ip_address, max_age=1.0):
         self.ip = ip_address
         self.base_url = f"http://{ip_address}"
+        # Cada aba aberta lê a placa no seu intervalo: leituras simultâneas viram
+        # uma só e uma leitura com menos de max_age s é reaproveitada
+        self.reads = SingleFlight(self._read_sensor, max_age=max_age)
 
     def get_sensor_data(self):
+        return self.reads()
+
+    def _read_sensor(self):
         try:
             response = requests.get(self.base_url, timeout=1)
             if response.status_code == 200:
@@ -40,6 +50,7 @@ class ESP32Controller:
         try:
             endpoint = "/motor1_h" if action == "ligar" else "/motor1_l"
             r = requests.get(f"{self.base_url}{endpoint}", timeout=1)
+            self.reads.forget()
             return r.status_code == 200
         except:
             return False
@@ -48,17 +59,31 @@ class ESP32Controller:
         try:
             endpoint = "/alarme_h" if action == "ligar" else "/alarme_l"
             r = requests.get(f"{self.base_url}{endpoint}", timeout=1)
+            self.reads.forget()
             return r.status_code == 200 # CORREÇÃO: Era 2002 no original
         except:
             return False
 
 
-esp32 = ESP32Controller(esp32_ip)
+esp32 = ESP32Controller(esp32_ip, max_age=float(os.getenv("ESP32_MAX_AGE", "1")))
+
+
+def send_command(actuator, on):
+    action = "ligar" if on else "desligar"
+    return esp32.control_motor(action) if actuator == "motor" else esp32.control_alarm(action)
+
+
+# Comandos enviados fora do callback (vale o último clique de cada atuador)
+# e confirmados pelos campos Motor/Alarme das leituras seguintes
+esp32_commands = ActuatorCommandQueue(send_command)
 
 
 def update_data_history(data):
-    global last_update, connection_status
+    global last_update, connection_status, history_version, last_sample
+    if data is not None and data is last_sample:
+        return  # mesma leitura já gravada por outra aba
     if data:
+        last_sample = data
         timestamp = datetime.now()
         data_with_time = {
             'timestamp': timestamp,
@@ -69,6 +94,8 @@ def update_data_history(data):
             'alarme': data.get('Alarme', 0)
         }
         data_history.append(data_with_time)
+        esp32_commands.observe(data_with_time)
+        history_version += 1
         last_update = timestamp
         connection_status = "Conectado"
     else:
@@ -126,73 +153,90 @@ app.layout = html.Div([
         html.Button("⏹️ Desligar Motor", id="btn-motor-off"),
         html.Button("🔔 Ativar Alarme", id="btn-alarm-on"),
         html.Button("🔕 Desativar Alarme", id="btn-alarm-off"),
+        html.Div(id="control-status", style={"margin": "10px 0"}),
     ], style={"marginTop": "20px"}),
 
     html.Div([
         html.H3("📋 Dados Recentes"),
         html.Div(id="recent-data-table")
-    ])
+    ]),
+
+    dcc.Store(id="sample-tick"),  # versão do histórico já exibida
 ])
 
 
 # ----------------------------
-# ÚNICA CALLBACK
+# Callbacks
 # ----------------------------
+# Cada interação dispara só o que ela muda: os botões de controle só
+# enfileiram o comando, sem reler o ESP32 nem redesenhar nada, e gráfico/tabela só são refeitos
+# quando chega amostra nova (sample-tick).
+CONTROL_BUTTONS = {
+    "btn-motor-on": ("motor", True), "btn-motor-off": ("motor", False),
+    "btn-alarm-on": ("alarme", True), "btn-alarm-off": ("alarme", False),
+}
+
+
+def command_status_message():
+    parts = []
+    for actuator, label, on_text, off_text in [("motor", "Motor", "ligar", "desligar"),
+                                               ("alarme", "Alarme", "ativar", "desativar")]:
+        status = esp32_commands.status(actuator)
+        if status:
+            phase, on, latency = status
+            text = f"{PHASES[phase]} {label}: {on_text if on else off_text} ({phase}"
+            parts.append(text + (f" em {latency:.1f} s)" if latency is not None else ")"))
+    return " | ".join(parts)
+
+
 @app.callback(
-    [Output("temp-hum-graph", "figure"),
-     Output("current-data", "children"),
-     Output("status-connection", "children"),
-     Output("recent-data-table", "children")],
-    [Input("btn-update", "n_clicks"),
-     Input("auto-update", "n_intervals"),
-     Input("btn-motor-on", "n_clicks"),
+    Output("control-status", "children"),
+    [Input("btn-motor-on", "n_clicks"),
      Input("btn-motor-off", "n_clicks"),
      Input("btn-alarm-on", "n_clicks"),
      Input("btn-alarm-off", "n_clicks"),
-     Input("btn-clear-graphs", "n_clicks")], # Novo Input
+     Input("sample-tick", "data")],  # amostra nova pode confirmar um comando
+    State("control-status", "children"),
+    prevent_initial_call=True
+)
+def update_controls(m_on, m_off, a_on, a_off, tick, shown):
+    trigger_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+
+    if trigger_id in CONTROL_BUTTONS:
+        esp32_commands.submit(*CONTROL_BUTTONS[trigger_id])  # só enfileira: não espera a placa
+
+    message = command_status_message()
+    return message if message != shown else no_update
+
+
+@app.callback(
+    [Output("current-data", "children"),
+     Output("status-connection", "children"),
+     Output("sample-tick", "data")],
+    [Input("btn-update", "n_clicks"),
+     Input("auto-update", "n_intervals"),
+     Input("btn-clear-graphs", "n_clicks")],
+    State("sample-tick", "data"),
     prevent_initial_call=False
 )
-def update_dashboard(n_update, n_interval, m_on, m_off, a_on, a_off, n_clear_graphs):
-    global connection_status, data_history
+def update_sample(n_update, n_interval, n_clear_graphs, tick):
+    global history_version
 
     ctx = dash.callback_context
 
     # Verifica se foi o botão de limpar gráficos
     if ctx.triggered and ctx.triggered[0]["prop_id"].startswith("btn-clear-graphs"):
         data_history.clear() # Limpa o histórico de dados
+        history_version += 1
         # Não busca novos dados imediatamente após limpar, apenas reseta o gráfico
-        fig = go.Figure()
         current = [html.P("❌ Dados de sensores limpos.")]
         status = f"{'🔴'} Histórico de dados limpo."
-        table = html.P("Sem histórico")
-        return fig, current, status, table
-
-    # Verifica se foi algum botão de controle
-    if ctx.triggered and ctx.triggered[0]["prop_id"] != ".":
-        trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
-
-        if trigger_id == "btn-motor-on":
-            success = esp32.control_motor("ligar")
-            connection_status = "Motor ligado" if success else "Falha ao ligar motor"
-
-        elif trigger_id == "btn-motor-off":
-            success = esp32.control_motor("desligar")
-            connection_status = "Motor desligado" if success else "Falha ao desligar motor"
+        return current, status, history_version
 
-        elif trigger_id == "btn-alarm-on":
-            success = esp32.control_alarm("ligar")
-            connection_status = "Alarme ativado" if success else "Falha ao ativar alarme"
-
-        elif trigger_id == "btn-alarm-off":
-            success = esp32.control_alarm("desligar")
-            connection_status = "Alarme desativado" if success else "Falha ao desativar alarme"
-
-    # Sempre buscar dados novos do ESP32, a menos que o botão de limpar tenha sido clicado
+    # Busca dados novos do ESP32
     data = esp32.get_sensor_data()
     update_data_history(data)
 
-    fig = create_temperature_humidity_chart()
-
     if data:
         current = [
             html.P(f"🌡️ Temperatura: {data['Temperatura']:.1f} °C"),
@@ -208,21 +252,37 @@ def update_dashboard(n_update, n_interval, m_on, m_off, a_on, a_off, n_clear_gra
     if last_update:
         status += f" | Última atualização: {last_update.strftime('%H:%M:%S')}"
 
-    if data_history:
-        df = pd.DataFrame(list(data_history))
-        df['timestamp'] = df['timestamp'].dt.strftime("%H:%M:%S")
-        df = df.tail(10)
-        table = html.Table([
-            html.Thead(html.Tr([html.Th(col) for col in df.columns])),
-            html.Tbody([
-                html.Tr([html.Td(df.iloc[i][col]) for col in df.columns])
-                for i in range(len(df))
-            ])
-        ])
-    else:
-        table = html.P("Sem histórico")
+    return current, status, history_version if history_version != tick else no_update
 
-    return fig, current, status, table
+
+@app.callback(
+    Output("temp-hum-graph", "figure"),
+    Input("sample-tick", "data"),
+    prevent_initial_call=True
+)
+def update_chart(tick):
+    return create_temperature_humidity_chart()
+
+
+@app.callback(
+    Output("recent-data-table", "children"),
+    Input("sample-tick", "data"),
+    prevent_initial_call=True
+)
+def update_table(tick):
+    if not data_history:
+        return html.P("Sem histórico")
+
+    # Só as 10 últimas amostras, direto do deque (sem montar um DataFrame)
+    rows = list(data_history)[-10:]
+    columns = list(rows[0])
+    return html.Table([
+        html.Thead(html.Tr([html.Th(col) for col in columns])),
+        html.Tbody([
+            html.Tr([html.Td(row['timestamp'].strftime("%H:%M:%S") if col == 'timestamp' else row[col]) for col in columns])
+            for row in rows
+        ])
+    ])
 
 
 # ----------------------------
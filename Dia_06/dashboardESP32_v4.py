@@ -1,19 +1,130 @@
+"""Painel Dash do ESP32 (histórico, gráfico, tabela, controles e envio ao Google Form).
+
+Um processo só:
+    python dashboardESP32_v4.py
+
+Vários workers (gunicorn): um processo amostrador lê a placa e grava o histórico
+compartilhado; os workers só leem o arquivo e repassam os pedidos (limpar, ler agora,
+comandos de motor/alarme) ao amostrador.
+    SHARED_HISTORY=/dev/shm/esp32.hist SAMPLER_ONLY=1 python dashboardESP32_v4.py &
+    SHARED_HISTORY=/dev/shm/esp32.hist gunicorn -w 3 -b 0.0.0.0:8050 dashboardESP32_v4:server
+Com LIVE_PUSH=1 cada aba prende uma conexão /stream aberta: use workers com threads
+(--worker-class gthread --threads 20) ou gevent, nunca os workers sync padrão.
+"""
+import atexit
 import os
-from flask import Flask
+import signal
+import sys
+import threading
+import time
+from flask import Flask, Response, request
 import requests
-from collections import deque
+from requests.adapters import HTTPAdapter
+from collections import defaultdict
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import dash
-from dash import dcc, html, Input, Output, ctx
+from dash import dcc, html, dash_table, Input, Output, State, ctx, no_update
 import plotly.graph_objects as go
+from adaptive_poll import AdaptivePollScheduler
+from command_queue import PHASES, ActuatorCommandQueue
+from compression import DEADBAND, DEVIATION, SwingingDoorCompressor, parse_limits
+from downsample import downsample
+from esp32_fleet import ESP32FleetPoller
+from esp32_sampler import BackgroundSampler
+from form_uploader import GoogleFormUploader
+from ring_buffer import SampleRingBuffer
+from rollups import Rollups
+from shared_rollups import SharedRollups
+from sample_broadcaster import SampleBroadcaster
+from single_flight import SingleFlight
+from sqlite_store import SQLiteStore
 
 # ----------------------------
 # Configuração
 # ----------------------------
 server = Flask(__name__)
 esp32_ip = os.getenv("ESP32_IP", "10.62.155.158")
-data_history = deque(maxlen=100)
+# Lista opcional de placas extras, separadas por vírgula (ex.: "10.0.0.2,10.0.0.3")
+esp32_fleet_ips = [ip.strip() for ip in os.getenv("ESP32_FLEET", "").split(",") if ip.strip()]
+HISTORY_SIZE = int(os.getenv("HISTORY_SIZE", "100"))  # amostras guardadas por placa
+device_histories = defaultdict(lambda: SampleRingBuffer(HISTORY_SIZE))  # histórico por placa
+# Modo multiprocesso (gunicorn com vários workers): um processo só de amostragem
+# (SAMPLER_ONLY=1 python dashboardESP32_v4.py) grava o histórico da placa principal
+# neste arquivo mapeado em memória e os workers só leem dele. Vazio: tudo num processo.
+SHARED_HISTORY = os.getenv("SHARED_HISTORY", "")
+SAMPLER_ONLY = os.getenv("SAMPLER_ONLY", "0") == "1"
+SHARED_READER = bool(SHARED_HISTORY) and not SAMPLER_ONLY  # worker que lê o arquivo
+SHARED_POLL_INTERVAL = 0.25  # s entre verificações do arquivo (workers) e dos pedidos (amostrador)
+SHARED_WAIT = float(os.getenv("SHARED_WAIT", "30"))  # s que um worker espera o amostrador criar o arquivo
+
+def open_from_sampler(open_file, path):
+    """Cria (amostrador) ou abre (worker) um arquivo compartilhado; o worker espera o amostrador subir."""
+    deadline = time.monotonic() + SHARED_WAIT
+    while True:
+        try:
+            return open_file()
+        except FileNotFoundError:
+            if time.monotonic() >= deadline:
+                raise FileNotFoundError(2, f"arquivo compartilhado não apareceu em {SHARED_WAIT:.0f} s; "
+                                           "inicie antes o amostrador (SAMPLER_ONLY=1)", path) from None
+            time.sleep(SHARED_POLL_INTERVAL)
+
+if SHARED_HISTORY:
+    from shared_ring_buffer import SharedSampleRingBuffer
+    device_histories[esp32_ip] = open_from_sampler(
+        lambda: SharedSampleRingBuffer(SHARED_HISTORY, HISTORY_SIZE, create=SAMPLER_ONLY), SHARED_HISTORY)
+data_history = device_histories[esp32_ip]
+device_rollups = defaultdict(Rollups)  # agregados de 1 s / 1 min / 1 h por placa
+# Pasta com um arquivo de agregados por placa (aberto em open_rollups(); "" deixa só em memória).
+# Os baldes são feitos com todas as leituras, antes da compressão, e continuam depois de
+# reiniciar; no modo multiprocesso o amostrador grava e os workers leem o mesmo arquivo.
+# Sem a pasta, ao reiniciar (e nos workers) os agregados vêm das amostras comprimidas:
+# contagem de amostras e ciclo de trabalho ficariam errados e saem da tabela de resumo.
+ROLLUPS_DIR = os.getenv("ROLLUPS_DIR", "agregados_esp32")
+history_lock = threading.RLock()  # o amostrador escreve enquanto os callbacks leem
+HISTORY_DB = os.getenv("HISTORY_DB", "historico_esp32.db")  # banco SQLite do histórico ("" desliga)
+history_store = None  # aberto em open_history_store()
+# Pasta do arquivo Parquet de longo prazo (por placa e dia); vazio desliga. Requer pyarrow.
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "")
+if ARCHIVE_DIR:
+    from parquet_archive import ParquetArchive
+    history_archive = ParquetArchive(ARCHIVE_DIR)
+else:
+    history_archive = None
+SAMPLE_INTERVAL = float(os.getenv("SAMPLE_INTERVAL", "5"))  # período de leitura do ESP32 (s)
+# Leitura adaptativa (opcional): cai para SAMPLE_MIN_INTERVAL quando temperatura/umidade mudam
+# rápido ou botão/motor/alarme mudam, e volta até SAMPLE_MAX_INTERVAL com leituras estáveis.
+# Um máximo acima de SAMPLE_INTERVAL economiza leituras, mas mudanças de botão/motor/alarme
+# feitas fora do dashboard demoram mais a aparecer (ver bench_adaptive_poll.py)
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "0") == "1"
+SAMPLE_MIN_INTERVAL = float(os.getenv("SAMPLE_MIN_INTERVAL", "1"))
+SAMPLE_MAX_INTERVAL = float(os.getenv("SAMPLE_MAX_INTERVAL", str(SAMPLE_INTERVAL)))
+# Compressão antes de guardar e repassar (banda morta + porta giratória): histórico, banco,
+# arquivo e gráfico/tabela das abas só recebem as amostras necessárias para refazer a curva
+# com erro abaixo de deadband + deviation por campo ("temperatura=0.2,umidade=0.5").
+# O painel de leituras atuais e o Google Form continuam recebendo todas as leituras.
+COMPRESSION = os.getenv("COMPRESSION", "1") == "1"
+COMPRESSION_DEADBAND = parse_limits(os.getenv("COMPRESSION_DEADBAND", "")) or DEADBAND
+COMPRESSION_DEVIATION = parse_limits(os.getenv("COMPRESSION_DEVIATION", "")) or DEVIATION
+COMPRESSION_MAX_GAP = float(os.getenv("COMPRESSION_MAX_GAP", "60"))  # s que uma amostra pode ficar retida
+device_compressors = defaultdict(lambda: SwingingDoorCompressor(COMPRESSION_DEADBAND, COMPRESSION_DEVIATION,
+                                                                COMPRESSION_MAX_GAP))
+GRAPH_MAX_POINTS = int(os.getenv("GRAPH_MAX_POINTS", str(HISTORY_SIZE)))  # pontos mantidos no gráfico
+GRAPH_INCREMENTAL = os.getenv("GRAPH_INCREMENTAL", "1") == "1"  # envia só os pontos novos a cada atualização
+GRAPH_TARGET_POINTS = int(os.getenv("GRAPH_TARGET_POINTS", "2000"))  # máximo de pontos desenhados por curva
+GRAPH_DOWNSAMPLE = os.getenv("GRAPH_DOWNSAMPLE", "lttb")  # "lttb", "minmax" ou "" para desenhar tudo
+TABLE_PAGE_SIZE = int(os.getenv("TABLE_PAGE_SIZE", "20"))  # linhas por página da tabela de dados
+# Intervalos do seletor do gráfico (segundos); 0 = últimas amostras do buffer
+GRAPH_SPANS = {"Últimas amostras": 0, "Última hora": 3600, "Últimas 24 horas": 86400, "Últimos 7 dias": 7 * 86400}
+# Amostras empurradas aos navegadores por /stream (Server-Sent Events); o dcc.Interval
+# passa a ser só uma verificação lenta (tabela paginada, ressincronização).
+# Desligado por padrão nos workers do gunicorn: cada /stream ocupa um worker sync inteiro
+# (ver o comando com gthread no início do arquivo)
+LIVE_PUSH = os.getenv("LIVE_PUSH", "0" if SHARED_READER else "1") == "1"
+PUSH_FALLBACK_INTERVAL = float(os.getenv("PUSH_FALLBACK_INTERVAL", "60"))  # s, com LIVE_PUSH
+sample_stream = SampleBroadcaster()
 last_update = None
 connection_status = "Desconectado"
 
@@ -23,16 +134,49 @@ GOOGLE_FORM_URL = "https://docs.google.com/forms/d/e/1FAIpQLSf0DGncBYg6IJwhoB0PE
 # ----------------------------
 # Funções de Comunicação
 # ----------------------------
+def _stale_connection(error):
+    """True se o erro veio de uma conexão keep-alive que a placa já tinha fechado."""
+    while error is not None:
+        if isinstance(error, ConnectionResetError):  # inclui http.client.RemoteDisconnected
+            return True
+        nested = next((arg for arg in error.args if isinstance(arg, BaseException)), None)
+        error = nested or error.__cause__ or error.__context__
+    return False
+
 class ESP32Controller:
     """Classe para encapsular a comunicação com o ESP32."""
-    def __init__(self, ip_address ):
+    def __init__(self, ip_address, pool_size=2, max_age=1.0):
         self.ip = ip_address
         self.base_url = f"http://{ip_address}"
+        self.pool_size = pool_size  # conexões keep-alive mantidas abertas com a placa
+        self.session = self._new_session()
+        # Leituras simultâneas viram uma só; uma leitura com menos de max_age s é reaproveitada
+        self.reads = SingleFlight(self._read_sensor, max_age=max_age)
+
+    def _new_session(self):
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+        return session
+
+    def _get(self, endpoint: str = "", timeout: float = 5):
+        # Reaproveita a conexão da sessão. Se a placa fechou uma conexão
+        # keep-alive parada (reinício, Wi-Fi instável), tenta uma vez mais:
+        # o pool descarta a conexão morta e abre outra. Placa fora do ar
+        # (timeout, conexão recusada) falha na primeira tentativa.
+        try:
+            return self.session.get(f"{self.base_url}{endpoint}", timeout=timeout)
+        except requests.exceptions.ConnectionError as e:
+            if not _stale_connection(e):
+                raise
+            return self.session.get(f"{self.base_url}{endpoint}", timeout=timeout)
 
     def get_sensor_data(self ):
         """Busca dados dos sensores do ESP32."""
+        return self.reads()
+
+    def _read_sensor(self):
         try:
-            response = requests.get(self.base_url, timeout=5)
+            response = self._get(timeout=5)
             response.raise_for_status()
             if "application/json" in response.headers.get("Content-Type", ""):
                 data = response.json()
@@ -51,40 +195,56 @@ class ESP32Controller:
 
     def _send_command(self, endpoint: str):
         try:
-            r = requests.get(f"{self.base_url}{endpoint}", timeout=3)
+            r = self._get(endpoint, timeout=3)
+            self.reads.forget()  # o estado da placa mudou: a próxima leitura vai até ela
             return r.status_code == 200
         except requests.exceptions.RequestException:
             return False
 
-def send_data_to_google_form(data: dict):
+def google_form_params(data: dict):
     """
-    NOVO: Envia os dados dos sensores para um Google Form via requisição GET.
+    NOVO: Parâmetros da requisição GET que registra os dados no Google Form.
     """
-    if not data:
-        return False
-    
-    try:
-        # Mapeia os dados para os 'entry' IDs do formulário
-        params = {
-            'entry.1518093638': data.get('Temperatura'),
-            'entry.1621899341': data.get('Umidade'),
-            'entry.1262249026': data.get('Botao'),
-            'entry.1332691306': data.get('Alarme'),
-            'submit': 'Submit' # Parâmetro padrão de submissão
-        }
-        
-        response = requests.get(GOOGLE_FORM_URL, params=params, timeout=3)
-        # O Google Forms retorna 200 mesmo em caso de erro de entrada, 
-        # então apenas checar o status da requisição é suficiente.
-        return response.status_code == 200
-    except requests.exceptions.RequestException:
-        return False
+    # Mapeia os dados para os 'entry' IDs do formulário
+    return {
+        'entry.1518093638': data.get('temperatura'),
+        'entry.1621899341': data.get('umidade'),
+        'entry.1262249026': data.get('botao'),
+        'entry.1332691306': data.get('alarme'),
+        'submit': 'Submit' # Parâmetro padrão de submissão
+    }
+
+# O envio acontece em threads próprias, com fila e novas tentativas.
+# O Google Forms retorna 200 mesmo em caso de erro de entrada,
+# então apenas checar o status da requisição é suficiente.
+google_uploader = GoogleFormUploader(GOOGLE_FORM_URL, google_form_params)
 
-esp32 = ESP32Controller(esp32_ip)
+esp32 = ESP32Controller(esp32_ip, pool_size=int(os.getenv("ESP32_POOL_SIZE", "2")),
+                        max_age=float(os.getenv("ESP32_MAX_AGE", "1")))
+# Na frota, a placa principal continua passando pelo ESP32Controller (conexões mantidas,
+# leituras simultâneas deduplicadas, timeout de 5 s), em paralelo com as extras
+fleet_poller = ESP32FleetPoller([esp32_ip] + esp32_fleet_ips,
+                                readers={esp32_ip: esp32.get_sensor_data}) if esp32_fleet_ips else None
+
+def send_command(actuator, on):
+    """Envia um comando à placa (na thread da fila) e pede uma leitura logo em seguida."""
+    action = "ligar" if on else "desligar"
+    ok = esp32.control_motor(action) if actuator == "motor" else esp32.control_alarm(action)
+    if ok:
+        sampler.trigger()  # leitura antecipada: confirma sem esperar o próximo período
+    return ok
+
+# Os comandos saem numa thread própria (vale o último clique de cada atuador)
+# e são confirmados pelos campos Motor/Alarme das leituras seguintes. No modo
+# multiprocesso só o amostrador usa a fila: os workers passam os cliques pelo
+# arquivo compartilhado, então a ordem e a situação valem para todos eles.
+esp32_commands = ActuatorCommandQueue(send_command, confirm_timeout=max(3 * SAMPLE_INTERVAL, 5))
 
 # (O resto das funções auxiliares como create_temperature_humidity_chart e update_data_history permanecem as mesmas)
-def update_data_history(data):
+def update_data_history(data, device=None):
     global last_update, connection_status
+    # Placas extras da frota só alimentam o próprio histórico, sem mexer no status principal
+    is_main_device = device is None or device == esp32_ip
     if data:
         timestamp = datetime.now()
         data_with_time = {
@@ -95,25 +255,381 @@ def update_data_history(data):
             'motor': data.get('Motor', 0),
             'alarme': data.get('Alarme', 0)
         }
-        data_history.append(data_with_time)
-        last_update = timestamp
-        connection_status = "Conectado"
+        # Painel de leituras atuais e agregados veem todas as leituras, sem esperar a compressão
+        with history_lock:
+            device_histories[device or esp32_ip].latest = data_with_time
+            device_rollups[device or esp32_ip].add(data_with_time)
+        if is_main_device:
+            # O Google Form recebe todas as leituras: a planilha carimba o horário de chegada,
+            # então uma amostra retida pela compressão chegaria lá com o horário errado
+            google_uploader.submit(data_with_time)  # enfileirado, não bloqueia a leitura
+            last_update = timestamp
+            connection_status = "Conectado"
+            esp32_commands.observe(data_with_time)
+        kept = device_compressors[device or esp32_ip].offer(data_with_time) if COMPRESSION else [data_with_time]
+        store_records(device or esp32_ip, kept, data_with_time)
+    else:
+        if COMPRESSION:  # placa sem responder: a leitura retida não espera mais que max_gap
+            store_records(device or esp32_ip, device_compressors[device or esp32_ip].flush_stale(datetime.now()))
+        if is_main_device:
+            connection_status = "Falha na conexão"
+
+def store_records(device, records, reading=None):
+    """Amostras guardadas pela compressão -> histórico, banco, arquivo e /stream."""
+    with history_lock:
+        history = device_histories[device]
+        ticks = []
+        for record in records:
+            history.append(record)
+            ticks.append([history.generation, history.appended])
+        tick = [history.generation, history.appended]
+    push = device == esp32_ip and LIVE_PUSH and not SAMPLER_ONLY
+    for record, record_tick in zip(records, ticks):
+        if history_store:
+            history_store.put(device, record)  # gravação em lote, em outra thread
+        if history_archive:
+            history_archive.append(device, record)  # um arquivo por hora
+        if push:
+            publish_sample(record, record_tick, reading)
+    if push and reading and not records:
+        publish_sample(None, tick, reading)  # leitura retida pela compressão: só o painel muda
+
+def publish_sample(record, tick, reading=None):
+    """Manda às abas a amostra guardada `record` (None: nenhuma) e a leitura mais recente, para o painel."""
+    # Serializada uma vez e repassada a todas as abas abertas
+    message = {'tick': tick, 'status': status_message(), 'commands': command_status_message()}
+    if record:
+        message.update(record, timestamp=record['timestamp'].isoformat())
+    if reading:
+        message['current'] = {**reading, 'timestamp': reading['timestamp'].isoformat()}
+    sample_stream.publish(message)
+
+def open_history_store():
+    """Abre o banco (uma vez) e recarrega nos buffers as últimas amostras de cada placa."""
+    global history_store
+    if history_store or not HISTORY_DB:
+        return
+    with history_lock:
+        if history_store:
+            return
+        store = SQLiteStore(HISTORY_DB)
+        since = np.datetime64(datetime.now(), 'us') - np.timedelta64(max(GRAPH_SPANS.values()), 's')
+        for device in [esp32_ip] + esp32_fleet_ips:
+            if device != esp32_ip or not SHARED_READER:  # o arquivo compartilhado é do amostrador
+                device_histories[device].extend(store.query(device, limit=HISTORY_SIZE, newest=True))
+            if not ROLLUPS_DIR:  # sem o arquivo, só dá para refazer das amostras comprimidas
+                device_rollups[device].extend(store.query(device, start=since))  # maior intervalo do seletor
+        history_store = store
+
+def rollups_path(device):
+    return os.path.join(ROLLUPS_DIR, device.replace(":", "_") + ".rollups")
+
+def open_rollups():
+    """Troca (uma vez) os agregados em memória pelos arquivos de ROLLUPS_DIR."""
+    if not ROLLUPS_DIR or isinstance(device_rollups[esp32_ip], SharedRollups):
+        return
+    with history_lock:
+        if isinstance(device_rollups[esp32_ip], SharedRollups):
+            return
+        for device in [esp32_ip] + esp32_fleet_ips:
+            path = rollups_path(device)
+            if not SHARED_READER:
+                device_rollups[device] = SharedRollups(path, create=True)  # reaproveita o arquivo existente
+            elif device == esp32_ip:  # worker: só lê o que o amostrador grava
+                device_rollups[device] = open_from_sampler(lambda: SharedRollups(path), path)
+
+def close_history():
+    """Ao encerrar o processo: grava o que ainda está em memória (registrada no atexit)."""
+    if fleet_poller:
+        fleet_poller.close()  # conexões keep-alive com as placas extras
+    if COMPRESSION:
+        for device, compressor in list(device_compressors.items()):
+            store_records(device, compressor.flush())  # leitura retida pela compressão
+    if history_store:
+        history_store.flush()  # último lote ainda na fila da thread escritora
+        history_store.close()
+    for rollups in list(device_rollups.values()):
+        if isinstance(rollups, SharedRollups):
+            rollups.flush()
+    if history_archive:
+        history_archive.stop()  # amostras da hora corrente ainda em memória
+
+atexit.register(close_history)
+
+def sample_once():
+    """Uma rodada de leitura: ESP32 (ou frota), histórico e envio ao Google Form."""
+    global connection_status
+    # Busca de dados do ESP32 (ou de todas as placas da frota, em paralelo)
+    if fleet_poller:
+        data = fleet_poller.poll(update_data_history).get(esp32_ip)
+    else:
+        data = esp32.get_sensor_data()
+        update_data_history(data)
+
+    # --- NOVO: Envio para o Google Form (em update_data_history, todas as leituras) ---
+    if data:
+        # Atualiza o status com o resultado do último envio concluído
+        if google_uploader.last_ok:
+            connection_status = "Conectado e Dados Enviados"
+        elif google_uploader.last_ok is False:
+            connection_status = "Falha ao enviar para o Google"
+    if SHARED_HISTORY:
+        # Os workers mostram o status gravado pelo processo amostrador
+        data_history.status, data_history.last_update = connection_status, last_update
+        publish_command_status()  # a leitura pode ter confirmado um comando
+    return data
+
+shared_commands = None  # situação dos comandos gravada por último no arquivo compartilhado
+
+def publish_command_status():
+    """Amostrador: grava no arquivo compartilhado a situação dos comandos, se mudou."""
+    global shared_commands
+    with history_lock:
+        statuses = {actuator: esp32_commands.status(actuator) for actuator in esp32_commands.commands}
+        if statuses != shared_commands:
+            data_history.commands = shared_commands = statuses
+
+poll_schedule = AdaptivePollScheduler(SAMPLE_MIN_INTERVAL, SAMPLE_MAX_INTERVAL) if ADAPTIVE_POLLING else None
+sampler = BackgroundSampler(sample_once, interval=SAMPLE_INTERVAL, schedule=poll_schedule)
+
+shared_seen = None  # [geração, amostras] do arquivo compartilhado já levadas aos agregados e ao /stream
+shared_reading_seen = None  # horário da última leitura do amostrador já vista
+
+def follow_shared_history():
+    """Worker no modo multiprocesso: leva as amostras novas do arquivo aos agregados e ao /stream."""
+    global data_history, shared_seen, shared_reading_seen
+    with history_lock:
+        if data_history.replaced():  # amostrador reiniciado: arquivo novo, outra geração
+            data_history = device_histories[esp32_ip] = SharedSampleRingBuffer(SHARED_HISTORY)
+        if ROLLUPS_DIR and device_rollups[esp32_ip].replaced():  # amostrador com outras resoluções
+            device_rollups[esp32_ip] = SharedRollups(rollups_path(esp32_ip))
+        tick = [data_history.generation, data_history.appended]
+        reading = data_history.latest
+        records = []
+        if shared_seen is None:
+            # Primeira vez: os agregados já vieram do banco (open_history_store) ou são do amostrador
+            if not history_store and not ROLLUPS_DIR:
+                device_rollups[esp32_ip].extend(data_history.columns())
+            shared_seen = tick
+        elif tick != shared_seen:
+            records = read_shared_records(tick)
+    for i, record in enumerate(records):
+        if LIVE_PUSH:
+            record = {name: None if value != value else value for name, value in record.items()}  # NaN vira None
+            publish_sample(record, [tick[0], tick[1] - len(records) + i + 1], reading)
+    if reading and reading['timestamp'] != shared_reading_seen:
+        # Leitura nova que a compressão ainda não guardou: o painel não espera
+        shared_reading_seen = reading['timestamp']
+        if LIVE_PUSH and not records:
+            publish_sample(None, tick, reading)
+
+def read_shared_records(tick):
+    """Amostras do arquivo compartilhado gravadas desde `shared_seen` (chamada com o lock)."""
+    global shared_seen
+    if tick[0] != shared_seen[0]:  # histórico limpo ou arquivo novo
+        if not ROLLUPS_DIR:  # com ROLLUPS_DIR, quem mantém os agregados é o amostrador
+            device_rollups[esp32_ip].clear()
+        read = data_history.columns
     else:
-        connection_status = "Falha na conexão"
+        # None: o worker ficou mais de HISTORY_SIZE amostras sem olhar; segue do que há
+        seen = shared_seen[1]
+        read = lambda: data_history.columns_since(seen) or data_history.columns()
+    # Copia antes de usar: o amostrador pode sobrescrever as views no meio da leitura
+    cols = data_history.read_consistent(lambda: copied(read()))
+    if not ROLLUPS_DIR:
+        device_rollups[esp32_ip].extend(cols)
+    shared_seen = tick
+    return [dict(zip(cols, values)) for values in zip(*(column.tolist() for column in cols.values()))]
+
+shared_follower = BackgroundSampler(follow_shared_history, interval=SHARED_POLL_INTERVAL)
+
+def run_sampler_only():
+    """SAMPLER_ONLY=1: só lê o ESP32 e grava o histórico (sem servidor web); atende os pedidos e comandos dos workers."""
+    open_rollups()
+    open_history_store()
+    if history_archive:
+        history_archive.start_compaction()
+    sampler.start()
+    while True:
+        for name in data_history.take_requests():
+            if name == "clear":
+                with history_lock:
+                    data_history.clear()
+                    device_rollups[esp32_ip].clear()
+                    device_compressors[esp32_ip].reset()
+            else:
+                sampler.trigger()
+        for actuator, on in data_history.take_commands():
+            esp32_commands.submit(actuator, on)
+        publish_command_status()  # fases que a thread da fila mudou (enviado, falhou...)
+        time.sleep(SHARED_POLL_INTERVAL)
+
+def copied(cols):
+    """Cópia das colunas (views do buffer), ou None."""
+    return None if cols is None else {name: column.copy() for name, column in cols.items()}
+
+def valid_points(cols):
+    """Descarta amostras sem temperatura ou umidade."""
+    valid = ~(np.isnan(cols['temperatura']) | np.isnan(cols['umidade']))
+    return cols if valid.all() else {name: column[valid] for name, column in cols.items()}
+
+CHART_LAYOUT = dict(xaxis_title="Tempo", yaxis=dict(title='Temperatura (°C)'), yaxis2=dict(title='Umidade (%)', overlaying='y', side='right'), legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
 
 def create_temperature_humidity_chart():
-    if not data_history: return go.Figure()
-    df = pd.DataFrame(list(data_history)).dropna(subset=['temperatura', 'umidade'])
+    def draw():
+        cols = valid_points(data_history.columns(last=GRAPH_MAX_POINTS))
+        # Históricos longos: cada curva é reduzida a GRAPH_TARGET_POINTS pontos, mantendo os picos
+        t = downsample(cols['timestamp'], cols['temperatura'], GRAPH_TARGET_POINTS, GRAPH_DOWNSAMPLE)
+        u = downsample(cols['timestamp'], cols['umidade'], GRAPH_TARGET_POINTS, GRAPH_DOWNSAMPLE)
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=cols['timestamp'][t], y=cols['temperatura'][t], mode='lines+markers', name='Temperatura (°C)', line=dict(color='red')))
+        fig.add_trace(go.Scatter(x=cols['timestamp'][u], y=cols['umidade'][u], mode='lines+markers', name='Umidade (%)', line=dict(color='blue'), yaxis="y2"))
+        return fig
+
+    # As colunas são views do buffer circular: o gráfico é montado segurando o lock
+    # (no modo multiprocesso, refeito se o amostrador sobrescreveu as views no meio)
+    with history_lock:
+        if not data_history: return go.Figure()
+        fig = data_history.read_consistent(draw)
+    fig.update_layout(title="Histórico de Temperatura e Umidade", **CHART_LAYOUT)
+    return fig
+
+def rollup_window(span):
+    """Agregados da placa principal nos últimos `span` segundos, na resolução que cabe no gráfico."""
+    start = np.datetime64(datetime.now(), 'us') - np.timedelta64(span, 's')
+    with history_lock:
+        rollups = device_rollups[esp32_ip]
+        resolution = rollups.resolution_for(start, max_points=GRAPH_TARGET_POINTS)
+        return resolution, rollups.columns(resolution, start)
+
+def create_rollup_chart(span):
+    # Intervalos longos: média de cada balde com a faixa mín–máx, sem varrer as amostras brutas
+    resolution, cols = rollup_window(span)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df['timestamp'], y=df['temperatura'], mode='lines+markers', name='Temperatura (°C)', line=dict(color='red')))
-    fig.add_trace(go.Scatter(x=df['timestamp'], y=df['umidade'], mode='lines+markers', name='Umidade (%)', line=dict(color='blue'), yaxis="y2"))
-    fig.update_layout(title="Histórico de Temperatura e Umidade", xaxis_title="Tempo", yaxis=dict(title='Temperatura (°C)'), yaxis2=dict(title='Umidade (%)', overlaying='y', side='right'), legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    for field, name, color, band, axis in [('temperatura', 'Temperatura (°C)', 'red', 'rgba(255,0,0,0.15)', 'y'),
+                                           ('umidade', 'Umidade (%)', 'blue', 'rgba(0,0,255,0.15)', 'y2')]:
+        fig.add_trace(go.Scatter(x=cols['timestamp'], y=cols[field + '_max'], mode='lines', line=dict(width=0), yaxis=axis, showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=cols['timestamp'], y=cols[field + '_min'], mode='lines', line=dict(width=0), fill='tonexty', fillcolor=band, yaxis=axis, name=f"{name} mín–máx"))
+        fig.add_trace(go.Scatter(x=cols['timestamp'], y=cols[field + '_mean'], mode='lines', name=name, line=dict(color=color), yaxis=axis))
+    fig.update_layout(title=f"Temperatura e Umidade (média a cada {resolution})", **CHART_LAYOUT)
     return fig
 
+def update_chart(cursor=None, span=0):
+    """Figura completa ou só os pontos novos desde `cursor` (via extendData).
+
+    `cursor` é [geração, amostras gravadas] do histórico já desenhado no navegador.
+    Com `span` (segundos) o gráfico vem dos agregados e é sempre enviado inteiro.
+    Devolve (figure, extendData, novo cursor), com no_update no que não mudou.
+    """
+    if span:
+        return create_rollup_chart(span), no_update, None  # cursor vazio: ao voltar, manda tudo
+    with history_lock:
+        new_cursor = [data_history.generation, data_history.appended] if data_history else None
+        cols = None
+        if GRAPH_INCREMENTAL and cursor and cursor[0] == data_history.generation:
+            cols = data_history.read_consistent(lambda: copied(data_history.columns_since(cursor[1])))
+        if cols is None:
+            # Primeiro acesso, histórico limpo ou navegador muito atrasado: manda tudo
+            return create_temperature_humidity_chart(), no_update, new_cursor
+        cols = valid_points(cols)
+        if not len(cols['timestamp']):
+            return no_update, no_update, new_cursor
+        x = np.datetime_as_string(cols['timestamp']).tolist()
+        extend = [dict(x=[x, x], y=[cols['temperatura'].tolist(), cols['umidade'].tolist()]), [0, 1], GRAPH_MAX_POINTS]
+    return no_update, extend, new_cursor
+
+TABLE_COLUMNS = [
+    {"name": "Horário", "id": "timestamp"}, {"name": "Temperatura (°C)", "id": "temperatura"},
+    {"name": "Umidade (%)", "id": "umidade"}, {"name": "Botão", "id": "botao"},
+    {"name": "Motor", "id": "motor"}, {"name": "Alarme", "id": "alarme"},
+]
+ROLLUP_TABLE_COLUMNS = [
+    {"name": "Horário", "id": "timestamp"}, {"name": "Temp. média", "id": "temperatura_mean"},
+    {"name": "Temp. mín", "id": "temperatura_min"}, {"name": "Temp. máx", "id": "temperatura_max"},
+    {"name": "Umid. média", "id": "umidade_mean"}, {"name": "Motor (%)", "id": "motor_duty"},
+    {"name": "Alarme (%)", "id": "alarme_duty"}, {"name": "Amostras", "id": "samples"},
+]
+if not ROLLUPS_DIR and (HISTORY_DB or SHARED_READER):
+    # Agregados refeitos das amostras comprimidas (ver ROLLUPS_DIR): só mín/máx/média valem
+    ROLLUP_TABLE_COLUMNS = [c for c in ROLLUP_TABLE_COLUMNS if not c["id"].endswith("_duty") and c["id"] != "samples"]
+
+def page_rows(cols, columns):
+    """Colunas de uma página (mais recentes primeiro) -> linhas da DataTable, já formatadas."""
+    rows = {"timestamp": pd.DatetimeIndex(cols["timestamp"]).strftime("%d/%m/%Y %H:%M:%S").tolist()}
+    for column in columns[1:]:
+        name = column["id"]
+        values = cols[name] * 100 if name.endswith("_duty") else cols[name]
+        if values.dtype.kind == "f":
+            values = np.round(values, 1)
+            rows[name] = [None if v != v else v for v in values.tolist()]  # NaN vira célula vazia
+        else:
+            rows[name] = values.tolist()
+    return [dict(zip(rows, row)) for row in zip(*rows.values())]
+
+def table_page(page, span=0):
+    """Uma página da tabela, mais recentes primeiro: (linhas, colunas, páginas, título).
+
+    Só a página pedida é lida e serializada: do banco (LIMIT/OFFSET) quando
+    ele existe, senão do buffer em memória; com `span`, dos agregados.
+    No banco, a tabela começa no último "Limpar Gráficos", como o gráfico.
+    """
+    def clamp(total):
+        pages = max(1, -(-total // TABLE_PAGE_SIZE))
+        return pages, min(page or 0, pages - 1)
+
+    def newest_first(cols, total, page):
+        stop = total - page * TABLE_PAGE_SIZE
+        return {name: column[max(stop - TABLE_PAGE_SIZE, 0):stop][::-1] for name, column in cols.items()}
+
+    if span:
+        resolution, cols = rollup_window(span)
+        total = len(cols['timestamp'])
+        pages, page = clamp(total)
+        return (page_rows(newest_first(cols, total, page), ROLLUP_TABLE_COLUMNS), ROLLUP_TABLE_COLUMNS, pages,
+                f"📋 Resumo a cada {resolution} ({total} intervalos)")
+    if history_store:
+        since = data_history.cleared_at
+        total = history_store.count(esp32_ip, start=since)  # só conta as linhas novas desde a última chamada
+        pages, page = clamp(total)
+        cols = history_store.query(esp32_ip, start=since, limit=TABLE_PAGE_SIZE, offset=page * TABLE_PAGE_SIZE,
+                                   newest=True)
+        cols = {name: column[::-1] for name, column in cols.items()}
+    else:
+        def read_page():
+            cols = data_history.columns()
+            total = len(cols['timestamp'])
+            pages, current = clamp(total)
+            return total, pages, copied(newest_first(cols, total, current))
+
+        with history_lock:
+            total, pages, cols = data_history.read_consistent(read_page)
+    return page_rows(cols, TABLE_COLUMNS), TABLE_COLUMNS, pages, f"📋 Dados Recentes ({total} amostras)"
+
 # ----------------------------
 # Layout do Dash App
 # ----------------------------
 app = dash.Dash(__name__, server=server, url_base_pathname="/")
+
+@server.before_request
+def start_sampler():
+    # Sobe o histórico em disco e o amostrador no primeiro acesso
+    # (também funciona em cada worker do gunicorn)
+    open_rollups()
+    open_history_store()
+    if SHARED_READER:
+        shared_follower.start()  # quem lê o ESP32 e grava o arquivo é o processo amostrador
+        return
+    if history_archive:
+        history_archive.start_compaction()  # junta as horas de cada dia em dia.parquet
+    sampler.start()
+
+@server.route("/stream")
+def stream_samples():
+    """Server-Sent Events: cada amostra nova da placa principal, assim que chega."""
+    last_id = request.headers.get("Last-Event-ID", type=int)  # reconexão: reenvia o que a aba perdeu
+    return Response(sample_stream.stream(last_id), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 app.layout = html.Div([
     html.H1("🌡️ Painel de Controle ESP32 com Integração Google Forms"),
     dcc.Loading(id="loading-icon", type="default", children=[
@@ -122,98 +638,252 @@ app.layout = html.Div([
     ]),
     html.Button("Atualizar Dados", id="btn-update", n_clicks=0),
     html.Button("🗑️ Limpar Gráficos", id="btn-clear-graphs", n_clicks=0, style={'marginLeft': '10px'}),
-    dcc.Interval(id="auto-update", interval=5000, n_intervals=0),
+    dcc.Interval(id="auto-update", interval=PUSH_FALLBACK_INTERVAL * 1000 if LIVE_PUSH else (SAMPLE_MIN_INTERVAL if ADAPTIVE_POLLING else SAMPLE_INTERVAL) * 1000, n_intervals=0),
+    dcc.Store(id="live-sample"),  # última amostra recebida por /stream
+    dcc.Dropdown(id="graph-span", options=[{"label": k, "value": v} for k, v in GRAPH_SPANS.items()], value=0, clearable=False, style={"width": "250px", "marginTop": "10px"}),
     dcc.Graph(id="temp-hum-graph"),
+    dcc.Store(id="graph-cursor"),  # quanto do histórico este navegador já desenhou
+    dcc.Store(id="sample-tick"),   # [geração, amostras gravadas] do histórico já exibido
+    dcc.Store(id="reading-shown"), # horário da leitura exibida no painel
     html.Div([
         html.H3("🎛️ Controles"),
         html.Button("▶️ Ligar Motor", id="btn-motor-on", n_clicks=0),
         html.Button("⏹️ Desligar Motor", id="btn-motor-off", n_clicks=0),
         html.Button("🔔 Ativar Alarme", id="btn-alarm-on", n_clicks=0),
         html.Button("🔕 Desativar Alarme", id="btn-alarm-off", n_clicks=0),
+        html.Div(id="control-status", style={"margin": "10px 0"}),
     ], style={"marginTop": "20px"}),
     html.Div([
-        html.H3("📋 Dados Recentes (últimos 10)"),
-        html.Div(id="recent-data-table")
+        html.H3("📋 Dados Recentes", id="recent-data-title"),
+        # Paginação no servidor: o navegador só recebe a página que está na tela
+        dash_table.DataTable(id="recent-data-table", columns=TABLE_COLUMNS, page_action="custom",
+                             page_current=0, page_size=TABLE_PAGE_SIZE, style_cell={"textAlign": "center"})
     ])
 ])
 
+def current_readings(last_data):
+    if not last_data:
+        return [html.P("❌ Sem dados do ESP32")]
+    return [
+        html.P(f"🌡️ Temperatura: {last_data['temperatura']:.1f} °C" if last_data.get('temperatura') is not None else "Temperatura: N/A"),
+        html.P(f"💧 Umidade: {last_data['umidade']:.1f} %" if last_data.get('umidade') is not None else "Umidade: N/A"),
+        html.P(f"🔘 Botão: {'Pressionado' if last_data['botao'] else 'Solto'}"),
+        html.P(f"⚙️ Motor: {'Ligado' if last_data['motor'] else 'Desligado'}"),
+        html.P(f"🚨 Alarme: {'Ativo' if last_data['alarme'] else 'Inativo'}")
+    ]
+
+def status_message():
+    status, updated = connection_status, last_update
+    if SHARED_READER:
+        status, updated = data_history.status or status, data_history.last_update
+    status_icon = '🟢' if "Conectado" in status else '🟡' if "Google" in status else '🔴'
+    status_msg = f"{status_icon} {status}"
+    if updated:
+        status_msg += f" | Última atualização: {updated.strftime('%H:%M:%S')}"
+    return status_msg
+
+CONTROL_BUTTONS = {
+    "btn-motor-on": ("motor", True), "btn-motor-off": ("motor", False),
+    "btn-alarm-on": ("alarme", True), "btn-alarm-off": ("alarme", False),
+}
+
+def command_status_message(requested=None):
+    """Último comando de cada atuador: fase (enviando, confirmado...) e latência até a confirmação.
+
+    `requested`: (atuador, ligado) recém-pedido ao amostrador, mostrado como pendente.
+    """
+    if SHARED_READER:
+        statuses = data_history.commands  # gravada pelo amostrador, igual em todos os workers
+    else:
+        statuses = {actuator: esp32_commands.status(actuator) for actuator in esp32_commands.commands}
+    if requested:
+        statuses[requested[0]] = ("pendente", requested[1], None)
+    parts = []
+    for actuator, label, on_text, off_text in [("motor", "⚙️ Motor", "ligar", "desligar"),
+                                               ("alarme", "🚨 Alarme", "ativar", "desativar")]:
+        status = statuses.get(actuator)
+        if status:
+            phase, on, latency = status
+            text = f"{label}: {on_text if on else off_text} {PHASES[phase]} {phase}"
+            parts.append(text + (f" em {latency:.1f} s" if latency is not None else ""))
+    return " | ".join(parts)
+
 # ----------------------------
-# Callback Principal
+# Callbacks
 # ----------------------------
+# Cada interação roda só o que ela muda: os botões de controle só enfileiram
+# o comando e devolvem o próprio status; o intervalo olha se chegou amostra nova e só
+# então (via sample-tick) gráfico e tabela são refeitos.
 @app.callback(
-    Output("temp-hum-graph", "figure"),
-    Output("current-data", "children"),
-    Output("status-connection", "children"),
-    Output("recent-data-table", "children"),
-    Input("btn-update", "n_clicks"),
-    Input("auto-update", "n_intervals"),
+    Output("control-status", "children"),
     Input("btn-motor-on", "n_clicks"),
     Input("btn-motor-off", "n_clicks"),
     Input("btn-alarm-on", "n_clicks"),
     Input("btn-alarm-off", "n_clicks"),
+    Input("sample-tick", "data"),  # amostra nova pode confirmar um comando
+    Input("reading-shown", "data"),  # leitura retida pela compressão também
+    State("control-status", "children"),
+    prevent_initial_call=True
+)
+def update_controls(m_on, m_off, a_on, a_off, tick, reading_time, shown):
+    requested = None
+    if ctx.triggered_id in CONTROL_BUTTONS and SHARED_READER:
+        requested = CONTROL_BUTTONS[ctx.triggered_id]
+        data_history.request_command(*requested)  # quem fala com a placa é o amostrador
+    elif ctx.triggered_id in CONTROL_BUTTONS:
+        esp32_commands.submit(*CONTROL_BUTTONS[ctx.triggered_id])  # não espera a placa
+    message = command_status_message(requested)
+    return message if message != shown else no_update
+
+@app.callback(
+    Output("current-data", "children"),
+    Output("status-connection", "children"),
+    Output("sample-tick", "data"),
+    Output("reading-shown", "data"),
+    Input("btn-update", "n_clicks"),
+    Input("auto-update", "n_intervals"),
     Input("btn-clear-graphs", "n_clicks"),
+    State("sample-tick", "data"),
+    State("status-connection", "children"),
+    State("reading-shown", "data"),
     prevent_initial_call=False
 )
-def update_dashboard(n_update, n_interval, m_on, m_off, a_on, a_off, n_clear):
-    global connection_status, data_history
-    
-    triggered_id = ctx.triggered_id if ctx.triggered_id else 'auto-update'
-
-    if triggered_id == "btn-clear-graphs":
-        data_history.clear()
-        return create_temperature_humidity_chart(), html.P("Histórico limpo."), "⚪ Histórico limpo.", html.P("Sem dados.")
-
-    # Lógica de controle de botões
-    if triggered_id.startswith("btn-"):
-        if triggered_id == "btn-motor-on":
-            connection_status = "Motor ligado" if esp32.control_motor("ligar") else "Falha ao ligar motor"
-        elif triggered_id == "btn-motor-off":
-            connection_status = "Motor desligado" if esp32.control_motor("desligar") else "Falha ao desligar motor"
-        elif triggered_id == "btn-alarm-on":
-            connection_status = "Alarme ativado" if esp32.control_alarm("ligar") else "Falha ao ativar alarme"
-        elif triggered_id == "btn-alarm-off":
-            connection_status = "Alarme desativado" if esp32.control_alarm("desligar") else "Falha ao desativar alarme"
-
-    # Busca de dados do ESP32
-    data = esp32.get_sensor_data()
-    update_data_history(data)
-
-    # --- NOVO: Envio para o Google Form ---
-    if data:
-        google_success = send_data_to_google_form(data)
-        if google_success:
-            # Atualiza o status para refletir o envio bem-sucedido
-            connection_status = "Conectado e Dados Enviados"
-        else:
-            connection_status = "Falha ao enviar para o Google"
+def update_sample(n_update, n_interval, n_clear, tick, shown_status, shown_reading):
+    if ctx.triggered_id == "btn-clear-graphs" and SHARED_READER:
+        data_history.request("clear")  # quem grava o histórico é o processo amostrador
+        return html.P("Histórico limpo."), "⚪ Histórico limpo.", no_update, None
+    if ctx.triggered_id == "btn-clear-graphs":
+        with history_lock:
+            data_history.clear()
+            device_rollups[esp32_ip].clear()
+            device_compressors[esp32_ip].reset()
+            tick = [data_history.generation, data_history.appended]
+        return html.P("Histórico limpo."), "⚪ Histórico limpo.", tick, None
 
-    # Geração dos componentes de saída
-    fig = create_temperature_humidity_chart()
-    
-    if data_history:
-        last_data = data_history[-1]
-        current = [
-            html.P(f"🌡️ Temperatura: {last_data['temperatura']:.1f} °C" if last_data.get('temperatura') is not None else "Temperatura: N/A"),
-            html.P(f"💧 Umidade: {last_data['umidade']:.1f} %" if last_data.get('umidade') is not None else "Umidade: N/A"),
-            html.P(f"🔘 Botão: {'Pressionado' if last_data['botao'] else 'Solto'}"),
-            html.P(f"⚙️ Motor: {'Ligado' if last_data['motor'] else 'Desligado'}"),
-            html.P(f"🚨 Alarme: {'Ativo' if last_data['alarme'] else 'Inativo'}")
-        ]
-        df = pd.DataFrame(list(data_history)); df['timestamp'] = df['timestamp'].dt.strftime("%H:%M:%S"); df = df.tail(10).iloc[::-1]
-        table = html.Table([html.Thead(html.Tr([html.Th(col) for col in df.columns])), html.Tbody([html.Tr([html.Td(df.iloc[i][col]) for col in df.columns]) for i in range(len(df))])], style={'width': '100%', 'textAlign': 'center'})
-    else:
-        current = [html.P("❌ Sem dados do ESP32")]
-        table = html.P("Sem histórico de dados.")
+    # A leitura do ESP32 e o envio ao Google ficam com o amostrador;
+    # aqui só pedimos uma leitura antecipada e lemos o último retrato.
+    if ctx.triggered_id == "btn-update" and SHARED_READER:
+        data_history.request("sample")
+    elif ctx.triggered_id == "btn-update":
+        sampler.trigger()
 
-    status_icon = '🟢' if "Conectado" in connection_status else '🟡' if "Google" in connection_status else '🔴'
-    status_msg = f"{status_icon} {connection_status}"
-    if last_update:
-        status_msg += f" | Última atualização: {last_update.strftime('%H:%M:%S')}"
+    with history_lock:
+        new_tick = [data_history.generation, data_history.appended]
+        # Leitura mais recente, mesmo que a compressão a tenha retido (antes da 1ª: a última do banco)
+        reading = data_history.latest or data_history.read_consistent(data_history.last)
+    reading_time = reading['timestamp'].isoformat() if reading else None
+    status_msg = status_message()
+    if new_tick == tick and reading_time == shown_reading:  # nada novo: nada a redesenhar
+        return no_update, status_msg if status_msg != shown_status else no_update, no_update, no_update
+    return (current_readings(reading), status_msg, new_tick if new_tick != tick else no_update,
+            reading_time)
 
-    return fig, current, status_msg, table
+@app.callback(
+    Output("temp-hum-graph", "figure"),
+    Output("temp-hum-graph", "extendData"),
+    Output("graph-cursor", "data"),
+    Input("sample-tick", "data"),
+    Input("graph-span", "value"),
+    State("graph-cursor", "data"),
+    prevent_initial_call=True
+)
+def update_graph(tick, span, cursor):
+    return update_chart(cursor, span)
+
+@app.callback(
+    Output("recent-data-table", "data"),
+    Output("recent-data-table", "columns"),
+    Output("recent-data-table", "page_count"),
+    Output("recent-data-title", "children"),
+    Input("sample-tick", "data"),
+    Input("recent-data-table", "page_current"),
+    Input("graph-span", "value"),
+    prevent_initial_call=True
+)
+def update_table(tick, page, span):
+    return table_page(page, span)
+
+# ----------------------------
+# Push das amostras (LIVE_PUSH)
+# ----------------------------
+# Cada aba abre um EventSource em /stream; cada amostra recebida é
+# acrescentada no próprio navegador (gráfico, leituras atuais, primeira
+# página da tabela), sem nenhum callback no servidor.
+LIVE_CONNECT_JS = """
+function(id) {
+    if (!window.esp32Stream) {  // uma conexão por aba; o EventSource reconecta sozinho
+        window.esp32Stream = new EventSource("/stream");
+        window.esp32Stream.onmessage = function(e) {
+            window.dash_clientside.set_props("live-sample", {data: JSON.parse(e.data)});
+        };
+    }
+    return window.dash_clientside.no_update;
+}
+"""
+
+LIVE_APPEND_JS = """
+function(sample, cursor, span, rows, page) {
+    const skip = window.dash_clientside.no_update;
+    const round = v => v === null ? null : Math.round(v * 10) / 10;
+    const p = text => ({namespace: "dash_html_components", type: "P", props: {children: text}});
+    const live = sample.current || sample;  // leitura mais recente (a compressão pode reter a amostra)
+    const current = [
+        p(live.temperatura !== null ? `🌡️ Temperatura: ${live.temperatura.toFixed(1)} °C` : "Temperatura: N/A"),
+        p(live.umidade !== null ? `💧 Umidade: ${live.umidade.toFixed(1)} %%` : "Umidade: N/A"),
+        p(`🔘 Botão: ${live.botao ? "Pressionado" : "Solto"}`),
+        p(`⚙️ Motor: ${live.motor ? "Ligado" : "Desligado"}`),
+        p(`🚨 Alarme: ${live.alarme ? "Ativo" : "Inativo"}`),
+    ];
+    // Gráfico e tabela só com amostra guardada e quando a aba está em dia com o histórico
+    if (!sample.timestamp || span || !cursor || (cursor[0] === sample.tick[0] && sample.tick[1] <= cursor[1])) {
+        return [skip, skip, current, sample.status, skip, skip, sample.commands || skip];
+    }
+    if (cursor[0] !== sample.tick[0] || sample.tick[1] !== cursor[1] + 1) {
+        // Histórico limpo ou amostras perdidas: sample-tick faz o servidor mandar o que falta
+        return [skip, skip, current, sample.status, skip, sample.tick, sample.commands || skip];
+    }
+    let extend = skip;
+    if (sample.temperatura !== null && sample.umidade !== null) {
+        extend = [{x: [[sample.timestamp], [sample.timestamp]], y: [[sample.temperatura], [sample.umidade]]}, [0, 1], %d];
+    }
+    let table = skip;
+    if (!page && rows) {
+        const t = sample.timestamp;  // AAAA-MM-DDTHH:MM:SS -> DD/MM/AAAA HH:MM:SS
+        const row = {timestamp: `${t.slice(8, 10)}/${t.slice(5, 7)}/${t.slice(0, 4)} ${t.slice(11, 19)}`,
+                     temperatura: round(sample.temperatura), umidade: round(sample.umidade),
+                     botao: sample.botao, motor: sample.motor, alarme: sample.alarme};
+        table = [row].concat(rows).slice(0, %d);
+    }
+    return [extend, sample.tick, current, sample.status, table, skip, sample.commands || skip];
+}
+""" % (GRAPH_MAX_POINTS, TABLE_PAGE_SIZE)
+
+if LIVE_PUSH:
+    app.clientside_callback(LIVE_CONNECT_JS, Output("live-sample", "data"), Input("live-sample", "id"))
+    app.clientside_callback(
+        LIVE_APPEND_JS,
+        Output("temp-hum-graph", "extendData", allow_duplicate=True),
+        Output("graph-cursor", "data", allow_duplicate=True),
+        Output("current-data", "children", allow_duplicate=True),
+        Output("status-connection", "children", allow_duplicate=True),
+        Output("recent-data-table", "data", allow_duplicate=True),
+        Output("sample-tick", "data", allow_duplicate=True),
+        Output("control-status", "children", allow_duplicate=True),
+        Input("live-sample", "data"),
+        State("graph-cursor", "data"),
+        State("graph-span", "value"),
+        State("recent-data-table", "data"),
+        State("recent-data-table", "page_current"),
+        prevent_initial_call=True
+    )
 
 # ----------------------------
 # Rodar servidor
 # ----------------------------
 if __name__ == "__main__":
-    app.run(debug=False, port=8050)
+    # SIGTERM (systemd, docker stop) também encerra pelo atexit, como o Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if SAMPLER_ONLY:
+        run_sampler_only()
+    else:
+        app.run(debug=False, port=8050)
@@ -0,0 +1,70 @@
+import numpy as np
+
+# ----------------------------
+# Redução de pontos para gráficos
+# ----------------------------
+def _as_float(x):
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':  # datetime64: usa o inteiro por trás
+        return x.astype('datetime64[us]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: índices de até `threshold` pontos que preservam a forma.
+
+    O primeiro e o último ponto sempre ficam. O laço é por balde (no máximo
+    `threshold` voltas); dentro de cada balde as contas são feitas com NumPy.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    xf, yf = _as_float(x), np.asarray(y, dtype=np.float64)
+    # Baldes internos (sem o primeiro e o último ponto)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sizes = ends - starts
+    # Média de cada balde, calculada de uma vez
+    avg_x = np.add.reduceat(xf[1:n - 1], starts - 1) / sizes
+    avg_y = np.add.reduceat(yf[1:n - 1], starts - 1) / sizes
+    avg_x = np.append(avg_x, xf[-1])  # o "próximo balde" do último é o ponto final
+    avg_y = np.append(avg_y, yf[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        s, e = starts[i], ends[i]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        ax, ay = xf[a], yf[a]
+        # Área (x2) do triângulo a-b-c para todo b do balde
+        area = np.abs((ax - cx) * (yf[s:e] - ay) - (ax - xf[s:e]) * (cy - ay))
+        a = s + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, threshold):
+    """Envelope mín/máx: em cada balde guarda o menor e o maior valor (até `threshold` pontos)."""
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    yf = np.asarray(y, dtype=np.float64)
+    size = int(np.ceil(n / (threshold // 2)))
+    buckets = int(np.ceil(n / size))
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = yf
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.unique(np.clip(np.concatenate([lows, highs]), 0, n - 1))
+
+
+def downsample(x, y, threshold, mode="lttb"):
+    """Índices dos pontos a desenhar; `mode` é "lttb", "minmax" ou "" (sem redução)."""
+    if mode == "lttb":
+        return lttb(x, y, threshold)
+    if mode == "minmax":
+        return minmax(y, threshold)
+    return np.arange(len(y))
@@ -0,0 +1,77 @@
+import asyncio
+import aiohttp
+
+# ----------------------------
+# Poller assíncrono para vários ESP32
+# ----------------------------
+class ESP32FleetPoller:
+    """Consulta vários ESP32 ao mesmo tempo usando asyncio.
+
+    Cada placa tem seu próprio timeout, então uma placa lenta não atrasa as
+    outras. `max_in_flight` limita quantas requisições ficam abertas ao mesmo tempo.
+    A sessão (e suas conexões keep-alive) e o event loop duram entre as rodadas:
+    chame `poll` sempre da mesma thread e `close()` ao encerrar.
+
+    `readers` dá uma função de leitura síncrona para algumas placas (ex.:
+    {ip: ESP32Controller.get_sensor_data}), rodada numa thread em paralelo
+    com as outras; essas placas não passam pela sessão do poller.
+    """
+    def __init__(self, ips, timeout=2.0, max_in_flight=32, timeouts=None, readers=None):
+        self.ips = list(ips)
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})  # timeout específico por IP
+        self.max_in_flight = max_in_flight
+        self.readers = dict(readers or {})
+        self._loop = None
+        self._session = None
+        self._session_loop = None
+
+    async def _fetch(self, session, semaphore, ip):
+        """Busca os dados de uma placa; devolve (ip, dados) ou (ip, None) em caso de falha."""
+        if ip in self.readers:
+            return ip, await asyncio.get_running_loop().run_in_executor(None, self.readers[ip])
+        timeout = aiohttp.ClientTimeout(total=self.timeouts.get(ip, self.timeout))
+        async with semaphore:
+            try:
+                async with session.get(f"http://{ip}", timeout=timeout) as response:
+                    if response.status != 200:
+                        return ip, None
+                    data = await response.json(content_type=None)
+                    return ip, data[0] if isinstance(data, list) and data else None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return ip, None
+
+    def _get_session(self):
+        # A sessão pertence ao loop em que foi criada
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_in_flight))
+            self._session_loop = loop
+        return self._session
+
+    async def poll_round(self):
+        """Faz uma rodada de leitura em todas as placas e devolve {ip: dados}."""
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        session = self._get_session()
+        results = await asyncio.gather(*(self._fetch(session, semaphore, ip) for ip in self.ips))
+        return dict(results)
+
+    def poll(self, on_sample=None):
+        """Versão síncrona de poll_round; chama on_sample(dados, ip) para cada placa."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        results = self._loop.run_until_complete(self.poll_round())
+        if on_sample:
+            for ip, data in results.items():
+                on_sample(data, ip)
+        return results
+
+    def close(self):
+        """Fecha as conexões e o event loop (ao encerrar o processo)."""
+        if self._loop is None:
+            return
+        if self._session is not None:
+            self._loop.run_until_complete(self._session.close())
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
+        self._loop = self._session = self._session_loop = None
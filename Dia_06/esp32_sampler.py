@@ -0,0 +1,68 @@
+import threading
+import time
+
+# ----------------------------
+# Amostrador em segundo plano
+# ----------------------------
+class BackgroundSampler:
+    """Chama `sample_fn` a cada `interval` segundos numa thread própria.
+
+    Assim a leitura do ESP32 acontece uma vez por período, não importa
+    quantas abas do dashboard estejam abertas.
+
+    Com `schedule` (ex.: AdaptivePollScheduler), o intervalo muda a cada
+    rodada: o que `sample_fn` devolve vai para `schedule.next_interval`.
+    """
+    def __init__(self, sample_fn, interval=5.0, schedule=None):
+        self.sample_fn = sample_fn
+        self.interval = interval
+        self.schedule = schedule
+        self.last_duration = None  # duração da última amostragem (s)
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia a thread; chamadas repetidas não criam outra."""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="esp32-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def trigger(self):
+        """Pede uma amostragem imediata sem esperar o próximo período."""
+        self._wake.set()
+
+    def _run(self):
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            result = None
+            try:
+                result = self.sample_fn()
+                self.last_error = None
+            except Exception as e:  # a thread não pode morrer por causa de uma leitura
+                self.last_error = e
+            if self.schedule:
+                self.interval = self.schedule.next_interval(result)
+            self.last_duration = time.monotonic() - started
+            # Mantém a taxa fixa descontando o tempo gasto na leitura
+            next_run = max(next_run + self.interval, time.monotonic())
+            self._wake.wait(next_run - time.monotonic())
+            if self._wake.is_set():
+                self._wake.clear()
+                next_run = time.monotonic()
@@ -0,0 +1,163 @@
+"""
+Simulador local do ESP32 com DHT22 (mesmo protocolo do DHT22_ESP32_WiFiSERVER).
+
+Cada placa virtual escuta numa porta de loopback e responde a qualquer GET
+com a lista JSON [{"Temperatura", "Umidade", "Botao", "Motor", "Alarme"}].
+/motor1_h, /motor1_l, /alarme_h e /alarme_l mudam o estado antes de responder,
+como no firmware.
+
+Uso: python esp32_simulator.py --boards 3 --port 8081 --delay 0.05
+     ESP32_IP=127.0.0.1:8081 python dashboardESP32_v4.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+COMMANDS = {
+    "/motor1_h": ("Motor", 1),
+    "/motor1_l": ("Motor", 0),
+    "/alarme_h": ("Alarme", 1),
+    "/alarme_l": ("Alarme", 0),
+}
+
+
+class SimulatedESP32:
+    """Uma placa virtual.
+
+    delay/jitter: atraso de cada resposta (s); connect_delay: custo de cada
+    conexão nova; drop_rate: fração de requisições em que a conexão cai sem
+    resposta; single_connection: atende um cliente por vez, como o WebServer
+    do ESP32; keep_alive: False responde com "Connection: close" como o firmware.
+    Os atributos podem ser alterados com a placa rodando.
+    """
+    def __init__(self, port=0, host="127.0.0.1", delay=0.0, jitter=0.0, connect_delay=0.0,
+                 drop_rate=0.0, single_connection=True, keep_alive=False, seed=None):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.jitter = jitter
+        self.connect_delay = connect_delay
+        self.drop_rate = drop_rate
+        self.single_connection = single_connection
+        self.keep_alive = keep_alive
+        self.random = random.Random(seed)
+        self.state = {"Temperatura": 25.0, "Umidade": 60.0, "Botao": 0, "Motor": 0, "Alarme": 0}
+        self.requests = 0  # total de requisições recebidas
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        server_class = HTTPServer if self.single_connection else ThreadingHTTPServer
+        self._httpd = server_class((self.host, self.port), self._handler_class())
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name=f"esp32-sim-{self.port}", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def read(self, path="/"):
+        """Aplica um comando (se houver) e devolve a leitura atual dos sensores."""
+        with self._lock:
+            self.requests += 1
+            if path in COMMANDS:
+                field, value = COMMANDS[path]
+                self.state[field] = value
+            # Passeio aleatório lento, como uma sala de verdade
+            self.state["Temperatura"] = round(self.state["Temperatura"] + self.random.gauss(0, 0.05), 2)
+            self.state["Umidade"] = round(min(100.0, max(0.0, self.state["Umidade"] + self.random.gauss(0, 0.1))), 2)
+            return [dict(self.state)]
+
+    def _handler_class(self):
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                if board.connect_delay:
+                    time.sleep(board.connect_delay)
+                super().setup()
+
+            def do_GET(self):
+                if board.delay or board.jitter:
+                    time.sleep(max(0.0, board.delay + board.random.uniform(-board.jitter, board.jitter)))
+                if board.drop_rate and board.random.random() < board.drop_rate:
+                    self.close_connection = True  # derruba sem responder
+                    return
+                body = json.dumps(board.read(self.path)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if not board.keep_alive:
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class SimulatedFleet:
+    """N placas virtuais em portas consecutivas (ou livres, com base_port=0)."""
+    def __init__(self, n, base_port=0, **board_options):
+        self.boards = [SimulatedESP32(port=base_port + i if base_port else 0, **board_options) for i in range(n)]
+
+    @property
+    def addresses(self):
+        return [board.address for board in self.boards]
+
+    def start(self):
+        for board in self.boards:
+            board.start()
+        return self
+
+    def stop(self):
+        # shutdown() espera o laço do servidor (até 0,5 s); para todas em paralelo
+        threads = [threading.Thread(target=board.stop) for board in self.boards]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de placas ESP32 + DHT22")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8081, help="porta da primeira placa")
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--threaded", action="store_true", help="atende várias conexões ao mesmo tempo")
+    parser.add_argument("--keep-alive", action="store_true")
+    args = parser.parse_args()
+
+    fleet = SimulatedFleet(args.boards, base_port=args.port, delay=args.delay, jitter=args.jitter,
+                           drop_rate=args.drop_rate, single_connection=not args.threaded,
+                           keep_alive=args.keep_alive).start()
+    print("Placas simuladas:", ",".join(fleet.addresses))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fleet.stop()
@@ -0,0 +1,128 @@
+import queue
+import random
+import threading
+import time
+from collections import deque
+import requests
+
+# ----------------------------
+# Envio ao Google Forms em segundo plano
+# ----------------------------
+class GoogleFormUploader:
+    """Fila limitada + threads que enviam as amostras ao Google Form.
+
+    `submit` nunca bloqueia: se a fila estiver cheia, a amostra mais antiga
+    é descartada para dar lugar à nova. Falhas de rede e respostas 429/5xx
+    são repetidas com backoff exponencial e jitter.
+    """
+    def __init__(self, url, params_fn, workers=2, queue_size=100, max_retries=5,
+                 base_delay=0.5, max_delay=30.0, timeout=3):
+        self.url = url
+        self.params_fn = params_fn  # converte a amostra nos parâmetros do formulário
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()  # contadores são atualizados por várias threads
+        self._threads = []
+        # Métricas
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.last_ok = None
+        self._latencies = deque(maxlen=200)  # tempo entre submit e envio concluído (s)
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"form-uploader-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, data: dict):
+        """Enfileira uma amostra; devolve False se uma amostra antiga foi descartada."""
+        self.start()
+        item = (time.monotonic(), data)
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        # Fila cheia: a amostra mais antiga já está velha, troca pela nova
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._count('dropped')
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._count('dropped')
+        return False
+
+    def join(self):
+        """Espera a fila esvaziar (útil em scripts e testes)."""
+        self._queue.join()
+
+    def _count(self, name):
+        with self._metrics_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def metrics(self):
+        latencies = sorted(self._latencies)
+        return {
+            'queue_depth': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'retries': self.retries,
+            'latency_p50': latencies[len(latencies) // 2] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+    def _send(self, data):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(self.url, params=self.params_fn(data), timeout=self.timeout)
+                if response.status_code != 429 and response.status_code < 500:
+                    return response.status_code == 200
+            except requests.exceptions.RequestException:
+                pass
+            if attempt == self.max_retries:
+                break
+            self._count('retries')
+            # Backoff exponencial com "full jitter"
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            if self._stop.wait(delay):
+                break
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                queued_at, data = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                ok = self._send(data)
+                self.last_ok = ok
+                self._count('sent' if ok else 'failed')
+                self._latencies.append(time.monotonic() - queued_at)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+from ring_buffer import FIELDS
+
+MEASURES = [name for name, dtype in FIELDS.items() if dtype.startswith('float')]  # temperatura, umidade
+STATES = [name for name, dtype in FIELDS.items() if dtype.startswith('int')]      # botao, motor, alarme
+# nome -> (segundos por balde, baldes guardados)
+RESOLUTIONS = {
+    '1s': (1, 3600),
+    '1min': (60, 7 * 24 * 60),
+    '1h': (3600, 365 * 24),
+}
+
+# ----------------------------
+# Agregados em várias resoluções
+# ----------------------------
+class RollupLevel:
+    """Baldes de `seconds` segundos num anel de `capacity` posições.
+
+    Cada balde guarda, para temperatura e umidade, contagem, soma, mínimo,
+    máximo e último valor; para botão, motor e alarme, quantas amostras
+    estavam ligadas (o ciclo de trabalho é ligadas / amostras).
+    Só baldes com amostras ocupam posição no anel.
+    """
+    def __init__(self, seconds, capacity):
+        self.seconds = seconds
+        self.step = seconds * 1_000_000  # em microssegundos, como o datetime64[us]
+        self.capacity = capacity
+        self.key = np.zeros(capacity, dtype=np.int64)  # início do balde / step
+        self.samples = np.zeros(capacity, dtype=np.int64)
+        self.count = {f: np.zeros(capacity, dtype=np.int64) for f in MEASURES}
+        self.sum = {f: np.zeros(capacity) for f in MEASURES}
+        self.min = {f: np.zeros(capacity) for f in MEASURES}
+        self.max = {f: np.zeros(capacity) for f in MEASURES}
+        self.last = {f: np.zeros(capacity) for f in MEASURES}
+        self.on = {f: np.zeros(capacity, dtype=np.int64) for f in STATES}
+        self.head = -1   # posição do balde corrente
+        self.filled = 0
+        self.late = 0    # amostras mais antigas que o balde corrente (descartadas)
+
+    def __len__(self):
+        return self.filled
+
+    def _slot(self, key):
+        """Posição do balde `key`, abrindo um novo se preciso; None se ele já foi fechado."""
+        if self.filled:
+            current = self.key[self.head]
+            if key == current:
+                return self.head
+            if key < current:
+                self.late += 1
+                return None
+        i = self.head = (self.head + 1) % self.capacity
+        self.filled = min(self.filled + 1, self.capacity)
+        self.key[i] = key
+        self.samples[i] = 0
+        for f in MEASURES:
+            self.count[f][i] = 0
+            self.sum[f][i] = 0.0
+            self.min[f][i] = np.inf
+            self.max[f][i] = -np.inf
+            self.last[f][i] = np.nan
+        for f in STATES:
+            self.on[f][i] = 0
+        return i
+
+    def add(self, ts, record):
+        """Soma uma amostra (ts em microssegundos) ao seu balde: O(1)."""
+        i = self._slot(ts // self.step)
+        if i is None:
+            return
+        self.samples[i] += 1
+        for f in MEASURES:
+            v = record.get(f)
+            if v is None or v != v:  # leitura falhou (None ou NaN)
+                continue
+            self.count[f][i] += 1
+            self.sum[f][i] += v
+            if v < self.min[f][i]:
+                self.min[f][i] = v
+            if v > self.max[f][i]:
+                self.max[f][i] = v
+            self.last[f][i] = v
+        for f in STATES:
+            if record.get(f):
+                self.on[f][i] += 1
+
+    def extend(self, ts, columns):
+        """Soma várias amostras em ordem cronológica ({coluna: array}), agrupando com NumPy."""
+        if not len(ts):
+            return
+        keys = ts // self.step
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        # Só os últimos `capacity` baldes cabem no anel
+        offset = starts[-self.capacity:][0]
+        starts = starts[-self.capacity:] - offset
+        keys = keys[offset:]
+        n = len(keys)
+        samples = np.diff(np.r_[starts, n])
+        agg = {}
+        for f in MEASURES:
+            v = np.asarray(columns[f][offset:], dtype=np.float64)
+            valid = ~np.isnan(v)
+            last_idx = np.maximum.reduceat(np.where(valid, np.arange(n), -1), starts)
+            agg[f] = (np.add.reduceat(valid.astype(np.int64), starts),
+                      np.add.reduceat(np.where(valid, v, 0.0), starts),
+                      np.minimum.reduceat(np.where(valid, v, np.inf), starts),
+                      np.maximum.reduceat(np.where(valid, v, -np.inf), starts),
+                      np.where(last_idx >= 0, v[last_idx], np.nan))
+        on = {f: np.add.reduceat((np.asarray(columns[f][offset:]) != 0).astype(np.int64), starts) for f in STATES}
+        # Um passo por balde (não por amostra) para juntar com o que já existe
+        for g, start in enumerate(starts):
+            i = self._slot(keys[start])
+            if i is None:
+                continue
+            self.samples[i] += samples[g]
+            for f, (count, total, low, high, last) in agg.items():
+                self.count[f][i] += count[g]
+                self.sum[f][i] += total[g]
+                self.min[f][i] = min(self.min[f][i], low[g])
+                self.max[f][i] = max(self.max[f][i], high[g])
+                if last[g] == last[g]:
+                    self.last[f][i] = last[g]
+            for f in STATES:
+                self.on[f][i] += on[f][g]
+
+    def _order(self, start=None, end=None):
+        """Posições dos baldes em ordem cronológica, restritas a start <= balde < end."""
+        order = (self.head - self.filled + 1 + np.arange(self.filled)) % self.capacity
+        keys = self.key[order]
+        mask = np.ones(len(order), dtype=bool)
+        if start is not None:
+            mask &= keys >= _to_us(start) // self.step
+        if end is not None:
+            mask &= keys * self.step < _to_us(end)
+        return order[mask]
+
+    def covers(self, start):
+        """True se o anel ainda guarda tudo desde `start`."""
+        if self.filled < self.capacity:
+            return True
+        return self.key[(self.head + 1) % self.capacity] * self.step <= _to_us(start)
+
+    def columns(self, start=None, end=None):
+        """Baldes do intervalo como {coluna: array}: timestamp, <medida>_min/_max/_mean/_count/_last, <estado>_duty."""
+        i = self._order(start, end)
+        samples = self.samples[i]
+        cols = {'timestamp': (self.key[i] * self.step).view('datetime64[us]'), 'samples': samples}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for f in MEASURES:
+                count = self.count[f][i]
+                empty = count == 0
+                cols[f + '_min'] = np.where(empty, np.nan, self.min[f][i])
+                cols[f + '_max'] = np.where(empty, np.nan, self.max[f][i])
+                cols[f + '_mean'] = np.where(empty, np.nan, self.sum[f][i] / count)
+                cols[f + '_count'] = count
+                cols[f + '_last'] = self.last[f][i]
+            for f in STATES:
+                cols[f + '_duty'] = self.on[f][i] / samples
+        return cols
+
+
+def _to_us(t):
+    return int(np.datetime64(t, 'us').astype(np.int64))
+
+
+class Rollups:
+    """Agregados de uma placa em várias resoluções (1 s, 1 min, 1 h), atualizados a cada amostra.
+
+    Telas de horas ou dias leem os baldes já prontos em vez de varrer as
+    amostras brutas; `resolution_for` escolhe a resolução pelo intervalo.
+    """
+    def __init__(self, resolutions=None):
+        resolutions = resolutions or RESOLUTIONS
+        self.levels = {name: RollupLevel(seconds, capacity)
+                       for name, (seconds, capacity) in sorted(resolutions.items(), key=lambda r: r[1][0])}
+
+    def add(self, record: dict):
+        ts = _to_us(record['timestamp'])
+        for level in self.levels.values():
+            level.add(ts, record)
+
+    def extend(self, columns: dict):
+        """Soma várias amostras ({coluna: array}, em ordem cronológica), ex.: ao recarregar o banco."""
+        ts = np.asarray(columns['timestamp'], dtype='datetime64[us]').astype(np.int64)
+        for level in self.levels.values():
+            level.extend(ts, columns)
+
+    def clear(self):
+        self.levels = {name: RollupLevel(level.seconds, level.capacity) for name, level in self.levels.items()}
+
+    def resolution_for(self, start, end=None, max_points=2000):
+        """Resolução mais fina que cobre [start, end) com até `max_points` baldes."""
+        for name, level in self.levels.items():
+            if level.covers(start) and len(level._order(start, end)) <= max_points:
+                return name
+        return name  # nenhuma serve: fica a mais grossa
+
+    def columns(self, resolution, start=None, end=None):
+        return self.levels[resolution].columns(start, end)
+
+    def to_frame(self, resolution, start=None, end=None):
+        return pd.DataFrame(self.columns(resolution, start, end))
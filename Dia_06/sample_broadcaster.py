@@ -0,0 +1,72 @@
+import json
+import threading
+from collections import deque
+from itertools import islice
+
+# ----------------------------
+# Envio das amostras novas aos navegadores (Server-Sent Events)
+# ----------------------------
+class SampleBroadcaster:
+    """Fila de eventos compartilhada por todos os navegadores conectados.
+
+    `publish` serializa a amostra uma única vez e acorda os clientes;
+    cada cliente (`stream`) só repassa os bytes já prontos. O custo no
+    servidor acompanha a taxa de amostragem, não o número de abas.
+
+    Os últimos `backlog` eventos ficam guardados: um navegador que
+    reconecta com Last-Event-ID recebe o que perdeu. `keepalive` (s) é o
+    intervalo do comentário enviado quando não há amostra, para que
+    proxies não derrubem a conexão parada.
+    """
+    def __init__(self, backlog=256, keepalive=15.0, retry_ms=3000):
+        self.keepalive = keepalive
+        self.retry_ms = retry_ms  # espera do EventSource antes de reconectar
+        self.clients = 0          # conexões abertas agora
+        self.published = 0        # total de eventos publicados (= id do último)
+        self._events = deque(maxlen=backlog)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def publish(self, data):
+        """Enfileira `data` (serializável em JSON) para todos os clientes; devolve o id do evento."""
+        payload = json.dumps(data, default=str, separators=(",", ":"))
+        with self._cond:
+            self.published += 1
+            self._events.append(f"id: {self.published}\ndata: {payload}\n\n".encode())
+            self._cond.notify_all()
+            return self.published
+
+    def close(self):
+        """Encerra os streams abertos (desligamento do servidor)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _pending(self, last_id):
+        # Eventos com id > last_id; os mais antigos que o backlog já se perderam
+        missing = min(self.published - last_id, len(self._events))
+        return b"".join(islice(self._events, len(self._events) - missing, None))
+
+    def stream(self, last_id=None):
+        """Gerador para o Response do Flask (text/event-stream).
+
+        Sem `last_id`, começa pelos eventos publicados depois da conexão.
+        """
+        with self._cond:
+            if last_id is None or last_id > self.published:
+                last_id = self.published
+            self.clients += 1
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            while True:
+                with self._cond:
+                    if self.published == last_id and not self._closed:
+                        self._cond.wait(self.keepalive)
+                    if self._closed:
+                        return
+                    chunk = self._pending(last_id)
+                    last_id = self.published
+                yield chunk or b": keepalive\n\n"
+        finally:
+            with self._cond:
+                self.clients -= 1
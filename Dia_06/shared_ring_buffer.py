@@ -0,0 +1,283 @@
+import fcntl
+import json
+import mmap
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+from ring_buffer import FIELDS, SampleRingBuffer
+
+MAGIC = 0x4553503332524200  # "ESP32RB\0"
+HEADER_BYTES = 1024
+STATUS_OFFSET = 256  # texto do status (UTF-8) vai daqui até LATEST_OFFSET
+LATEST_OFFSET = 448  # última leitura (JSON) vai daqui até COMMANDS_OFFSET
+COMMANDS_OFFSET = 640  # situação dos comandos (JSON) vai daqui até o fim do cabeçalho
+# Posições (int64) no cabeçalho
+_MAGIC, _CAPACITY, _SLOTS, _SEQ, _NEXT, _SIZE, _APPENDED, _GENERATION, _LAST_UPDATE, _STATUS_LEN = range(10)
+REQUESTS = {"clear": 10, "sample": 11}  # pedidos dos workers ao amostrador (contadores)
+_HANDLED = 2  # o contador de atendidos fica 2 posições depois do de pedidos
+_CLEARED_AT, _LATEST_LEN = 14, 15
+# Comandos dos atuadores pedidos pelos workers: um contador de cliques e, por atuador,
+# 4 posições (pedidos, atendidos, ligado, número do clique)
+_COMMAND_CLICKS, _COMMANDS_LEN = 16, 17
+COMMANDS = {"motor": 18, "alarme": 22}
+
+# ----------------------------
+# Buffer circular compartilhado entre processos
+# ----------------------------
+class SharedSampleRingBuffer(SampleRingBuffer):
+    """SampleRingBuffer gravado num arquivo mapeado em memória (mmap).
+
+    Um único processo (o amostrador) abre com create=True e grava; os
+    workers do gunicorn abrem o mesmo arquivo e `columns()` devolve views
+    direto do mapeamento, sem copiar nada nem passar por pipe/socket.
+
+    - O cabeçalho é protegido por um contador de sequência (seqlock): o
+      escritor o deixa ímpar durante a gravação e o leitor relê se pegou
+      uma gravação pela metade. Nenhum lock entre processos.
+    - O arquivo tem `slack` posições além de `capacity`: uma view das
+      últimas `capacity` amostras continua íntegra por mais `slack`
+      gravações, tempo de sobra para um callback montar o gráfico;
+      `intact(appended)` confirma isso depois do uso e `read_consistent`
+      refaz a leitura quando não foi o caso.
+    - O amostrador cria sempre um arquivo novo (e troca pelo nome), com
+      outra geração; um worker percebe com `replaced()` e reabre.
+    - Status da conexão, última leitura (`latest`) e horários da última
+      leitura e da última limpeza também ficam no cabeçalho, e os workers podem pedir ao amostrador uma limpeza ou
+      uma leitura imediata (`request` / `take_requests`). Os contadores de
+      pedidos são incrementados com o arquivo travado (flock), já que vários
+      workers podem pedir ao mesmo tempo.
+    - Comandos de motor/alarme também passam pelo amostrador
+      (`request_command` / `take_commands`), que é o único a falar com a
+      placa e grava a situação de cada comando em `commands`.
+    """
+    def __init__(self, path, capacity=100, create=False, slack=None):
+        self.path = path
+        if create:
+            slots = capacity + (capacity if slack is None else slack)
+            size = HEADER_BYTES + sum(2 * slots * np.dtype(dtype).itemsize for dtype in FIELDS.values())
+            # Arquivo novo trocado pelo nome: quem ainda mapeia o antigo não vê ele encolher
+            with open(path + ".tmp", "wb") as f:
+                f.truncate(size)
+            with open(path + ".tmp", "r+b") as f:
+                header = np.frombuffer(mmap.mmap(f.fileno(), HEADER_BYTES), dtype=np.int64)
+                header[[_MAGIC, _CAPACITY, _SLOTS, _GENERATION, _LAST_UPDATE, _CLEARED_AT]] = [MAGIC, capacity, slots, int(time.time() * 1000), -1, -1]
+            os.replace(path + ".tmp", path)
+        self._file = open(path, "r+b")  # fica aberto para o flock dos pedidos
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._header = np.frombuffer(self._mmap, dtype=np.int64, count=STATUS_OFFSET // 8)
+        if self._header[_MAGIC] != MAGIC:
+            raise ValueError(f"{path} não é um histórico compartilhado")
+        self.history_size = int(self._header[_CAPACITY])
+        self.capacity = int(self._header[_SLOTS])  # posições físicas (usadas pelo append da classe base)
+        self.slack = self.capacity - self.history_size
+        self._arrays, offset = {}, HEADER_BYTES
+        for name, dtype in FIELDS.items():
+            array = np.frombuffer(self._mmap, dtype=dtype, count=2 * self.capacity, offset=offset)
+            array.flags.writeable = create  # só o amostrador grava
+            self._arrays[name] = array
+            offset += array.nbytes
+        self.writer = create
+
+    # ----- cabeçalho -----
+    def _get(self, slot):
+        return int(self._header[slot])
+
+    def _set(self, slot, value):
+        self._header[slot] = value
+
+    _next = property(lambda self: self._get(_NEXT), lambda self, v: self._set(_NEXT, v))
+    appended = property(lambda self: self._get(_APPENDED), lambda self, v: self._set(_APPENDED, v))
+    generation = property(lambda self: self._get(_GENERATION), lambda self, v: self._set(_GENERATION, v))
+    # O tamanho lógico nunca passa de `capacity`; o resto do arquivo é a folga
+    _size = property(lambda self: min(self._get(_SIZE), self.history_size), lambda self, v: self._set(_SIZE, v))
+
+    @contextmanager
+    def _writing(self):
+        self._header[_SEQ] += 1  # ímpar: gravação em andamento
+        try:
+            yield
+        finally:
+            self._header[_SEQ] += 1
+
+    def _snapshot(self):
+        """(próxima posição, tamanho, amostras gravadas, geração) de um mesmo instante."""
+        while True:
+            seq = self._header[_SEQ]
+            if not seq & 1:
+                next_, size, appended, generation = self._header[_NEXT:_GENERATION + 1].tolist()
+                if self._header[_SEQ] == seq:
+                    return next_, min(size, self.history_size), appended, generation
+            time.sleep(0)
+
+    # ----- escrita (só no amostrador) -----
+    def append(self, record: dict):
+        with self._writing():
+            super().append(record)
+
+    def extend(self, columns: dict):
+        with self._writing():
+            super().extend(columns)
+
+    def clear(self):
+        with self._writing():
+            super().clear()
+
+    # ----- leitura -----
+    def __len__(self):
+        return self._snapshot()[1]
+
+    def _views(self, next_, n):
+        end = next_ + self.capacity
+        return {name: array[end - n:end] for name, array in self._arrays.items()}
+
+    def columns(self, last=None):
+        next_, size, _, _ = self._snapshot()
+        return self._views(next_, size if last is None else min(last, size))
+
+    def columns_since(self, appended):
+        next_, size, total, _ = self._snapshot()
+        n = total - appended
+        if n < 0 or n > size:
+            return None
+        return self._views(next_, n)
+
+    def intact(self, appended):
+        """True se views lidas quando o total gravado era `appended` ainda não foram sobrescritas."""
+        return self.appended - appended <= self.slack
+
+    def read_consistent(self, read):
+        """Chama read() até ela terminar antes de o escritor passar da folga.
+
+        read() deve copiar ou consumir as views e não ter outros efeitos:
+        se as views foram sobrescritas no meio, ela é chamada de novo.
+        """
+        while True:
+            appended = self.appended
+            result = read()
+            if self.intact(appended):
+                return result
+
+    # ----- status da conexão -----
+    def _read_text(self, offset, length_slot):
+        while True:
+            seq = self._header[_SEQ]
+            raw = bytes(self._mmap[offset:offset + self._get(length_slot)])
+            if not seq & 1 and self._header[_SEQ] == seq:
+                return raw.decode("utf-8", "replace")
+
+    def _write_text(self, offset, length_slot, raw):
+        with self._writing():
+            self._mmap[offset:offset + len(raw)] = raw
+            self._set(length_slot, len(raw))
+
+    @property
+    def status(self):
+        return self._read_text(STATUS_OFFSET, _STATUS_LEN)
+
+    @status.setter
+    def status(self, text):
+        self._write_text(STATUS_OFFSET, _STATUS_LEN, text.encode("utf-8")[:LATEST_OFFSET - STATUS_OFFSET])
+
+    @property
+    def latest(self):
+        text = self._read_text(LATEST_OFFSET, _LATEST_LEN)
+        if not text:
+            return None
+        reading = json.loads(text)
+        reading['timestamp'] = datetime.fromisoformat(reading['timestamp'])
+        return reading
+
+    @latest.setter
+    def latest(self, reading):
+        raw = b"" if reading is None else json.dumps({**reading, 'timestamp': reading['timestamp'].isoformat()}).encode()
+        if len(raw) > COMMANDS_OFFSET - LATEST_OFFSET:
+            raise ValueError("leitura grande demais para o cabeçalho")
+        self._write_text(LATEST_OFFSET, _LATEST_LEN, raw)
+
+    @property
+    def commands(self):
+        """Situação gravada pelo amostrador: {atuador: (fase, ligado, latência em s) ou None}."""
+        text = self._read_text(COMMANDS_OFFSET, _COMMANDS_LEN)
+        return {name: status and tuple(status) for name, status in json.loads(text).items()} if text else {}
+
+    @commands.setter
+    def commands(self, statuses):
+        raw = json.dumps(statuses).encode()
+        if len(raw) > HEADER_BYTES - COMMANDS_OFFSET:
+            raise ValueError("situação dos comandos grande demais para o cabeçalho")
+        self._write_text(COMMANDS_OFFSET, _COMMANDS_LEN, raw)
+
+    @property
+    def last_update(self):
+        us = self._get(_LAST_UPDATE)
+        return None if us < 0 else np.datetime64(us, 'us').item()
+
+    @last_update.setter
+    def last_update(self, value):
+        self._set(_LAST_UPDATE, -1 if value is None else np.datetime64(value, 'us').astype(np.int64))
+
+    @property
+    def cleared_at(self):
+        us = self._get(_CLEARED_AT)
+        return None if us < 0 else np.datetime64(us, 'us')
+
+    @cleared_at.setter
+    def cleared_at(self, value):
+        self._set(_CLEARED_AT, -1 if value is None else np.datetime64(value, 'us').astype(np.int64))
+
+    def replaced(self):
+        """True se o amostrador recriou o arquivo (este mapeamento não recebe mais nada)."""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return False
+
+    # ----- pedidos dos workers ao amostrador -----
+    @contextmanager
+    def _locked(self):
+        """Trava o arquivo entre processos (workers incrementando o mesmo contador)."""
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def request(self, name):
+        """Pede ao processo amostrador uma ação ("clear" ou "sample")."""
+        with self._locked():  # o += lê e grava: sem a trava, dois workers perdem um pedido
+            self._header[REQUESTS[name]] += 1
+
+    def take_requests(self):
+        """No amostrador: nomes dos pedidos chegados desde a última chamada."""
+        pending = []
+        for name, slot in REQUESTS.items():
+            requested = self._get(slot)  # só o amostrador grava os atendidos
+            if requested != self._get(slot + _HANDLED):
+                self._set(slot + _HANDLED, requested)
+                pending.append(name)
+        return pending
+
+    def request_command(self, actuator, on):
+        """Pede ao amostrador `actuator` ("motor" ou "alarme") ligado/desligado."""
+        slot = COMMANDS[actuator]
+        with self._locked():
+            self._header[_COMMAND_CLICKS] += 1
+            self._header[slot + 2:slot + 4] = [int(on), self._header[_COMMAND_CLICKS]]
+            self._header[slot] += 1
+
+    def take_commands(self):
+        """No amostrador: [(atuador, ligado)] pedidos desde a última chamada, na ordem dos cliques.
+
+        Vale o último clique de cada atuador, como na fila de comandos.
+        """
+        pending = []
+        with self._locked():  # pedido, estado e número do mesmo clique
+            for actuator, slot in COMMANDS.items():
+                requested, handled, on, click = self._header[slot:slot + 4].tolist()
+                if requested != handled:
+                    self._set(slot + 1, requested)
+                    pending.append((click, actuator, bool(on)))
+        return [(actuator, on) for _, actuator, on in sorted(pending)]
@@ -0,0 +1,169 @@
+import mmap
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+from rollups import MEASURES, RESOLUTIONS, STATES, RollupLevel, Rollups
+
+MAGIC = 0x4553503332524C00  # "ESP32RL\0"
+HEADER_BYTES = 256
+# Posições (int64) no cabeçalho; cada resolução ocupa _LEVEL_SLOTS posições a partir de _LEVELS
+_MAGIC, _SEQ, _COUNT, _LEVELS = range(4)
+_SECONDS, _CAPACITY, _HEAD, _FILLED, _LATE = range(5)
+_LEVEL_SLOTS = 5
+# Arrays de cada resolução, todos com 8 bytes por balde
+_ARRAYS = (['key', 'samples'] + [f'{kind}.{f}' for kind in ('count', 'sum', 'min', 'max', 'last') for f in MEASURES]
+           + [f'on.{f}' for f in STATES])
+
+
+def _file_size(resolutions):
+    return HEADER_BYTES + sum(len(_ARRAYS) * 8 * capacity for _, (_, capacity) in resolutions)
+
+
+# ----------------------------
+# Agregados num arquivo mapeado em memória
+# ----------------------------
+class SharedRollupLevel(RollupLevel):
+    """RollupLevel com os baldes e a posição corrente dentro do arquivo mapeado."""
+    def __init__(self, header, base, buffer, offset):
+        self._header, self._base = header, base
+        self.seconds = int(header[base + _SECONDS])
+        self.step = self.seconds * 1_000_000
+        self.capacity = int(header[base + _CAPACITY])
+        arrays = {}
+        for name in _ARRAYS:
+            dtype = np.float64 if name.split('.')[0] in ('sum', 'min', 'max', 'last') else np.int64
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=self.capacity, offset=offset)
+            offset += 8 * self.capacity
+        self.key, self.samples = arrays['key'], arrays['samples']
+        for kind in ('count', 'sum', 'min', 'max', 'last', 'on'):
+            setattr(self, kind, {f: arrays[f'{kind}.{f}'] for f in (STATES if kind == 'on' else MEASURES)})
+        self.end = offset
+
+    # ----- cabeçalho -----
+    def _get(self, slot):
+        return int(self._header[self._base + slot])
+
+    def _set(self, slot, value):
+        self._header[self._base + slot] = value
+
+    head = property(lambda self: self._get(_HEAD), lambda self, v: self._set(_HEAD, v))
+    filled = property(lambda self: self._get(_FILLED), lambda self, v: self._set(_FILLED, v))
+    late = property(lambda self: self._get(_LATE), lambda self, v: self._set(_LATE, v))
+
+
+class SharedRollups(Rollups):
+    """Rollups gravados num arquivo mapeado em memória (mmap).
+
+    - O arquivo é o próprio estado: reaberto depois de um reinício, continua
+      de onde parou. O banco só tem as amostras que passaram pela
+      compressão, então recalcular dele contagens e ciclo de trabalho daria
+      outro resultado; aqui os baldes continuam feitos com todas as leituras.
+    - Um processo grava (create=True: abre o arquivo existente ou cria um
+      novo se as resoluções mudaram); os workers do gunicorn abrem só para
+      leitura e veem os mesmos baldes, sem copiar nada entre processos.
+    - Gravações passam pelo mesmo contador de sequência (seqlock) do
+      SharedSampleRingBuffer: quem lê refaz a leitura se pegou uma gravação
+      pela metade.
+    """
+    def __init__(self, path, resolutions=None, create=False):
+        resolutions = sorted((resolutions or RESOLUTIONS).items(), key=lambda r: r[1][0])
+        self.path = path
+        self.writer = create
+        if create and not self._matches(path, resolutions):
+            self._create(path, resolutions)
+        with open(path, "r+b" if create else "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if create else mmap.ACCESS_READ)
+            self._inode = os.fstat(f.fileno()).st_ino
+        self._header = np.frombuffer(self._mmap, dtype=np.int64, count=HEADER_BYTES // 8)
+        if self._header[_MAGIC] != MAGIC:
+            raise ValueError(f"{path} não é um arquivo de agregados")
+        if create and self._header[_SEQ] & 1:
+            self._header[_SEQ] += 1  # o processo anterior caiu no meio de uma gravação
+        self.levels, offset = {}, HEADER_BYTES
+        for k, (name, _) in enumerate(resolutions):
+            level = SharedRollupLevel(self._header, _LEVELS + k * _LEVEL_SLOTS, self._mmap, offset)
+            self.levels[name], offset = level, level.end
+
+    @staticmethod
+    def _matches(path, resolutions):
+        """True se o arquivo existe e foi criado com estas resoluções."""
+        try:
+            if os.path.getsize(path) != _file_size(resolutions):
+                return False
+            header = np.fromfile(path, dtype=np.int64, count=HEADER_BYTES // 8)
+        except (FileNotFoundError, ValueError):
+            return False
+        expected = [value for _, (seconds, capacity) in resolutions for value in (seconds, capacity)]
+        stored = [int(header[_LEVELS + k * _LEVEL_SLOTS + slot]) for k in range(len(resolutions))
+                  for slot in (_SECONDS, _CAPACITY)]
+        return header[_MAGIC] == MAGIC and header[_COUNT] == len(resolutions) and stored == expected
+
+    @staticmethod
+    def _create(path, resolutions):
+        if _LEVELS + len(resolutions) * _LEVEL_SLOTS > HEADER_BYTES // 8:
+            raise ValueError("resoluções demais para o cabeçalho")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Arquivo novo trocado pelo nome, como no SharedSampleRingBuffer
+        with open(path + ".tmp", "wb") as f:
+            f.truncate(_file_size(resolutions))
+        with open(path + ".tmp", "r+b") as f:
+            header = np.frombuffer(mmap.mmap(f.fileno(), HEADER_BYTES), dtype=np.int64)
+            header[[_MAGIC, _COUNT]] = [MAGIC, len(resolutions)]
+            for k, (_, (seconds, capacity)) in enumerate(resolutions):
+                base = _LEVELS + k * _LEVEL_SLOTS
+                header[base:base + _LEVEL_SLOTS] = [seconds, capacity, -1, 0, 0]
+        os.replace(path + ".tmp", path)
+
+    @contextmanager
+    def _writing(self):
+        self._header[_SEQ] += 1  # ímpar: gravação em andamento
+        try:
+            yield
+        finally:
+            self._header[_SEQ] += 1
+
+    def _consistent(self, read):
+        """Resultado de read() lido sem nenhuma gravação no meio."""
+        while True:
+            seq = self._header[_SEQ]
+            if not seq & 1:
+                result = read()
+                if self._header[_SEQ] == seq:
+                    return result
+            time.sleep(0)
+
+    # ----- escrita (só no processo que grava) -----
+    def add(self, record: dict):
+        with self._writing():
+            super().add(record)
+
+    def extend(self, columns: dict):
+        with self._writing():
+            super().extend(columns)
+
+    def clear(self):
+        with self._writing():
+            for level in self.levels.values():
+                level.head, level.filled, level.late = -1, 0, 0
+
+    def flush(self):
+        """Grava no disco as páginas alteradas (ao encerrar)."""
+        if self.writer:
+            self._mmap.flush()
+
+    # ----- leitura -----
+    def resolution_for(self, start, end=None, max_points=2000):
+        read = super().resolution_for
+        return self._consistent(lambda: read(start, end, max_points))
+
+    def columns(self, resolution, start=None, end=None):
+        read = super().columns  # indexa com arrays de posições: o resultado já é uma cópia
+        return self._consistent(lambda: read(resolution, start, end))
+
+    def replaced(self):
+        """True se o arquivo foi recriado (este mapeamento não recebe mais nada)."""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return False
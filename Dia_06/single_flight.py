@@ -0,0 +1,71 @@
+import threading
+import time
+
+# ----------------------------
+# Leitura compartilhada (single-flight)
+# ----------------------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.stale = False  # começou antes de um forget(): o resultado não é guardado
+
+
+class SingleFlight:
+    """Junta chamadas simultâneas de `fn` numa só execução.
+
+    Quem chama enquanto uma execução está em andamento espera por ela e
+    recebe o mesmo resultado; um resultado com menos de `max_age`
+    segundos é devolvido sem executar de novo. Assim a placa recebe no
+    máximo uma requisição por vez e uma a cada `max_age`, não importa
+    quantas sessões do dashboard estejam lendo.
+
+    Falhas (exceção ou resultado None) são repassadas a quem esperava,
+    mas não ficam guardadas: a próxima chamada tenta de novo.
+    """
+    def __init__(self, fn, max_age=1.0):
+        self.fn = fn
+        self.max_age = max_age
+        self.calls = 0    # execuções de fn (requisições de fato)
+        self.shared = 0   # chamadas atendidas sem executar fn
+        self._lock = threading.Lock()
+        self._call = None          # execução em andamento
+        self._result = None
+        self._result_at = None     # time.monotonic() do último resultado bom
+
+    def __call__(self):
+        with self._lock:
+            if self._result_at is not None and time.monotonic() - self._result_at < self.max_age:
+                self.shared += 1
+                return self._result
+            call, leader = self._call, self._call is None
+            if leader:
+                call = self._call = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = self.fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._call = None
+                if call.error is None and call.result is not None and not call.stale:
+                    self._result, self._result_at = call.result, time.monotonic()
+            call.done.set()
+        return call.result
+
+    def forget(self):
+        """Descarta o resultado guardado (ex.: depois de um comando que muda o estado da placa)."""
+        with self._lock:
+            self._result_at = None
+            if self._call:
+                self._call.stale = True
@@ -0,0 +1,207 @@
+import os
+import pathlib
+import queue
+import re
+import sqlite3
+import threading
+import numpy as np
+from ring_buffer import FIELDS
+
+COLUMNS = list(FIELDS)  # timestamp, temperatura, umidade, botao, motor, alarme
+
+
+def _missing_table(error):
+    # Só a tabela inexistente vira resultado vazio; banco travado, corrompido etc. sobem
+    return str(error).startswith("no such table")
+
+# ----------------------------
+# Histórico persistente em SQLite (modo WAL)
+# ----------------------------
+class SQLiteStore:
+    """Guarda as amostras em disco, uma tabela por placa indexada pelo tempo.
+
+    `put` só coloca a amostra numa fila; uma thread escritora grava em lotes
+    com executemany. Com o WAL, as leituras não esperam as escritas.
+    O timestamp é gravado como inteiro em microssegundos (horário local,
+    o mesmo datetime64[us] do SampleRingBuffer).
+
+    Com `read_only=True` (quem só consulta, como o dashboard Streamlit) não
+    há thread escritora e o banco é aberto com mode=ro: o arquivo precisa
+    existir (FileNotFoundError) e nada é criado nem alterado nele.
+    """
+    def __init__(self, path, batch_size=500, flush_interval=1.0, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._counts = {}  # (tabela, filtro) -> (maior rowid já contado, total)
+        self.written = 0
+        self.last_error = None
+        self._writer = None
+        if read_only:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(2, "banco SQLite não encontrado", path)
+            return
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")  # fica gravado no arquivo
+        conn.close()
+        self._writer = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        if self.read_only:
+            return sqlite3.connect(pathlib.Path(self.path).absolute().as_uri() + "?mode=ro", uri=True, timeout=10)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")  # seguro com WAL e bem mais rápido
+        return conn
+
+    def _reader(self):
+        # Uma conexão de leitura por thread (sqlite3 não compartilha conexões entre threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @staticmethod
+    def table_name(device):
+        return "amostras_" + re.sub(r"\W", "_", str(device))
+
+    def _ensure_table(self, conn, device):
+        table = self.table_name(device)
+        with self._tables_lock:
+            if table in self._tables:
+                return table
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (timestamp INTEGER NOT NULL, '
+                         'temperatura REAL, umidade REAL, botao INTEGER, motor INTEGER, alarme INTEGER)')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_ts" ON "{table}" (timestamp)')
+            conn.commit()
+            self._tables.add(table)
+        return table
+
+    def put(self, device, record: dict):
+        """Agenda a gravação de uma amostra; nunca bloqueia."""
+        row = (int(np.datetime64(record['timestamp'], 'us').astype(np.int64)),
+               record.get('temperatura'), record.get('umidade'),
+               record.get('botao', 0), record.get('motor', 0), record.get('alarme', 0))
+        self._queue.put_nowait((device, row))
+
+    def flush(self):
+        """Espera até tudo o que foi enfileirado estar no disco."""
+        self._queue.join()
+
+    def close(self):
+        self._stop.set()
+        if self._writer:
+            self._writer.join()
+
+    def _run(self):
+        conn = self._connect()
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows_by_device = {}
+            for device, row in batch:
+                rows_by_device.setdefault(device, []).append(row)
+            try:
+                for device, rows in rows_by_device.items():
+                    table = self._ensure_table(conn, device)
+                    conn.executemany(f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?)', rows)
+                conn.commit()
+                self.written += len(batch)
+            except sqlite3.Error as e:  # disco cheio, banco travado...: perde o lote, não a thread
+                conn.rollback()
+                self.last_error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _where(start, end):
+        where, params = [], []
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(int(np.datetime64(start, 'us').astype(np.int64)))
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(int(np.datetime64(end, 'us').astype(np.int64)))
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def query(self, device, start=None, end=None, limit=None, newest=False, offset=None):
+        """Amostras de `device` com start <= timestamp < end, como {coluna: array}.
+
+        start/end aceitam datetime ou datetime64. Com `newest=True` e `limit`,
+        devolve as `limit` mais recentes do intervalo (ainda em ordem cronológica).
+        `offset` pula as primeiras linhas dessa ordem (paginação).
+        """
+        where, params = self._where(start, end)
+        sql = f'SELECT {", ".join(COLUMNS)} FROM "{self.table_name(device)}"' + where
+        sql += " ORDER BY timestamp DESC" if newest else " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+            if offset:
+                sql += " OFFSET ?"
+                params.append(int(offset))
+        try:
+            rows = self._reader().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            if not _missing_table(e):
+                raise
+            rows = []  # placa ainda sem tabela
+        if newest:
+            rows.reverse()
+        return self._to_columns(rows)
+
+    def count(self, device, start=None, end=None):
+        """Quantas amostras de `device` há com start <= timestamp < end.
+
+        As linhas nunca são alteradas nem apagadas e o rowid só cresce, então
+        o total fica guardado e cada chamada só conta as linhas novas (vale
+        também para o que outro processo gravou no mesmo banco).
+        """
+        table = self.table_name(device)
+        where, params = self._where(start, end)
+        key = (table, where, tuple(params))
+        counted, total = self._counts.get(key, (0, 0))
+        conn = self._reader()
+        try:
+            last = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+            if last > counted:
+                sql = (f'SELECT COUNT(*) FROM "{table}"' + (where + " AND" if where else " WHERE") +
+                       " rowid > ? AND rowid <= ?")
+                total += conn.execute(sql, params + [counted, last]).fetchone()[0]
+                self._counts[key] = (last, total)
+        except sqlite3.OperationalError as e:
+            if not _missing_table(e):
+                raise
+        return total
+
+    @staticmethod
+    def _to_columns(rows):
+        if not rows:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in FIELDS.items()}
+        # Converte linha -> coluna de uma vez, sem laço por amostra
+        table = np.array(rows, dtype=object).T
+        cols = {}
+        for name, values in zip(COLUMNS, table):
+            if name == 'timestamp':
+                cols[name] = values.astype(np.int64).view(FIELDS[name])
+            elif FIELDS[name].startswith('float'):
+                cols[name] = values.astype(np.float64)  # None vira NaN
+            else:
+                values[np.equal(values, None)] = 0  # leitura parcial: mesmo 0 do SampleRingBuffer
+                cols[name] = values.astype(FIELDS[name])
+        return cols